@@ -16,6 +16,10 @@ __docformat__ = 'reStructuredText'
 
 import sys
 import pprint
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
 from docutils import __version__, __version_details__, SettingsSpec
 from docutils import frontend, io, utils, readers, writers
 from docutils.frontend import OptionParser
@@ -192,6 +196,18 @@ class Publisher:
             encoding=self.settings.output_encoding,
             error_handler=self.settings.output_encoding_error_handler)
 
+    def read(self):
+        """
+        Run `self.reader` and return the document tree.  Use the doctree
+        cache if the "doctree_cache" setting is set.
+        """
+        cache_directory = getattr(self.settings, 'doctree_cache', None)
+        if cache_directory:
+            from docutils.utils.doctree_cache import DoctreeCache
+            return DoctreeCache(cache_directory).read(
+                self.reader, self.source, self.parser, self.settings)
+        return self.reader.read(self.source, self.parser, self.settings)
+
     def apply_transforms(self):
         self.document.transformer.populate_from_components(
             (self.source, self.reader, self.reader.parser, self.writer,
@@ -204,7 +220,8 @@ class Publisher:
         """
         Process command line options and arguments (if `self.settings` not
         already set), run `self.reader` and then `self.writer`.  Return
-        `self.writer`'s output.
+        `self.writer`'s output (None if the writer streamed it, see
+        `docutils.writers.Writer.write()`).
         """
         exit = None
         try:
@@ -213,8 +230,7 @@ class Publisher:
                     argv, usage, description, settings_spec, config_section,
                     **(settings_overrides or {}))
             self.set_io()
-            self.document = self.reader.read(self.source, self.parser,
-                                             self.settings)
+            self.document = self.read()
             self.apply_transforms()
             output = self.writer.write(self.document, self.destination)
             self.writer.assemble_parts()
@@ -361,7 +377,8 @@ def publish_file(source=None, source_path=None,
                  config_section=None, enable_exit_status=False):
     """
     Set up & run a `Publisher` for programmatic use with file-like I/O.
-    Return the encoded string output also.
+    Return the encoded string output also (None if the writer streamed the
+    output to the file, e.g. with the "stream_output" setting).
 
     Parameters: see `publish_programmatically`.
     """
@@ -661,3 +678,122 @@ def publish_programmatically(source_class, source, source_path,
     pub.set_destination(destination, destination_path)
     output = pub.publish(enable_exit_status=enable_exit_status)
     return output, pub
+
+
+class PublishSession:
+
+    """
+    Publish many documents with the same components and settings.
+
+    The ``publish_*`` convenience functions instantiate the components,
+    set up an option parser from their settings specifications, and read
+    the configuration files for every document.  A session does this only
+    once; its ``publish_*`` methods then produce the same output as the
+    convenience functions with the same arguments::
+
+        session = PublishSession(writer_name='html',
+                                 settings_overrides={'report_level': 5})
+        for source in sources:
+            parts = session.publish_parts(source)
+
+    Components given by name are instantiated once per thread, so a session
+    may be shared by several threads.  Component instances passed to the
+    constructor are shared by all threads.
+
+    Parameters: see `publish_programmatically`.
+    """
+
+    def __init__(self, reader=None, reader_name='standalone',
+                 parser=None, parser_name='restructuredtext',
+                 writer=None, writer_name='pseudoxml',
+                 settings=None, settings_spec=None,
+                 settings_overrides=None, config_section=None):
+        self.components = (reader, parser, writer)
+        """Component instances passed to the constructor (or `None`)."""
+
+        self.component_names = (reader_name, parser_name, writer_name)
+
+        pub = Publisher(reader, parser, writer, settings=settings)
+        pub.set_components(reader_name, parser_name, writer_name)
+        pub.process_programmatic_settings(
+            settings_spec, settings_overrides, config_section)
+
+        self.settings = pub.settings
+        """Runtime settings of the session.  Every document is processed
+        with a copy; do not modify."""
+
+        self._local = threading.local()
+        self._local.components = (pub.reader, pub.parser, pub.writer)
+
+    def get_components(self):
+        """Return the reader, parser, and writer of the current thread."""
+        try:
+            return self._local.components
+        except AttributeError:
+            pub = Publisher(*self.components)
+            pub.set_components(*self.component_names)
+            self._local.components = (pub.reader, pub.parser, pub.writer)
+            return self._local.components
+
+    def get_settings(self):
+        """Return a copy of the session settings for a new document."""
+        settings = self.settings.copy()
+        if settings.record_dependencies.file is None:
+            # don't accumulate the dependencies of all documents
+            settings.record_dependencies = utils.DependencyList()
+        return settings
+
+    def publish_programmatically(self, source_class, source, source_path,
+                                 destination_class, destination,
+                                 destination_path, enable_exit_status=False):
+        """
+        Run a `Publisher` with the session components and settings.
+        Return the encoded string output and the Publisher object.
+        """
+        reader, parser, writer = self.get_components()
+        pub = Publisher(reader, parser, writer, settings=self.get_settings(),
+                        source_class=source_class,
+                        destination_class=destination_class)
+        pub.set_source(source, source_path)
+        pub.set_destination(destination, destination_path)
+        output = pub.publish(enable_exit_status=enable_exit_status)
+        return output, pub
+
+    def publish_file(self, source=None, source_path=None,
+                     destination=None, destination_path=None,
+                     enable_exit_status=False):
+        """
+        Publish with file-like I/O, see `publish_file`.
+        Return the encoded string output also.
+        """
+        output, pub = self.publish_programmatically(
+            io.FileInput, source, source_path,
+            io.FileOutput, destination, destination_path,
+            enable_exit_status)
+        return output
+
+    def publish_string(self, source, source_path=None, destination_path=None,
+                       enable_exit_status=False):
+        """
+        Publish with string I/O, see `publish_string`.
+        Return the encoded string or Unicode string output.
+        """
+        output, pub = self.publish_programmatically(
+            io.StringInput, source, source_path,
+            io.StringOutput, None, destination_path,
+            enable_exit_status)
+        return output
+
+    def publish_parts(self, source, source_path=None,
+                      source_class=io.StringInput, destination_path=None,
+                      enable_exit_status=False):
+        """
+        Publish with string input, see `publish_parts`.
+        Return a dictionary of document parts.
+        """
+        output, pub = self.publish_programmatically(
+            source_class, source, source_path,
+            io.StringOutput, None, destination_path,
+            enable_exit_status)
+        # the writer (and its `parts`) is reused for the next document:
+        return pub.writer.parts.copy()
@@ -500,6 +500,25 @@ class OptionParser(optparse.OptionParser, docutils.SettingsSpec):
           ['--record-dependencies'],
           {'metavar': '<file>', 'validator': validate_dependency_file,
            'default': None}),           # default set in Values class
+         ('Store parsed document trees in <directory> and reuse them when '
+          'the same source is processed again with the same settings '
+          '(e.g. for another output format).',
+          ['--doctree-cache'], {'metavar': '<directory>'}),
+         ('Keep the metadata of images read for image sizing (dimensions, '
+          'format, resolution) in <directory> and reuse it while the image '
+          'files are unchanged (also in later runs).',
+          ['--image-cache'], {'metavar': '<directory>'}),
+         ('Write the time, the number of nodes visited, and the number of '
+          'document tree modifications of every transform to <file> '
+          '(tab-separated values).',
+          ['--transform-profile'], {'metavar': '<file>'}),
+         ('Index the document tree nodes by class while applying transforms '
+          'and writing output (faster lookups of sparse node types).',
+          ['--node-registry'],
+          {'action': 'store_true', 'validator': validate_boolean}),
+         ('Do not index the document tree nodes by class. (default)',
+          ['--no-node-registry'],
+          {'action': 'store_false', 'dest': 'node_registry'}),
          ('Read configuration settings from <file>, if it exists.',
           ['--config'], {'metavar': '<file>', 'type': 'string',
                          'action': 'callback', 'callback': read_config_file}),
@@ -530,7 +549,8 @@ class OptionParser(optparse.OptionParser, docutils.SettingsSpec):
                          '_config_files': None}
     """Defaults for settings that don't have command-line option equivalents."""
 
-    relative_path_settings = ('warning_stream',)
+    relative_path_settings = ('warning_stream', 'doctree_cache',
+                              'transform_profile', 'image_cache')
 
     config_section = 'general'
 
@@ -184,6 +184,28 @@ class Output(TransformSpec):
         """`data` is a Unicode string, to be encoded by `self.encode`."""
         raise NotImplementedError
 
+    streaming = False
+    """True if `write_chunk()` writes the data immediately."""
+
+    def write_chunk(self, data):
+        """
+        Write `data`, a part of the output.  Call `finish_chunks()` after
+        the last part.
+
+        This implementation collects the parts and writes them with
+        `write()` in `finish_chunks()`; see `FileOutput` for an output
+        writing the parts immediately (`streaming`).
+        """
+        if not hasattr(self, '_chunks'):
+            self._chunks = []
+        self._chunks.append(data)
+
+    def finish_chunks(self):
+        """Finish writing the parts of the output, return `write()` result."""
+        chunks = getattr(self, '_chunks', [])
+        self._chunks = []
+        return self.write(''.join(chunks))
+
     def encode(self, data):
         if self.encoding and self.encoding.lower() == 'unicode':
             assert isinstance(data, unicode), (
@@ -301,6 +323,8 @@ class FileOutput(Output):
     # (Do not use binary mode ('wb') for text files, as this prevents the
     # conversion of newlines to the system specific default.)
 
+    streaming = True
+
     def __init__(self, destination=None, destination_path=None,
                  encoding=None, error_handler='strict', autoclose=True,
                  handle_io_errors=None, mode=None):
@@ -366,38 +390,90 @@ class FileOutput(Output):
         """
         if not self.opened:
             self.open()
-        if ('b' not in self.mode and sys.version_info < (3,0)
-            or check_encoding(self.destination, self.encoding) is False
-           ):
+        if self.needs_encoding():
             if sys.version_info >= (3,0) and os.linesep != '\n':
                 data = data.replace('\n', os.linesep) # fix endings
             data = self.encode(data)
 
-        try: # In Python < 2.5, try...except has to be nested in try...finally.
-            try:
-                self.destination.write(data)
-            except TypeError, e:
-                if sys.version_info >= (3,0) and isinstance(data, bytes):
-                    try:
-                        self.destination.buffer.write(data)
-                    except AttributeError:
-                        if check_encoding(self.destination, 
-                                          self.encoding) is False:
-                            raise ValueError('Encoding of %s (%s) differs \n'
-                                '  from specified encoding (%s)' %
-                                (self.destination_path or 'destination',
-                                self.destination.encoding, self.encoding))
-                        else:
-                            raise e
-            except (UnicodeError, LookupError), err:
-                raise UnicodeError(
-                    'Unable to encode output data. output-encoding is: '
-                    '%s.\n(%s)' % (self.encoding, ErrorString(err)))
+        try:
+            self.write_data(data)
         finally:
             if self.autoclose:
                 self.close()
         return data
 
+    def needs_encoding(self):
+        """Return True if the data must be encoded before writing."""
+        return ('b' not in self.mode and sys.version_info < (3,0)
+                or check_encoding(self.destination, self.encoding) is False)
+
+    def write_chunk(self, data):
+        """
+        Encode `data`, a part of the output, and write it to the file.
+        Call `finish_chunks()` after the last part.
+        """
+        if not self.opened:
+            self.open()
+        if self.needs_encoding():
+            if sys.version_info >= (3,0) and os.linesep != '\n':
+                data = data.replace('\n', os.linesep) # fix endings
+            data = self.encode_chunk(data)
+        try:
+            self.write_data(data)
+        except:
+            if self.autoclose:
+                self.close()
+            raise
+
+    def encode_chunk(self, data, final=False):
+        """Encode a part of the output (with a stateful encoder)."""
+        if (not isinstance(data, unicode)
+            or (self.encoding and self.encoding.lower() == 'unicode')):
+            return self.encode(data)
+        encoder = getattr(self, '_encoder', None)
+        if encoder is None:
+            try:
+                encoder = codecs.getincrementalencoder(self.encoding)(
+                                                        self.error_handler)
+            except AttributeError:      # Python < 2.5
+                return self.encode(data)
+            self._encoder = encoder
+        return encoder.encode(data, final)
+
+    def finish_chunks(self):
+        """Finish writing the parts of the output.  Return None."""
+        if not self.opened:
+            self.open()
+        try:
+            if getattr(self, '_encoder', None) is not None:
+                self.write_data(self._encoder.encode(u'', True))
+                self._encoder = None
+        finally:
+            if self.autoclose:
+                self.close()
+
+    def write_data(self, data):
+        """Write the (encoded) `data` to the destination."""
+        try:
+            self.destination.write(data)
+        except TypeError, e:
+            if sys.version_info >= (3,0) and isinstance(data, bytes):
+                try:
+                    self.destination.buffer.write(data)
+                except AttributeError:
+                    if check_encoding(self.destination,
+                                      self.encoding) is False:
+                        raise ValueError('Encoding of %s (%s) differs \n'
+                            '  from specified encoding (%s)' %
+                            (self.destination_path or 'destination',
+                            self.destination.encoding, self.encoding))
+                    else:
+                        raise e
+        except (UnicodeError, LookupError), err:
+            raise UnicodeError(
+                'Unable to encode output data. output-encoding is: '
+                '%s.\n(%s)' % (self.encoding, ErrorString(err)))
+
     def close(self):
         if self.destination not in (sys.stdout, sys.stderr):
             self.destination.close()
@@ -28,6 +28,22 @@ import re
 import warnings
 import types
 import unicodedata
+import weakref
+
+compact_nodes = bool(os.environ.get('DOCUTILS_COMPACT_NODES'))
+"""Use the compact representation of `Element` instances.
+
+Compact elements store their data in the ``__slots__`` of `Element`,
+create the list attributes ('ids', 'classes', ...) only when they are
+first used, intern attribute names and store the tag name on the class.
+This reduces the memory footprint of large document trees considerably.
+Only `Element` defines slots: instances of the node classes still have a
+``__dict__`` for other attributes (e.g. ``referenced`` or ``resolved``
+set by transforms), but it is only allocated when such an attribute is
+set.  `Text` nodes are not affected.  As slots are
+defined when the classes are created, the mode is selected with the
+environment variable ``DOCUTILS_COMPACT_NODES`` before `docutils.nodes` is
+imported.  See also `_CompactAttributes`."""
 
 # ==============================
 #  Functional Node Base Classes
@@ -110,7 +126,10 @@ class Node(object):
         modifications.  Replacing one node with one or more nodes is
         OK, as is removing an element.  However, if the node removed
         or replaced occurs after the current node, the old node will
-        still be traversed, and any new nodes will not.
+        still be traversed, and any new nodes will not.  Use the
+        `Element` methods for modifications, not the `children` list
+        directly: they leave the list being traversed unchanged and
+        modify a copy instead (copy-on-write).
 
         Within ``visit`` methods (and ``depart`` methods for
         `walkabout()`), `TreePruningException` subclasses may be raised
@@ -122,9 +141,11 @@ class Node(object):
         Return true if we should stop the traversal.
         """
         stop = False
-        visitor.document.reporter.debug(
-            'docutils.nodes.Node.walk calling dispatch_visit for %s'
-            % self.__class__.__name__)
+        reporter = visitor.document.reporter
+        if reporter.debug_flag:
+            reporter.debug(
+                'docutils.nodes.Node.walk calling dispatch_visit for %s'
+                % self.__class__.__name__)
         try:
             try:
                 visitor.dispatch_visit(self)
@@ -133,13 +154,19 @@ class Node(object):
             except SkipDeparture:           # not applicable; ignore
                 pass
             children = self.children
-            try:
-                for child in children[:]:
-                    if child.walk(visitor):
-                        stop = True
-                        break
-            except SkipSiblings:
-                pass
+            if children:
+                walked = self._walked_children
+                self._walked_children = children
+                try:
+                    try:
+                        for child in children:
+                            if child.walk(visitor):
+                                stop = True
+                                break
+                    except SkipSiblings:
+                        pass
+                finally:
+                    self._end_walk(walked)
         except StopTraversal:
             stop = True
         return stop
@@ -158,9 +185,11 @@ class Node(object):
         """
         call_depart = True
         stop = False
-        visitor.document.reporter.debug(
-            'docutils.nodes.Node.walkabout calling dispatch_visit for %s'
-            % self.__class__.__name__)
+        reporter = visitor.document.reporter
+        if reporter.debug_flag:
+            reporter.debug(
+                'docutils.nodes.Node.walkabout calling dispatch_visit for %s'
+                % self.__class__.__name__)
         try:
             try:
                 visitor.dispatch_visit(self)
@@ -169,39 +198,68 @@ class Node(object):
             except SkipDeparture:
                 call_depart = False
             children = self.children
-            try:
-                for child in children[:]:
-                    if child.walkabout(visitor):
-                        stop = True
-                        break
-            except SkipSiblings:
-                pass
+            if children:
+                walked = self._walked_children
+                self._walked_children = children
+                try:
+                    try:
+                        for child in children:
+                            if child.walkabout(visitor):
+                                stop = True
+                                break
+                    except SkipSiblings:
+                        pass
+                finally:
+                    self._end_walk(walked)
         except SkipChildren:
             pass
         except StopTraversal:
             stop = True
         if call_depart:
-            visitor.document.reporter.debug(
-                'docutils.nodes.Node.walkabout calling dispatch_departure '
-                'for %s' % self.__class__.__name__)
+            if reporter.debug_flag:
+                reporter.debug(
+                    'docutils.nodes.Node.walkabout calling dispatch_departure '
+                    'for %s' % self.__class__.__name__)
             visitor.dispatch_departure(self)
         return stop
 
-    def _fast_traverse(self, cls):
+    _walked_children = None
+    """The `children` list iterated over by `walk()` or `walkabout()`.
+    Not modified in place but replaced by a copy (copy-on-write)."""
+
+    _node_registry = None
+    """The `NodeRegistry` of the document tree containing this element, or
+    None.  Set and cleared by the registry (`Text` nodes are not marked)."""
+
+    _position = 0
+    """Position hint: the index of this node in `parent.children` when it
+    was added or last looked up.  Verified before use by `Element.index()`
+    (insertions or removals before the node make it stale)."""
+
+    def _end_walk(self, walked):
+        """Restore `_walked_children` after iterating over the children."""
+        if walked is None:
+            del self._walked_children
+        else:
+            self._walked_children = walked
+
+    def _fast_traverse(self, cls, result=None):
         """Specialized traverse() that only supports instance checks."""
-        result = []
+        if result is None:
+            result = []
         if isinstance(self, cls):
             result.append(self)
         for child in self.children:
-            result.extend(child._fast_traverse(cls))
+            child._fast_traverse(cls, result)
         return result
 
-    def _all_traverse(self):
+    def _all_traverse(self, result=None):
         """Specialized traverse() that doesn't check for a condition."""
-        result = []
+        if result is None:
+            result = []
         result.append(self)
         for child in self.children:
-            result.extend(child._all_traverse())
+            child._all_traverse(result)
         return result
 
     def traverse(self, condition=None, include_self=True, descend=True,
@@ -240,44 +298,56 @@ class Node(object):
         and list(strong.traverse(ascend=True)) equals ::
 
             [<strong>, <#text: Foo>, <#text: Bar>, <reference>, <#text: Baz>]
+
+        The result is a list; the tree may be modified while processing
+        it.  See `iter_traverse()` for an iterator.
         """
-        if ascend:
-            siblings=True
         # Check for special argument combinations that allow using an
         # optimized version of traverse()
-        if include_self and descend and not siblings:
+        if include_self and descend and not (siblings or ascend):
             if condition is None:
                 return self._all_traverse()
             elif isinstance(condition, (types.ClassType, type)):
                 return self._fast_traverse(condition)
+        return list(self.iter_traverse(condition, include_self, descend,
+                                       siblings, ascend))
+
+    def iter_traverse(self, condition=None, include_self=True, descend=True,
+                      siblings=False, ascend=False):
+        """
+        Return an iterator over the nodes `traverse()` (which see) returns.
+
+        The nodes are looked up one after the other, without recursion or
+        intermediate lists, which is cheaper if only some of them are
+        used.  The tree must not be modified during the iteration.
+        """
+        if ascend:
+            siblings=True
         # Check if `condition` is a class (check for TypeType for Python
         # implementations that use only new-style classes, like PyPy).
         if isinstance(condition, (types.ClassType, type)):
             node_class = condition
             def condition(node, node_class=node_class):
                 return isinstance(node, node_class)
-        r = []
-        if include_self and (condition is None or condition(self)):
-            r.append(self)
-        if descend and len(self.children):
-            for child in self:
-                r.extend(child.traverse(include_self=True, descend=True,
-                                        siblings=False, ascend=False,
-                                        condition=condition))
-        if siblings or ascend:
+        if include_self:
+            nodes = [self]
+        elif descend:
+            nodes = self.children
+        else:
+            nodes = ()
+        for node in _iter_nodes(nodes, condition, descend):
+            yield node
+        if siblings:
             node = self
             while node.parent:
                 index = node.parent.index(node)
-                for sibling in node.parent[index+1:]:
-                    r.extend(sibling.traverse(include_self=True,
-                                              descend=descend,
-                                              siblings=False, ascend=False,
-                                              condition=condition))
+                for sibling in _iter_nodes(node.parent[index+1:],
+                                           condition, descend):
+                    yield sibling
                 if not ascend:
                     break
                 else:
                     node = node.parent
-        return r
 
     def next_node(self, condition=None, include_self=False, descend=True,
                   siblings=False, ascend=False):
@@ -288,13 +358,29 @@ class Node(object):
         Parameter list is the same as of traverse.  Note that
         include_self defaults to 0, though.
         """
-        iterable = self.traverse(condition=condition,
-                                 include_self=include_self, descend=descend,
-                                 siblings=siblings, ascend=ascend)
-        try:
-            return iterable[0]
-        except IndexError:
-            return None
+        for node in self.iter_traverse(condition=condition,
+                                       include_self=include_self,
+                                       descend=descend, siblings=siblings,
+                                       ascend=ascend):
+            return node
+        return None
+
+
+def _iter_nodes(nodes, condition, descend):
+    """
+    Generate `nodes` (and their descendants if `descend` is true) in tree
+    traversal order, skipping nodes for which `condition` is false.
+    """
+    stack = [iter(nodes)]
+    while stack:
+        for node in stack[-1]:
+            if condition is None or condition(node):
+                yield node
+            if descend and node.children:
+                stack.append(iter(node.children))
+                break
+        else:
+            stack.pop()
 
 if sys.version_info < (3,):
     class reprunicode(unicode):
@@ -457,7 +543,16 @@ class Element(Node):
     child_text_separator = '\n\n'
     """Separator for child nodes, used by `astext()` method."""
 
+    if compact_nodes:
+        __slots__ = ('rawsource', 'children', 'attributes', 'parent',
+                     'document', 'source', 'line', '_walked_children',
+                     '_position', '_node_registry')
+
     def __init__(self, rawsource='', *children, **attributes):
+        if compact_nodes:
+            self._init_compact(rawsource, children, attributes)
+            return
+
         self.rawsource = rawsource
         """The raw text from which this element was constructed."""
 
@@ -484,6 +579,48 @@ class Element(Node):
         if self.tagname is None:
             self.tagname = self.__class__.__name__
 
+    def _init_compact(self, rawsource, children, attributes):
+        """Initialize a compact element (see `compact_nodes`)."""
+        self.rawsource = rawsource
+        self.parent = self.document = self.source = self.line = None
+        self._walked_children = None
+        self._position = 0
+        self._node_registry = None
+        self.children = []
+        self.extend(children)
+        self.attributes = atts = _CompactAttributes()
+        if self.list_attributes is not Element.list_attributes:
+            for att in self.list_attributes:
+                if att not in _CompactAttributes.lazy_attributes:
+                    atts[att] = []
+        for att, value in attributes.items():
+            att = att.lower()
+            if isinstance(att, str):
+                att = intern(att)
+            if att in self.list_attributes:
+                atts[att] = value[:]
+            else:
+                atts[att] = value
+        if self.__class__ not in _class_tagnames:
+            _set_class_tagname(self.__class__)
+
+    if compact_nodes:
+        def _end_walk(self, walked):
+            self._walked_children = walked
+
+    def __getstate__(self):
+        """Return the instance attributes (including slots) for pickling."""
+        state = self.__dict__.copy()
+        if compact_nodes:
+            for name in Element.__slots__:
+                state[name] = getattr(self, name)
+        state['_node_registry'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def _dom_node(self, domroot):
         element = domroot.createElement(self.tagname)
         for attribute, value in self.attlist():
@@ -578,13 +715,27 @@ class Element(Node):
         if isinstance(key, basestring):
             self.attributes[str(key)] = item
         elif isinstance(key, int):
+            self._unregister([self.children[key]])
             self.setup_child(item)
+            if self.children is self._walked_children:
+                self.children = self.children[:]
             self.children[key] = item
+            if key < 0:
+                key += len(self.children)
+            item._position = key
+            self._register(item)
         elif isinstance(key, types.SliceType):
             assert key.step in (None, 1), 'cannot handle slice with stride'
-            for node in item:
+            self._unregister(self.children[key.start:key.stop])
+            start = slice(key.start, key.stop).indices(len(self.children))[0]
+            for position, node in enumerate(item):
                 self.setup_child(node)
+                node._position = start + position
+            if self.children is self._walked_children:
+                self.children = self.children[:]
             self.children[key.start:key.stop] = item
+            for node in item:
+                self._register(node)
         else:
             raise TypeError, ('element index must be an integer, a slice, or '
                               'an attribute name string')
@@ -593,9 +744,15 @@ class Element(Node):
         if isinstance(key, basestring):
             del self.attributes[key]
         elif isinstance(key, int):
+            self._unregister([self.children[key]])
+            if self.children is self._walked_children:
+                self.children = self.children[:]
             del self.children[key]
         elif isinstance(key, types.SliceType):
             assert key.step in (None, 1), 'cannot handle slice with stride'
+            self._unregister(self.children[key.start:key.stop])
+            if self.children is self._walked_children:
+                self.children = self.children[:]
             del self.children[key.start:key.stop]
         else:
             raise TypeError, ('element index must be an integer, a simple '
@@ -666,7 +823,11 @@ class Element(Node):
 
     def append(self, item):
         self.setup_child(item)
+        if self.children is self._walked_children:
+            self.children = self.children[:]
+        item._position = len(self.children)
         self.children.append(item)
+        self._register(item)
 
     def extend(self, item):
         for node in item:
@@ -675,18 +836,70 @@ class Element(Node):
     def insert(self, index, item):
         if isinstance(item, Node):
             self.setup_child(item)
+            if self.children is self._walked_children:
+                self.children = self.children[:]
             self.children.insert(index, item)
+            if index >= 0:
+                item._position = index
+            self._register(item)
         elif item is not None:
             self[index:index] = item
 
     def pop(self, i=-1):
-        return self.children.pop(i)
+        if self.children is self._walked_children:
+            self.children = self.children[:]
+        item = self.children.pop(i)
+        self._unregister([item])
+        return item
 
     def remove(self, item):
+        if self.children is self._walked_children:
+            self.children = self.children[:]
         self.children.remove(item)
+        self._unregister([item])
+
+    def _register(self, item):
+        """
+        Register the new child `item` with the registry of `self`.  An
+        element moved from a registered tree without removal is unregistered
+        from the old registry.
+        """
+        registry = self._node_registry
+        if registry is not None:
+            registry.add(item)
+        elif item._node_registry is not None:
+            item._node_registry.discard(item)
+
+    def _unregister(self, children):
+        """Unregister the former `children` of `self` from its registry."""
+        registry = self._node_registry
+        if registry is not None:
+            for child in children:
+                if child.parent is self:
+                    registry.discard(child)
 
     def index(self, item):
-        return self.children.index(item)
+        """
+        Return the position of the child `item`.
+
+        The position hint of `item` is tried first (constant time); the
+        children list is only searched if the hint is stale.  Of several
+        equal Text nodes, the position of `item` itself is returned.
+        """
+        children = self.children
+        position = getattr(item, '_position', 0)
+        if position < len(children) and children[position] is item:
+            return position
+        position = children.index(item)
+        if children[position] is not item:
+            # an equal Text node; look for `item` itself
+            for i in range(position + 1, len(children)):
+                if children[i] is item:
+                    position = i
+                    break
+        if isinstance(item, Node):
+            item._position = position
+        return position
 
     def is_not_default(self, key):
         if self[key] == [] and key in self.list_attributes:
@@ -921,6 +1134,7 @@ class Element(Node):
                              and_source = and_source)
 
     def clear(self):
+        self._unregister(self.children)
         self.children = []
 
     def replace(self, old, new):
@@ -932,10 +1146,50 @@ class Element(Node):
         elif new is not None:
             self[index:index+1] = new
 
-    def replace_self(self, new):
+    def replace_children(self, replacements):
         """
-        Replace `self` node with `new`, where `new` is a node or a
-        list of nodes.
+        Replace several children in one pass over the children list.
+
+        `replacements` is a sequence of ``(old, new)`` pairs, where `new` is
+        a node or a list of nodes (see `replace()`).  Unlike a series of
+        `replace()` calls, the cost does not grow with the number of
+        replacements times the number of children.
+        """
+        new_nodes = {}
+        for old, new in replacements:
+            if isinstance(new, Node):
+                new = [new]
+            elif new is None:
+                continue
+            new_nodes[id(old)] = new
+        children = []
+        replaced = 0
+        for child in self.children:
+            new = new_nodes.get(id(child))
+            if new is None:
+                children.append(child)
+            else:
+                replaced += 1
+                for node in new:
+                    self.setup_child(node)
+                children.extend(new)
+        if replaced != len(new_nodes):
+            raise ValueError('Element.replace_children(): '
+                             'node to replace is not a child')
+        for position, child in enumerate(children):
+            child._position = position
+        self._unregister([old for old, new in replacements
+                          if id(old) in new_nodes])
+        for new in new_nodes.values():
+            for node in new:
+                self._register(node)
+        # a new list: walks over the old one are not disturbed
+        self.children = children
+
+    def transfer_basic_atts(self, new):
+        """
+        Copy the basic attributes of `self` to its replacement `new`, a node
+        or a list of nodes (whose first node is updated).
         """
         update = new
         if not isinstance(new, Node):
@@ -952,6 +1206,13 @@ class Element(Node):
             for att in self.basic_attributes:
                 assert not self[att], \
                        'Losing "%s" attribute: %s' % (att, self[att])
+
+    def replace_self(self, new):
+        """
+        Replace `self` node with `new`, where `new` is a node or a
+        list of nodes.
+        """
+        self.transfer_basic_atts(new)
         self.parent.replace(self, new)
 
     def first_child_matching_class(self, childclass, start=0, end=sys.maxint):
@@ -1050,6 +1311,189 @@ class Element(Node):
         return attr not in cls.known_attributes
 
 
+class _CompactAttributes(dict):
+
+    """
+    Attribute dictionary of compact elements (see `compact_nodes`).
+
+    The list attributes of `Element` are created when they are first
+    looked up, so that elements without IDs, classes or names do not carry
+    five empty lists each.  Until then they are not listed by `keys()`,
+    `items()` etc., which is harmless as only non-empty list attributes are
+    significant (cf. `Element.is_not_default()`).
+    """
+
+    __slots__ = ()
+
+    lazy_attributes = Element.list_attributes
+    """Attributes created on demand, as empty lists."""
+
+    def __missing__(self, key):
+        if key in self.lazy_attributes:
+            value = self[key] = []
+            return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.lazy_attributes
+
+    has_key = __contains__
+
+    def __delitem__(self, key):
+        if dict.__contains__(self, key) or key not in self.lazy_attributes:
+            dict.__delitem__(self, key)
+
+    def get(self, key, failobj=None):
+        if key in self:
+            return self[key]
+        return failobj
+
+    def setdefault(self, key, failobj=None):
+        if key in self:
+            return self[key]
+        self[key] = failobj
+        return failobj
+
+    def copy(self):
+        return self.__class__(self)
+
+
+_class_tagnames = {}
+"""Compact element classes with a `tagname`, mapped to True if it was set
+by `_set_class_tagname()`."""
+
+def _set_class_tagname(cls):
+    """
+    Store the tag name of compact elements on their class.
+
+    The result is the same as for the instance attribute set by
+    `Element.__init__()` in the default mode.
+    """
+    for base in cls.__mro__:
+        if 'tagname' in base.__dict__ and not _class_tagnames.get(base):
+            tagname = base.__dict__['tagname']
+            break
+    else:
+        tagname = None
+    if tagname is None:
+        cls.tagname = cls.__name__
+        _class_tagnames[cls] = True
+    else:
+        _class_tagnames[cls] = False
+
+
+class NodeRegistry(object):
+
+    """
+    Index of the nodes of a document tree by class, kept up to date by the
+    `Element` methods that add or remove children.
+
+    Enabled with `document.enable_node_registry()`.  `find()` returns the
+    instances of a class without a walk over the whole tree.  Modifying the
+    `children` lists directly bypasses the registry.
+
+    The registered elements refer to the registry (`Node._node_registry`),
+    so that modifications of other trees do not look for a registry.
+    Nodes are held by weak references: a node detached by a direct
+    modification of a `children` list drops out when it is freed.
+    """
+
+    fallback_ratio = 8
+    """`find()` gives up if more than 1/`fallback_ratio` of all nodes match
+    (sorting them would be slower than a tree walk)."""
+
+    def __init__(self, document):
+        self.document = document
+
+        self.by_class = {}
+        """Mapping of node classes to ``{id(node): node}`` mappings
+        (`weakref.WeakValueDictionary` instances)."""
+
+        self.subclasses = {}
+        """Cache: mapping of classes to the registered classes derived
+        from them."""
+
+        self.add(document)
+
+    def __len__(self):
+        """Return the number of registered nodes."""
+        return sum([len(members) for members in self.by_class.values()])
+
+    def add(self, node):
+        """Register `node` and its descendants."""
+        by_class = self.by_class
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            try:
+                by_class[node.__class__][id(node)] = node
+            except KeyError:
+                by_class[node.__class__] = weakref.WeakValueDictionary(
+                    {id(node): node})
+                self.subclasses.clear()
+            if isinstance(node, Element):
+                node._node_registry = self
+                for child in node.children:
+                    if child.parent is node:
+                        stack.append(child)
+
+    def discard(self, node):
+        """Unregister `node` and its descendants."""
+        by_class = self.by_class
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            members = by_class.get(node.__class__)
+            if members is not None:
+                # a live node's id is not shared with another live node
+                members.pop(id(node), None)
+            if isinstance(node, Element):
+                if node._node_registry is self:
+                    node._node_registry = None
+                for child in node.children:
+                    if child.parent is node:
+                        stack.append(child)
+
+    def find(self, cls):
+        """
+        Return the registered instances of `cls` in document order, like
+        ``document.traverse(cls)``.  Return None if the nodes are better
+        found with a tree walk.
+        """
+        try:
+            classes = self.subclasses[cls]
+        except KeyError:
+            classes = self.subclasses[cls] = [
+                registered for registered in self.by_class
+                if issubclass(registered, cls)]
+        found = []
+        for registered in classes:
+            found.extend(self.by_class[registered].values())
+        if len(found) * self.fallback_ratio > len(self):
+            return None
+        try:
+            decorated = [(self.path(node), node) for node in found]
+        except (AttributeError, ValueError):
+            # the registry is out of date (children modified directly)
+            return None
+        decorated.sort(key=lambda item: item[0])
+        return [node for path, node in decorated]
+
+    def path(self, node):
+        """Return the list of child positions from the document to `node`."""
+        document = self.document
+        path = []
+        while node is not document:
+            parent = node.parent
+            position = parent.index(node)
+            if parent.children[position] is not node:
+                raise ValueError('node not in tree')
+            path.append(position)
+            node = parent
+        path.reverse()
+        return path
+
+
 class TextElement(Element):
 
     """
@@ -1253,17 +1697,43 @@ class document(Root, Structural, Element):
         self.decoration = None
         """Document's `decoration` node."""
 
+        self.node_registry = None
+        """`NodeRegistry` of the document tree, or None (see
+        `enable_node_registry()`)."""
+
         self.document = self
 
     def __getstate__(self):
         """
         Return dict with unpicklable references removed.
         """
-        state = self.__dict__.copy()
+        state = Element.__getstate__(self)
         state['reporter'] = None
         state['transformer'] = None
+        state['node_registry'] = None   # weak references
         return state
 
+    def enable_node_registry(self):
+        """
+        Maintain an index of the nodes by class (a `NodeRegistry`), so that
+        ``self.traverse(cls)`` takes time proportional to the number of
+        matches instead of the size of the tree.
+        """
+        if self.node_registry is None:
+            self.node_registry = NodeRegistry(self)
+
+    def disable_node_registry(self):
+        if self.node_registry is not None:
+            self.node_registry.discard(self)
+            self.node_registry = None
+
+    def _fast_traverse(self, cls, result=None):
+        if result is None and self.node_registry is not None:
+            found = self.node_registry.find(cls)
+            if found is not None:
+                return found
+        return Element._fast_traverse(self, cls, result)
+
     def asdom(self, dom=None):
         """Return a DOM representation of this document."""
         if dom is None:
@@ -1826,6 +2296,14 @@ node_class_names = """
 """A list of names of all concrete Node subclasses."""
 
 
+_visit_tables = {}
+_departure_tables = {}
+"""Dispatch tables of `NodeVisitor.dispatch_visit()` and
+`NodeVisitor.dispatch_departure()`: mappings of visitor classes to mappings
+of node classes to ``(method name, function)`` pairs (function None: look
+the method up on the visitor instance)."""
+
+
 class NodeVisitor:
 
     """
@@ -1874,11 +2352,22 @@ class NodeVisitor:
         parameter.  If the ``visit_...`` method does not exist, call
         self.unknown_visit.
         """
-        node_name = node.__class__.__name__
-        method = getattr(self, 'visit_' + node_name, self.unknown_visit)
-        self.document.reporter.debug(
-            'docutils.nodes.NodeVisitor.dispatch_visit calling %s for %s'
-            % (method.__name__, node_name))
+        try:
+            name, function = _visit_tables[self.__class__][node.__class__]
+        except KeyError:
+            name, function = _lookup_method(_visit_tables, self.__class__,
+                                            'visit_', node.__class__)
+        if function is None or name in self.__dict__:
+            method = getattr(self, name, self.unknown_visit)
+        else:
+            method = None
+        reporter = self.document.reporter
+        if reporter.debug_flag:
+            reporter.debug(
+                'docutils.nodes.NodeVisitor.dispatch_visit calling %s for %s'
+                % ((method or function).__name__, node.__class__.__name__))
+        if method is None:
+            return function(self, node)
         return method(node)
 
     def dispatch_departure(self, node):
@@ -1887,11 +2376,23 @@ class NodeVisitor:
         parameter.  If the ``depart_...`` method does not exist, call
         self.unknown_departure.
         """
-        node_name = node.__class__.__name__
-        method = getattr(self, 'depart_' + node_name, self.unknown_departure)
-        self.document.reporter.debug(
-            'docutils.nodes.NodeVisitor.dispatch_departure calling %s for %s'
-            % (method.__name__, node_name))
+        try:
+            name, function = _departure_tables[self.__class__][node.__class__]
+        except KeyError:
+            name, function = _lookup_method(_departure_tables, self.__class__,
+                                            'depart_', node.__class__)
+        if function is None or name in self.__dict__:
+            method = getattr(self, name, self.unknown_departure)
+        else:
+            method = None
+        reporter = self.document.reporter
+        if reporter.debug_flag:
+            reporter.debug(
+                'docutils.nodes.NodeVisitor.dispatch_departure calling %s '
+                'for %s' % ((method or function).__name__,
+                            node.__class__.__name__))
+        if method is None:
+            return function(self, node)
         return method(node)
 
     def unknown_visit(self, node):
@@ -1964,6 +2465,32 @@ def _call_default_departure(self, node):
 def _nop(self, node):
     pass
 
+def _lookup_method(tables, visitor_class, prefix, node_class):
+    """
+    Return the name and function of the method of `visitor_class` handling
+    `node_class` (`prefix` + node class name) and store them in the
+    dispatch table of `visitor_class` in `tables`.  The function is None if
+    the class has no such plain method (it may still be provided by the
+    instance or by `__getattr__()`).
+    """
+    name = prefix + node_class.__name__
+    function = getattr(visitor_class, name, None)
+    if isinstance(function, types.MethodType) and function.im_self is None:
+        function = function.im_func
+    else:
+        function = None
+    tables.setdefault(visitor_class, {})[node_class] = name, function
+    return name, function
+
+def clear_dispatch_tables():
+    """
+    Clear the cached visitor methods of all visitor classes.  Call after
+    adding, changing, or removing ``visit_...``/``depart_...`` methods of a
+    visitor class that has already been used.
+    """
+    _visit_tables.clear()
+    _departure_tables.clear()
+
 def _add_node_class_names(names):
     """Save typing with dynamic assignments:"""
     for _name in names:
@@ -1971,6 +2498,7 @@ def _add_node_class_names(names):
         setattr(GenericNodeVisitor, "depart_" + _name, _call_default_departure)
         setattr(SparseNodeVisitor, 'visit_' + _name, _nop)
         setattr(SparseNodeVisitor, 'depart_' + _name, _nop)
+    clear_dispatch_tables()
 
 _add_node_class_names(node_class_names)
 
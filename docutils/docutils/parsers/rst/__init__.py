@@ -64,16 +64,19 @@ further implicit hyperlinks, like "RFC 2822".  This can be done by subclassing
 subclass.  See `states.Inliner.implicit_inline()` for details.  Explicit
 inline markup can be customized in a `states.Inliner` subclass via the
 ``patterns.initial`` and ``dispatch`` attributes (and new methods as
-appropriate).
+appropriate).  New methods may also be registered in ``scan_dispatch`` to
+benefit from the position-based scanning of `states.Inliner.parse()`.
 """
 
 __docformat__ = 'reStructuredText'
 
 
+import re
 import docutils.parsers
 import docutils.statemachine
-from docutils.parsers.rst import states
+from docutils.parsers.rst import states, languages, directives
 from docutils import frontend, nodes, Component
+from docutils.utils import instrumentation, fetcher
 from docutils.transforms import universal
 
 
@@ -138,22 +141,54 @@ class Parser(docutils.parsers.Parser):
           ['--syntax-highlight'],
           {'choices': ['long', 'short', 'none'],
            'default': 'long', 'metavar': '<format>'}),
+         ('Keep the Pygments tokens of parsed code in <directory> and reuse '
+          'them for identical code (also in later runs).',
+          ['--code-cache'], {'metavar': '<directory>'}),
+         ('Keep the resources fetched by the "url" option of the '
+          '"csv-table" and "raw" directives in <directory>.  Cached '
+          'resources are revalidated with conditional requests.',
+          ['--url-cache'], {'metavar': '<directory>'}),
+         ('Timeout in seconds for fetching remote resources (default: '
+          'the system socket timeout).',
+          ['--url-timeout'], {'metavar': '<seconds>', 'type': 'float'}),
+         ('Do not connect to the network: use cached remote resources '
+          'only (see --url-cache).',
+          ['--url-offline'],
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Fetch the remote resources of a document concurrently before '
+          'parsing it.',
+          ['--url-prefetch'],
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Fetch remote resources one by one, when they are used. '
+          '(default)',
+          ['--no-url-prefetch'],
+          {'action': 'store_false', 'dest': 'url_prefetch'}),
          ('Change straight quotation marks to typographic form: '
           'one of "yes", "no", "alt[ernative]" (default "no").',
           ['--smart-quotes'],
           {'default': False, 'validator': frontend.validate_ternary}),
+         ('Write parser statistics to <file> (tab-separated values): '
+          'transition attempts and matches, time per transition, '
+          'directive class, nesting depth, and in inline markup parsing.',
+          ['--parse-profile'], {'metavar': '<file>'}),
         ))
 
+    relative_path_settings = ('parse_profile', 'code_cache', 'url_cache')
+
     config_section = 'restructuredtext parser'
     config_section_dependencies = ('parsers',)
 
-    def __init__(self, rfc2822=False, inliner=None):
+    def __init__(self, rfc2822=False, inliner=None, profile=None):
         if rfc2822:
             self.initial_state = 'RFC2822Body'
         else:
             self.initial_state = 'Body'
         self.state_classes = states.state_classes
         self.inliner = inliner
+        self.profile = profile
+        """A `docutils.utils.instrumentation.ParseProfile` to record
+        statistics in (with observers, see `ParseProfile.attach_observer()`),
+        or None.  One is created if the "parse_profile" setting is set."""
 
     def get_transforms(self):
         return Component.get_transforms(self) + [
@@ -169,9 +204,90 @@ class Parser(docutils.parsers.Parser):
         inputlines = docutils.statemachine.string2lines(
               inputstring, tab_width=document.settings.tab_width,
               convert_whitespace=True)
-        self.statemachine.run(inputlines, document, inliner=self.inliner)
+        urls = []
+        if getattr(document.settings, 'url_prefetch', None):
+            urls = self.remote_resources(inputlines, document.settings)
+            if urls:
+                fetcher.get_fetcher(document.settings).prefetch(urls)
+        profile_path = getattr(document.settings, 'parse_profile', None)
+        profile = self.profile
+        if profile is None and profile_path:
+            profile = instrumentation.ParseProfile()
+        self.statemachine.profile = profile
+        try:
+            self.statemachine.run(inputlines, document, inliner=self.inliner)
+        finally:
+            if urls:
+                # unused prefetched responses are not kept for later
+                # documents
+                fetcher.get_fetcher(document.settings).discard(urls)
+        if profile_path:
+            profile.write_report(profile_path)
         self.finish_parse()
 
+    url_directives = ('csv-table', 'raw')
+    """Canonical names of the directives with a "url" option."""
+
+    directive_pattern = re.compile(r'\s*\.\.\s+(\S+?)\s*::')
+    url_option_pattern = re.compile(r'\s+:url:\s*(.+)')
+    comment_pattern = re.compile(r'\s*\.\.(\s|$)')
+
+    def remote_resources(self, inputlines, settings):
+        """
+        Return the URLs of the "url" options of the directives in
+        `inputlines` (for the `fetcher`; the directives are not parsed, so
+        the result may be incomplete).  Literal blocks and comments are
+        skipped.
+        """
+        if not settings.file_insertion_enabled:
+            return []
+        wanted = list(self.url_directives)
+        if not settings.raw_enabled:
+            wanted.remove('raw')
+        names = dict([(name, name) for name in wanted])
+        language = languages.get_language(settings.language_code)
+        if language is not None:
+            for name, canonical in language.directives.items():
+                if canonical in wanted:
+                    names[name.lower()] = canonical
+        urls = []
+        in_directive = False
+        url = None
+        skip = None         # indentation of a skipped literal block/comment
+        for line in inputlines + ['']:
+            stripped = line.strip()
+            indent = len(line) - len(line.lstrip())
+            if skip is not None:
+                if not stripped or indent > skip:
+                    continue
+                skip = None
+            if url is not None and (not stripped or stripped[0] == ':'
+                                    or stripped.startswith('..')):
+                url = directives.uri(' '.join(url))
+                if url not in urls:
+                    urls.append(url)
+                url = None
+            match = self.directive_pattern.match(line)
+            if match:
+                in_directive = match.group(1).lower() in names
+                continue
+            if stripped.endswith('::') or self.comment_pattern.match(line):
+                # the indented lines that follow are a literal block or
+                # the comment text (or a target, footnote, ...)
+                skip = indent
+                in_directive = False
+            elif not stripped:
+                # options precede the first blank line
+                in_directive = False
+            elif url is not None:
+                # continuation line of the option value
+                url.append(stripped)
+            elif in_directive:
+                match = self.url_option_pattern.match(line)
+                if match:
+                    url = [match.group(1)]
+        return urls
+
 
 class DirectiveError(Exception):
 
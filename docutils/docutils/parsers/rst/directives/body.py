@@ -17,6 +17,7 @@ from docutils.parsers.rst import Directive
 from docutils.parsers.rst import directives
 from docutils.parsers.rst.roles import set_classes
 from docutils.utils.code_analyzer import Lexer, LexerError, NumberLines
+from docutils.utils.code_analyzer import get_token_cache
 
 class BasePseudoSection(Directive):
 
@@ -144,9 +145,12 @@ class CodeBlock(Directive):
             classes.extend(self.options['classes'])
 
         # set up lexical analyzer
+        settings = self.state.document.settings
         try:
             tokens = Lexer(u'\n'.join(self.content), language,
-                           self.state.document.settings.syntax_highlight)
+                           settings.syntax_highlight,
+                           get_token_cache(getattr(settings, 'code_cache',
+                                                   None)))
         except LexerError, error:
             raise self.warning(error)
 
@@ -16,15 +16,7 @@ from docutils.parsers.rst import Directive
 from docutils.parsers.rst import directives, states
 from docutils.nodes import fully_normalize_name, whitespace_normalize_name
 from docutils.parsers.rst.roles import set_classes
-try: # check for the Python Imaging Library
-    import PIL.Image
-except ImportError:
-    try:  # sometimes PIL modules are put in PYTHONPATH's root
-        import Image
-        class PIL(object): pass  # dummy wrapper
-        PIL.Image = Image
-    except ImportError:
-        PIL = None
+from docutils.utils.image_info import PIL, get_image_info
 
 class Image(Directive):
 
@@ -127,15 +119,16 @@ class Figure(Image):
             if PIL and self.state.document.settings.file_insertion_enabled:
                 imagepath = urllib.url2pathname(image_node['uri'])
                 try:
-                    img = PIL.Image.open(
-                            imagepath.encode(sys.getfilesystemencoding()))
-                except (IOError, UnicodeEncodeError):
+                    info = get_image_info(
+                        imagepath.encode(sys.getfilesystemencoding()),
+                        getattr(self.state.document.settings,
+                                'image_cache', None))
+                except (IOError, OSError, UnicodeEncodeError):
                     pass # TODO: warn?
                 else:
                     self.state.document.settings.record_dependencies.add(
                         imagepath.replace('\\', '/'))
-                    figure_node['width'] = '%dpx' % img.size[0]
-                    del img
+                    figure_node['width'] = '%dpx' % info['size'][0]
         elif figwidth is not None:
             figure_node['width'] = figwidth
         if figclasses:
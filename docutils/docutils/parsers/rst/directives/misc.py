@@ -13,6 +13,8 @@ import time
 from docutils import io, nodes, statemachine, utils
 from docutils.utils.error_reporting import SafeString, ErrorString
 from docutils.utils.error_reporting import locale_encoding
+from docutils.utils import fetcher
+from docutils.utils.result_cache import ResultCache
 from docutils.parsers.rst import Directive, convert_directive_function
 from docutils.parsers.rst import directives, roles, states
 from docutils.parsers.rst.directives.body import CodeBlock, NumberLines
@@ -50,6 +52,26 @@ class Include(Directive):
     standard_include_path = os.path.join(os.path.dirname(states.__file__),
                                          'include')
 
+    cache = ResultCache(size=200)
+    """Decoded content of included files, shared by all documents (see
+    `cache_key()`).  Entries are ``[text, lines]`` lists, `lines` maps tab
+    widths to the text split by `statemachine.string2lines()`.  Set to
+    None to disable caching."""
+
+    def cache_key(self, path, encoding, error_handler):
+        """
+        Return the `cache` key (a tuple of strings) for the included file
+        `path` or None if the file cannot be found (reported when opening
+        it).  The tab width is not part of the key: it only affects the
+        split lines, which are stored per tab width in the entry.
+        """
+        try:
+            stat = os.stat(path)
+        except (OSError, UnicodeError):
+            return None
+        return (os.path.abspath(path), repr(stat.st_mtime),
+                str(stat.st_size), encoding or '', error_handler)
+
     def run(self):
         """Include a file as part of the content of this reST file."""
         if not self.state.document.settings.file_insertion_enabled:
@@ -68,11 +90,17 @@ class Include(Directive):
         e_handler=self.state.document.settings.input_encoding_error_handler
         tab_width = self.options.get(
             'tab-width', self.state.document.settings.tab_width)
+        entry = cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key(path, encoding, e_handler)
+            if cache_key is not None:
+                entry = self.cache.get(cache_key)
         try:
             self.state.document.settings.record_dependencies.add(path)
-            include_file = io.FileInput(source_path=path,
-                                        encoding=encoding,
-                                        error_handler=e_handler)
+            if entry is None:
+                include_file = io.FileInput(source_path=path,
+                                            encoding=encoding,
+                                            error_handler=e_handler)
         except UnicodeEncodeError, error:
             raise self.severe(u'Problems with "%s" directive path:\n'
                               'Cannot encode input file path "%s" '
@@ -81,17 +109,20 @@ class Include(Directive):
         except IOError, error:
             raise self.severe(u'Problems with "%s" directive path:\n%s.' %
                       (self.name, ErrorString(error)))
+        if entry is None:
+            try:
+                entry = [include_file.read(), {}]
+            except UnicodeError, error:
+                raise self.severe(u'Problem with "%s" directive:\n%s' %
+                                  (self.name, ErrorString(error)))
+            if cache_key is not None:
+                self.cache.put(cache_key, entry)
+        rawtext = entry[0]
         startline = self.options.get('start-line', None)
         endline = self.options.get('end-line', None)
-        try:
-            if startline or (endline is not None):
-                lines = include_file.readlines()
-                rawtext = ''.join(lines[startline:endline])
-            else:
-                rawtext = include_file.read()
-        except UnicodeError, error:
-            raise self.severe(u'Problem with "%s" directive:\n%s' %
-                              (self.name, ErrorString(error)))
+        if startline or (endline is not None):
+            lines = rawtext.splitlines(True)
+            rawtext = ''.join(lines[startline:endline])
         # start-after/end-before: no restrictions on newlines in match-text,
         # and no restrictions on matching inside lines vs. line boundaries
         after_text = self.options.get('start-after', None)
@@ -111,8 +142,16 @@ class Include(Directive):
                                   'directive:\nText not found.' % self.name)
             rawtext = rawtext[:before_index]
 
-        include_lines = statemachine.string2lines(rawtext, tab_width,
-                                                  convert_whitespace=True)
+        if rawtext is entry[0]:
+            # the whole file: split once per tab width
+            lines = entry[1].get(tab_width)
+            if lines is None:
+                lines = entry[1][tab_width] = statemachine.string2lines(
+                    rawtext, tab_width, convert_whitespace=True)
+            include_lines = lines[:]
+        else:
+            include_lines = statemachine.string2lines(rawtext, tab_width,
+                                                      convert_whitespace=True)
         if 'literal' in self.options:
             # Convert tabs to spaces, if `tab_width` is positive.
             if tab_width >= 0:
@@ -226,8 +265,9 @@ class Raw(Directive):
             # about 0.15 seconds to load.
             import urllib2
             try:
-                raw_text = urllib2.urlopen(source).read()
-            except (urllib2.URLError, IOError, OSError), error:
+                raw_text = fetcher.get_fetcher(
+                    self.state.document.settings).fetch(source)
+            except (urllib2.URLError, IOError, OSError, ValueError), error:
                 raise self.severe(u'Problems with "%s" directive URL "%s":\n%s.'
                     % (self.name, self.options['url'], ErrorString(error)))
             raw_file = io.StringInput(source=raw_text, source_path=source,
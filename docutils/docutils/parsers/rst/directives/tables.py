@@ -15,7 +15,7 @@ import csv
 
 from docutils import io, nodes, statemachine, utils
 from docutils.utils.error_reporting import SafeString
-from docutils.utils import SystemMessagePropagation
+from docutils.utils import SystemMessagePropagation, fetcher
 from docutils.parsers.rst import Directive
 from docutils.parsers.rst import directives
 
@@ -295,7 +295,8 @@ class CSVTable(Table):
             import urllib2
             source = self.options['url']
             try:
-                csv_text = urllib2.urlopen(source).read()
+                csv_text = fetcher.get_fetcher(
+                    self.state.document.settings).fetch(source)
             except (urllib2.URLError, IOError, OSError, ValueError), error:
                 severe = self.state_machine.reporter.severe(
                       'Problems with "%s" directive URL "%s":\n%s.'
@@ -75,7 +75,7 @@ __docformat__ = 'reStructuredText'
 from docutils import nodes, utils
 from docutils.parsers.rst import directives
 from docutils.parsers.rst.languages import en as _fallback_language_module
-from docutils.utils.code_analyzer import Lexer, LexerError
+from docutils.utils.code_analyzer import Lexer, LexerError, get_token_cache
 
 DEFAULT_INTERPRETED_ROLE = 'title-reference'
 """
@@ -324,9 +324,11 @@ def code_role(role, rawtext, text, lineno, inliner, options={}, content=[]):
         classes.extend(options['classes'])
     if language and language not in classes:
         classes.append(language)
+    settings = inliner.document.settings
     try:
         tokens = Lexer(utils.unescape(text, 1), language,
-                       inliner.document.settings.syntax_highlight)
+                       settings.syntax_highlight,
+                       get_token_cache(getattr(settings, 'code_cache', None)))
     except LexerError, error:
         msg = inliner.reporter.warning(error)
         prb = inliner.problematic(rawtext, rawtext, msg)
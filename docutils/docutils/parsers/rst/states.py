@@ -161,7 +161,8 @@ class RSTStateMachine(StateMachineWS):
                            title_styles=[],
                            section_level=0,
                            section_bubble_up_kludge=False,
-                           inliner=inliner)
+                           inliner=inliner,
+                           profile=self.profile)
         self.document = document
         self.attach_observer(document.note_source)
         self.reporter = self.memo.reporter
@@ -192,7 +193,15 @@ class NestedStateMachine(StateMachineWS):
         self.reporter = memo.reporter
         self.language = memo.language
         self.node = node
-        results = StateMachineWS.run(self, input_lines, input_offset)
+        self.profile = getattr(memo, 'profile', None)
+        if self.profile is None:
+            results = StateMachineWS.run(self, input_lines, input_offset)
+        else:
+            self.profile.begin_nested_parse()
+            try:
+                results = StateMachineWS.run(self, input_lines, input_offset)
+            finally:
+                self.profile.end_nested_parse(input_offset)
         assert results == [], ('NestedStateMachine.run() results should be '
                                'empty!')
         return results
@@ -424,6 +433,9 @@ class RSTState(StateWS):
         """
         Return 2 lists: nodes (text and inline elements), and system_messages.
         """
+        if self.state_machine.profile is not None:
+            return self.state_machine.profile.parse_inline(
+                self.inliner, text, lineno, self.memo, self.parent)
         return self.inliner.parse(text, lineno, self.memo, self.parent)
 
     def unindent_warning(self, node_name):
@@ -492,39 +504,96 @@ class Inliner:
         check it for validity.  If not found or invalid, generate a warning
         and ignore the start-string.  Implicit inline markup (e.g. standalone
         URIs) is found last.
+
+        The text is scanned once, by position: the methods in
+        `self.scan_dispatch` return the start and end index of the
+        recognized construct instead of the text before and after it.
+        Methods in `self.dispatch` without a counterpart in
+        `self.scan_dispatch` (customizations) are called with a match object
+        for the remaining text, as before.
         """
         self.reporter = memo.reporter
         self.document = memo.document
         self.language = memo.language
         self.parent = parent
-        pattern_search = self.patterns.initial.search
+        pattern = self.patterns.initial
+        anchored = self.anchored_pattern(pattern)
         dispatch = self.dispatch
-        remaining = escape2null(text)
+        scan_dispatch = self.scan_dispatch
+        text = escape2null(text)
+        pos = 0                         # where to continue the search
+        plain = 0                       # start of unprocessed text
         processed = []
         unprocessed = []
         messages = []
-        while remaining:
-            match = pattern_search(remaining)
-            if match:
-                groups = match.groupdict()
-                method = dispatch[groups['start'] or groups['backquote']
-                                  or groups['refend'] or groups['fnend']]
-                before, inlines, remaining, sysmessages = method(self, match,
-                                                                 lineno)
+        while pos < len(text):
+            match = None
+            if pos:
+                if anchored is None:
+                    # unknown pattern: search in the remaining text
+                    unprocessed.append(text[plain:pos])
+                    text = text[pos:]
+                    pos = plain = 0
+                else:
+                    # a start-string at `pos` counts as "beginning of text"
+                    match = anchored.match(text, pos)
+            if match is None:
+                match = pattern.search(text, pos)
+                if match is None:
+                    break
+            method = dispatch[match.group('start') or match.group('backquote')
+                              or match.group('refend')
+                              or match.group('fnend')]
+            scanner = scan_dispatch.get(method)
+            if scanner is None:
+                if pos:
+                    unprocessed.append(text[plain:pos])
+                    text = text[pos:]
+                    pos = plain = 0
+                    match = pattern.search(text)
+                before, inlines, text, sysmessages = method(self, match,
+                                                            lineno)
                 unprocessed.append(before)
-                messages += sysmessages
-                if inlines:
-                    processed += self.implicit_inline(''.join(unprocessed),
-                                                      lineno)
-                    processed += inlines
-                    unprocessed = []
+                start = end = 0
             else:
-                break
-        remaining = ''.join(unprocessed) + remaining
+                start, inlines, end, sysmessages = scanner(self, match, lineno)
+                unprocessed.append(text[plain:start])
+            messages += sysmessages
+            if inlines:
+                processed += self.implicit_inline(''.join(unprocessed),
+                                                  lineno)
+                processed += inlines
+                unprocessed = []
+            pos = plain = end
+        unprocessed.append(text[plain:])
+        remaining = ''.join(unprocessed)
         if remaining:
             processed += self.implicit_inline(remaining, lineno)
         return processed, messages
 
+    _anchored_patterns = {}
+
+    def anchored_pattern(self, pattern):
+        """
+        Return a variant of `pattern` (a start-string pattern like
+        `self.patterns.initial`) without the start-string prefix, or None.
+
+        A start-string following a recognized construct is preceded by the
+        "beginning of text" when the rest of the text is searched.  The
+        variant is matched at the current position to emulate this.
+        """
+        try:
+            return self._anchored_patterns[pattern]
+        except KeyError:
+            pass
+        anchored = None
+        if pattern.pattern.startswith(self.start_string_prefix):
+            anchored = re.compile(
+                '()' + pattern.pattern[len(self.start_string_prefix):],
+                pattern.flags)
+        self._anchored_patterns[pattern] = anchored
+        return anchored
+
     # Inline object recognition
     # -------------------------
     # lookahead and look-behind expressions for inline markup rules
@@ -682,7 +751,7 @@ class Inliner:
         """
         string = match.string
         start = match.start()
-        if start == 0:                  # start-string at beginning of text
+        if start == match.pos:          # start-string at beginning of text
             return False
         prestart = string[start - 1]
         try:
@@ -691,28 +760,42 @@ class Inliner:
             return True  # not "quoted" but no markup start-string either
         return punctuation_chars.match_chars(prestart, poststart)
 
-    def inline_obj(self, match, lineno, end_pattern, nodeclass,
-                   restore_backslashes=False):
+    def split_match(self, match, start, inlines, end, messages, *extra):
+        """
+        Convert the result of a ``scan_*`` method to the result of the
+        corresponding method in `self.dispatch`: return the text before
+        `start` and after `end` instead of the indices.
+        """
+        string = match.string
+        return (string[:start], inlines, string[end:], messages) + extra
+
+    def scan_inline_obj(self, match, lineno, end_pattern, nodeclass,
+                        restore_backslashes=False):
         string = match.string
         matchstart = match.start('start')
         matchend = match.end('start')
         if self.quoted_start(match):
-            return (string[:matchend], [], string[matchend:], [], '')
-        endmatch = end_pattern.search(string[matchend:])
-        if endmatch and endmatch.start(1):  # 1 or more chars
-            text = unescape(endmatch.string[:endmatch.start(1)],
+            return matchend, [], matchend, [], ''
+        endmatch = end_pattern.search(string, matchend)
+        if endmatch and endmatch.start(1) > matchend:  # 1 or more chars
+            text = unescape(string[matchend:endmatch.start(1)],
                             restore_backslashes)
-            textend = matchend + endmatch.end(1)
+            textend = endmatch.end(1)
             rawsource = unescape(string[matchstart:textend], 1)
-            return (string[:matchstart], [nodeclass(rawsource, text)],
-                    string[textend:], [], endmatch.group(1))
+            return (matchstart, [nodeclass(rawsource, text)], textend, [],
+                    endmatch.group(1))
         msg = self.reporter.warning(
               'Inline %s start-string without end-string.'
               % nodeclass.__name__, line=lineno)
         text = unescape(string[matchstart:matchend], 1)
         rawsource = unescape(string[matchstart:matchend], 1)
         prb = self.problematic(text, rawsource, msg)
-        return string[:matchstart], [prb], string[matchend:], [msg], ''
+        return matchstart, [prb], matchend, [msg], ''
+
+    def inline_obj(self, match, lineno, end_pattern, nodeclass,
+                   restore_backslashes=False):
+        return self.split_match(match, *self.scan_inline_obj(
+            match, lineno, end_pattern, nodeclass, restore_backslashes))
 
     def problematic(self, text, rawsource, message):
         msgid = self.document.set_id(message, self.parent)
@@ -721,17 +804,21 @@ class Inliner:
         message.add_backref(prbid)
         return problematic
 
+    def scan_emphasis(self, match, lineno):
+        return self.scan_inline_obj(match, lineno, self.patterns.emphasis,
+                                    nodes.emphasis)[:4]
+
     def emphasis(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
-              match, lineno, self.patterns.emphasis, nodes.emphasis)
-        return before, inlines, remaining, sysmessages
+        return self.split_match(match, *self.scan_emphasis(match, lineno))
+
+    def scan_strong(self, match, lineno):
+        return self.scan_inline_obj(match, lineno, self.patterns.strong,
+                                    nodes.strong)[:4]
 
     def strong(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
-              match, lineno, self.patterns.strong, nodes.strong)
-        return before, inlines, remaining, sysmessages
+        return self.split_match(match, *self.scan_strong(match, lineno))
 
-    def interpreted_or_phrase_ref(self, match, lineno):
+    def scan_interpreted_or_phrase_ref(self, match, lineno):
         end_pattern = self.patterns.interpreted_or_phrase_ref
         string = match.string
         matchstart = match.start('backquote')
@@ -743,10 +830,10 @@ class Inliner:
             role = role[1:-1]
             position = 'prefix'
         elif self.quoted_start(match):
-            return (string[:matchend], [], string[matchend:], [])
-        endmatch = end_pattern.search(string[matchend:])
-        if endmatch and endmatch.start(1):  # 1 or more chars
-            textend = matchend + endmatch.end()
+            return matchend, [], matchend, []
+        endmatch = end_pattern.search(string, matchend)
+        if endmatch and endmatch.start(1) > matchend:  # 1 or more chars
+            textend = endmatch.end()
             if endmatch.group('role'):
                 if role:
                     msg = self.reporter.warning(
@@ -755,10 +842,10 @@ class Inliner:
                         line=lineno)
                     text = unescape(string[rolestart:textend], 1)
                     prb = self.problematic(text, text, msg)
-                    return string[:rolestart], [prb], string[textend:], [msg]
+                    return rolestart, [prb], textend, [msg]
                 role = endmatch.group('suffix')[1:-1]
                 position = 'suffix'
-            escaped = endmatch.string[:endmatch.start(1)]
+            escaped = string[matchend:endmatch.start(1)]
             rawsource = unescape(string[matchstart:textend], 1)
             if rawsource[-1:] == '_':
                 if role:
@@ -767,21 +854,25 @@ class Inliner:
                           'reference suffix.' % position, line=lineno)
                     text = unescape(string[rolestart:textend], 1)
                     prb = self.problematic(text, text, msg)
-                    return string[:rolestart], [prb], string[textend:], [msg]
-                return self.phrase_ref(string[:matchstart], string[textend:],
-                                       rawsource, escaped, unescape(escaped))
+                    return rolestart, [prb], textend, [msg]
+                before, nodelist, after, messages = self.phrase_ref(
+                    '', '', rawsource, escaped, unescape(escaped))
+                return matchstart, nodelist, textend, messages
             else:
                 rawsource = unescape(string[rolestart:textend], 1)
                 nodelist, messages = self.interpreted(rawsource, escaped, role,
                                                       lineno)
-                return (string[:rolestart], nodelist,
-                        string[textend:], messages)
+                return rolestart, nodelist, textend, messages
         msg = self.reporter.warning(
               'Inline interpreted text or phrase reference start-string '
               'without end-string.', line=lineno)
         text = unescape(string[matchstart:matchend], 1)
         prb = self.problematic(text, text, msg)
-        return string[:matchstart], [prb], string[matchend:], [msg]
+        return matchstart, [prb], matchend, [msg]
+
+    def interpreted_or_phrase_ref(self, match, lineno):
+        return self.split_match(
+            match, *self.scan_interpreted_or_phrase_ref(match, lineno))
 
     def phrase_ref(self, before, after, rawsource, escaped, text):
         match = self.patterns.embedded_link.search(escaped)
@@ -862,14 +953,15 @@ class Inliner:
             return ([self.problematic(rawsource, rawsource, msg)],
                     messages + [msg])
 
+    def scan_literal(self, match, lineno):
+        return self.scan_inline_obj(match, lineno, self.patterns.literal,
+                                    nodes.literal, restore_backslashes=True)[:4]
+
     def literal(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
-              match, lineno, self.patterns.literal, nodes.literal,
-              restore_backslashes=True)
-        return before, inlines, remaining, sysmessages
+        return self.split_match(match, *self.scan_literal(match, lineno))
 
-    def inline_internal_target(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+    def scan_inline_internal_target(self, match, lineno):
+        start, inlines, end, sysmessages, endstring = self.scan_inline_obj(
               match, lineno, self.patterns.target, nodes.target)
         if inlines and isinstance(inlines[0], nodes.target):
             assert len(inlines) == 1
@@ -877,10 +969,14 @@ class Inliner:
             name = normalize_name(target.astext())
             target['names'].append(name)
             self.document.note_explicit_target(target, self.parent)
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
-    def substitution_reference(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+    def inline_internal_target(self, match, lineno):
+        return self.split_match(
+            match, *self.scan_inline_internal_target(match, lineno))
+
+    def scan_substitution_reference(self, match, lineno):
+        start, inlines, end, sysmessages, endstring = self.scan_inline_obj(
               match, lineno, self.patterns.substitution_ref,
               nodes.substitution_reference)
         if len(inlines) == 1:
@@ -898,18 +994,20 @@ class Inliner:
                         self.document.note_refname(reference_node)
                     reference_node += subref_node
                     inlines = [reference_node]
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
-    def footnote_reference(self, match, lineno):
+    def substitution_reference(self, match, lineno):
+        return self.split_match(
+            match, *self.scan_substitution_reference(match, lineno))
+
+    def scan_footnote_reference(self, match, lineno):
         """
         Handles `nodes.footnote_reference` and `nodes.citation_reference`
         elements.
         """
         label = match.group('footnotelabel')
         refname = normalize_name(label)
-        string = match.string
-        before = string[:match.start('whole')]
-        remaining = string[match.end('whole'):]
+        start = match.start('whole')
         if match.group('citationlabel'):
             refnode = nodes.citation_reference('[%s]_' % label,
                                                refname=refname)
@@ -932,10 +1030,20 @@ class Inliner:
                 refnode['refname'] = refname
                 self.document.note_footnote_ref(refnode)
             if utils.get_trim_footnote_ref_space(self.document.settings):
-                before = before.rstrip()
-        return (before, [refnode], remaining, [])
+                # strip trailing whitespace since the last construct
+                start = match.pos + len(
+                    match.string[match.pos:start].rstrip())
+        return start, [refnode], match.end('whole'), []
 
-    def reference(self, match, lineno, anonymous=False):
+    def footnote_reference(self, match, lineno):
+        """
+        Handles `nodes.footnote_reference` and `nodes.citation_reference`
+        elements.
+        """
+        return self.split_match(
+            match, *self.scan_footnote_reference(match, lineno))
+
+    def scan_reference(self, match, lineno, anonymous=False):
         referencename = match.group('refname')
         refname = normalize_name(referencename)
         referencenode = nodes.reference(
@@ -946,10 +1054,14 @@ class Inliner:
         else:
             referencenode['refname'] = refname
             self.document.note_refname(referencenode)
-        string = match.string
-        matchstart = match.start('whole')
-        matchend = match.end('whole')
-        return (string[:matchstart], [referencenode], string[matchend:], [])
+        return match.start('whole'), [referencenode], match.end('whole'), []
+
+    def reference(self, match, lineno, anonymous=False):
+        return self.split_match(
+            match, *self.scan_reference(match, lineno, anonymous))
+
+    def scan_anonymous_reference(self, match, lineno):
+        return self.scan_reference(match, lineno, anonymous=1)
 
     def anonymous_reference(self, match, lineno):
         return self.reference(match, lineno, anonymous=1)
@@ -1002,6 +1114,9 @@ class Inliner:
         """
         if not text:
             return []
+        combined = self.implicit_pattern()
+        if combined is not None and not combined.search(text):
+            return [nodes.Text(unescape(text), rawsource=unescape(text, 1))]
         for pattern, method in self.implicit_dispatch:
             match = pattern.search(text)
             if match:
@@ -1015,6 +1130,41 @@ class Inliner:
                     pass
         return [nodes.Text(unescape(text), rawsource=unescape(text, 1))]
 
+    _implicit_patterns = {}
+
+    def implicit_pattern(self):
+        """
+        Return a pattern matching wherever one of the patterns in
+        `self.implicit_dispatch` matches, or None.
+
+        A single search with this pattern tells `implicit_inline()` whether
+        the text contains implicit markup at all (most text does not).  None
+        is returned if there is only one pattern or the patterns cannot be
+        combined.
+        """
+        patterns = tuple([pattern for pattern, method
+                          in self.implicit_dispatch])
+        try:
+            return self._implicit_patterns[patterns]
+        except KeyError:
+            pass
+        combined = None
+        flags = dict.fromkeys([pattern.flags for pattern in patterns])
+        if len(patterns) > 1 and len(flags) == 1:
+            if patterns[0].flags & re.VERBOSE:
+                template = '(?:%s\n)'
+            else:
+                template = '(?:%s)'
+            try:
+                combined = re.compile(
+                    '|'.join([template % pattern.pattern
+                              for pattern in patterns]),
+                    patterns[0].flags)
+            except re.error:
+                pass
+        self._implicit_patterns[patterns] = combined
+        return combined
+
     dispatch = {'*': emphasis,
                 '**': strong,
                 '`': interpreted_or_phrase_ref,
@@ -1024,6 +1174,23 @@ class Inliner:
                 '|': substitution_reference,
                 '_': reference,
                 '__': anonymous_reference}
+    """Mapping of start-strings to the methods handling the construct.
+
+    The methods return the text before the construct, a list of nodes, the
+    text after the construct, and a list of system messages."""
+
+    scan_dispatch = {emphasis: scan_emphasis,
+                     strong: scan_strong,
+                     interpreted_or_phrase_ref: scan_interpreted_or_phrase_ref,
+                     literal: scan_literal,
+                     inline_internal_target: scan_inline_internal_target,
+                     footnote_reference: scan_footnote_reference,
+                     substitution_reference: scan_substitution_reference,
+                     reference: scan_reference,
+                     anonymous_reference: scan_anonymous_reference}
+    """Mapping of `dispatch` methods to their ``scan_*`` counterparts,
+    which return the start and end index of the construct in
+    ``match.string`` instead of the text before and after it."""
 
 
 def _loweralpha_to_int(s, _zero=(ord('a')-1)):
@@ -2100,7 +2267,11 @@ class Body(RSTState):
             type_name, arguments, options, content, lineno,
             content_offset, block_text, self, self.state_machine)
         try:
-            result = directive_instance.run()
+            if self.state_machine.profile is None:
+                result = directive_instance.run()
+            else:
+                result = self.state_machine.profile.run_directive(
+                    directive_instance)
         except docutils.parsers.rst.DirectiveError, error:
             msg_node = self.reporter.system_message(error.level, error.msg,
                                                     line=lineno)
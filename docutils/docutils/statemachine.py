@@ -108,7 +108,11 @@ __docformat__ = 'restructuredtext'
 
 import sys
 import re
+import time
 import types
+import bisect
+import itertools
+import weakref
 import unicodedata
 from docutils import utils
 from docutils.utils.error_reporting import ErrorOutput
@@ -174,6 +178,10 @@ class StateMachine:
         self._stderr = ErrorOutput()
         """Wrapper around sys.stderr catching en-/decoding errors"""
 
+        self.profile = None
+        """A `docutils.utils.instrumentation.ParseProfile` recording the
+        transition attempts and matches, or None."""
+
 
     def unlink(self):
         """Remove circular references to objects no longer required."""
@@ -219,6 +227,10 @@ class StateMachine:
         transitions = None
         results = []
         state = self.get_state()
+        if self.profile is None:
+            check_line = self.check_line
+        else:
+            check_line = self.profiled_check_line
         try:
             if self.debug:
                 print >>self._stderr, '\nStateMachine.run: bof transition'
@@ -235,7 +247,7 @@ class StateMachine:
                                 u'\nStateMachine.run: line (source=%r, '
                                 u'offset=%r):\n| %s'
                                 % (source, offset, self.line))
-                        context, next_state, result = self.check_line(
+                        context, next_state, result = check_line(
                             context, state, transitions)
                     except EOFError:
                         if self.debug:
@@ -442,7 +454,7 @@ class StateMachine:
         value is returned.
         """
         if transitions is None:
-            transitions =  state.transition_order
+            transitions = state.transition_order
         state_correction = None
         if self.debug:
             print >>self._stderr, (
@@ -465,6 +477,41 @@ class StateMachine:
                       % state.__class__.__name__)
             return state.no_match(context, transitions)
 
+    def profiled_check_line(self, context, state, transitions=None):
+        """
+        Like `check_line()`, recording the transition attempts and matches
+        and the time of the transition method in `self.profile`.
+        """
+        if transitions is None:
+            transitions = state.transition_order
+        profile = self.profile
+        state_name = state.__class__.__name__
+        if self.debug:
+            print >>self._stderr, (
+                  '\nStateMachine.check_line: state="%s", transitions=%r.'
+                  % (state_name, transitions))
+        for name in transitions:
+            pattern, method, next_state = state.transitions[name]
+            match = pattern.match(self.line)
+            if match:
+                if self.debug:
+                    print >>self._stderr, (
+                          '\nStateMachine.check_line: Matched transition '
+                          '"%s" in state "%s".' % (name, state_name))
+                line = self.abs_line_number()
+                start = time.time()
+                try:
+                    return method(match, context, next_state)
+                finally:
+                    profile.add_match(state_name, name, time.time() - start,
+                                      line)
+            profile.add_attempt(state_name, name)
+        if self.debug:
+            print >>self._stderr, (
+                  '\nStateMachine.check_line: No match in state "%s".'
+                  % state_name)
+        return state.no_match(context, transitions)
+
     def add_state(self, state_class):
         """
         Initialize & add a `state_class` (`State` subclass) object.
@@ -790,6 +837,8 @@ class State:
         return context, next_state, []
 
 
+
+
 class StateMachineWS(StateMachine):
 
     """
@@ -1067,7 +1116,241 @@ class SearchStateMachineWS(_SearchOverride, StateMachineWS):
     pass
 
 
-class ViewList:
+class _LineStore(object):
+
+    """
+    Backing store of `ViewList` objects: a list of lines and the source &
+    offset of each line.
+
+    The (source, offset) information is run-length encoded: a run is a
+    sequence of lines from one source with consecutive offsets, given by
+    the index of its first line and the (source, offset) pair of that line.
+    The runs are kept in blocks of at most `block_size` runs (a piece
+    table); a block stores the index of its first line (in `bases`) and the
+    indices of its runs relative to that.  Inserting or removing lines only
+    rebuilds the blocks around the change and shifts the bases of the
+    following blocks, so that the cost does not grow with the number of
+    runs before the change.
+
+    Slices of a `ViewList` share the store (see `ViewList`), the store knows
+    its views (`views`) and keeps them valid when it is changed.
+    """
+
+    block_size = 64
+    """Maximum number of runs per block."""
+
+    def __init__(self, data, starts=None, runs=None):
+        self.data = data
+        """The list of lines."""
+
+        self.bases = []
+        """Index of the first line of each block."""
+
+        self.blocks = []
+        """(starts, runs) of each block: the index of the first line of
+        each run, relative to the block's base, and its (source, offset)."""
+
+        self.views = weakref.WeakValueDictionary()
+        """The `ViewList` objects using this store, by id."""
+
+        self.exposed = False
+        """True if `data` was handed out by `ViewList.data`: its changes
+        cannot be tracked, so views get a copy."""
+
+        self.set_runs(starts or [], runs or [])
+
+    def set_runs(self, starts, runs):
+        """Set the source info from the lists of all `starts` and `runs`."""
+        size = self.block_size
+        self.bases = starts[::size]
+        self.blocks = [([first - base for first in starts[k:k+size]],
+                        runs[k:k+size])
+                       for base, k in zip(self.bases,
+                                          range(0, len(starts), size))]
+
+    def _get_starts(self):
+        starts = []
+        for base, (block_starts, block_runs) in zip(self.bases, self.blocks):
+            starts.extend([base + first for first in block_starts])
+        return starts
+
+    starts = property(_get_starts, doc="""Index of the first line of each
+        run (all blocks).""")
+
+    def _get_runs(self):
+        runs = []
+        for block_starts, block_runs in self.blocks:
+            runs.extend(block_runs)
+        return runs
+
+    runs = property(_get_runs, doc="""(source, offset) of the first line of
+        each run (all blocks).""")
+
+    def register(self, view):
+        self.views[id(view)] = view
+
+    def unregister(self, view):
+        try:
+            del self.views[id(view)]
+        except KeyError:
+            pass
+
+    def info(self, i):
+        """Return (source, offset) of line `i` (a non-negative index)."""
+        b = bisect.bisect_right(self.bases, i) - 1
+        starts, runs = self.blocks[b]
+        i -= self.bases[b]
+        k = bisect.bisect_right(starts, i) - 1
+        source, offset = runs[k]
+        if i != starts[k]:
+            offset += i - starts[k]
+        return source, offset
+
+    def get_runs(self, start, stop):
+        """Return the runs of lines `start` to `stop`, relative to `start`."""
+        if start >= stop:
+            return [], []
+        bases = self.bases
+        b = bisect.bisect_right(bases, start) - 1
+        block_starts, block_runs = self.blocks[b]
+        k = bisect.bisect_right(block_starts, start - bases[b]) - 1
+        source, offset = block_runs[k]
+        first = bases[b] + block_starts[k]
+        if start != first:
+            offset += start - first
+        starts = [0]
+        runs = [(source, offset)]
+        k += 1
+        while True:
+            base = bases[b] - start
+            for k in range(k, len(block_starts)):
+                if base + block_starts[k] >= stop - start:
+                    return starts, runs
+                starts.append(base + block_starts[k])
+                runs.append(block_runs[k])
+            b += 1
+            if b == len(bases) or bases[b] >= stop:
+                return starts, runs
+            block_starts, block_runs = self.blocks[b]
+            k = 0
+
+    def get_items(self, start, stop):
+        """Return a list of (source, offset) pairs of lines `start:stop`."""
+        items = []
+        starts, runs = self.get_runs(start, stop)
+        ends = starts[1:] + [stop - start]
+        for first, end, (source, offset) in zip(starts, ends, runs):
+            if end - first == 1:
+                items.append((source, offset))
+            else:
+                items.extend([(source, offset + i)
+                              for i in range(end - first)])
+        return items
+
+    def copy(self, start, stop):
+        """Return a new store with lines `start` to `stop`."""
+        starts, runs = self.get_runs(start, stop)
+        return self.__class__(self.data[start:stop], starts, runs)
+
+    def replace(self, start, stop, data, starts, runs):
+        """
+        Replace lines `start` to `stop` with the lines `data`; `starts` and
+        `runs` are their (relative) run-length encoded source info.
+        """
+        delta = len(data) - (stop - start)
+        bases = self.bases
+        # the blocks around the change (with a neighbour on each side,
+        # to merge runs across block boundaries):
+        first = max(bisect.bisect_right(bases, start) - 2, 0)
+        last = min(bisect.bisect_right(bases, stop) + 1, len(bases))
+        old_starts = []
+        old_runs = []
+        for b in range(first, last):
+            block_starts, block_runs = self.blocks[b]
+            old_starts.extend([bases[b] + i for i in block_starts])
+            old_runs.extend(block_runs)
+        head = bisect.bisect_left(old_starts, start)
+        new_starts = old_starts[:head]
+        new_runs = old_runs[:head]
+        new_starts.extend([i + start for i in starts])
+        new_runs.extend(runs)
+        if stop < len(self.data):
+            k = bisect.bisect_right(old_starts, stop) - 1
+            source, offset = old_runs[k]
+            if stop != old_starts[k]:
+                offset += stop - old_starts[k]
+            new_starts.append(stop + delta)
+            new_runs.append((source, offset))
+            new_starts.extend([i + delta for i in old_starts[k+1:]])
+            new_runs.extend(old_runs[k+1:])
+        self.data[start:stop] = data
+        new_starts, new_runs = merge_runs(new_starts, new_runs)
+        size = self.block_size
+        new_bases = new_starts[::size]
+        new_blocks = [([i - base for i in new_starts[k:k+size]],
+                       new_runs[k:k+size])
+                      for base, k in zip(new_bases,
+                                         range(0, len(new_starts), size))]
+        if delta:
+            bases[last:] = [base + delta for base in bases[last:]]
+        bases[first:last] = new_bases
+        self.blocks[first:last] = new_blocks
+
+    def update_views(self, start, stop, delta, changing):
+        """
+        Prepare the views of this store for a change of lines `start` to
+        `stop` (by `delta` lines), except the views in `changing`: views
+        after the change are moved, views overlapping the change get a copy
+        of their lines, so that they do not see it.
+        """
+        for key, view in self.views.items():
+            if key in changing:
+                continue
+            view_start = view._start
+            view_stop = view._end()
+            if view_stop <= start:
+                view._stop = view_stop
+            elif view_start >= stop:
+                view._start += delta
+                view._stop = view_stop + delta
+            else:
+                view._set_store(self.copy(view_start, view_stop), 0, None)
+
+
+def encode_items(items):
+    """
+    Return run-length encoded (starts, runs) lists for a list of
+    (source, offset) pairs.
+    """
+    starts = []
+    runs = []
+    last_source = last_offset = None
+    for i, (source, offset) in enumerate(items):
+        if (i and source == last_source and isinstance(offset, int)
+            and isinstance(last_offset, int) and offset == last_offset + 1):
+            pass
+        else:
+            starts.append(i)
+            runs.append((source, offset))
+        last_source, last_offset = source, offset
+    return starts, runs
+
+def merge_runs(starts, runs):
+    """Merge adjacent runs with consecutive offsets; return (starts, runs)."""
+    merged_starts = starts[:1]
+    merged_runs = runs[:1]
+    for first, (source, offset) in zip(starts[1:], runs[1:]):
+        last_source, last_offset = merged_runs[-1]
+        if (source == last_source and isinstance(offset, int)
+            and isinstance(last_offset, int)
+            and offset == last_offset + first - merged_starts[-1]):
+            continue
+        merged_starts.append(first)
+        merged_runs.append((source, offset))
+    return merged_starts, merged_runs
+
+
+class ViewList(object):
 
     """
     List with extended functionality: slices of ViewList objects are child
@@ -1085,58 +1368,219 @@ class ViewList:
     Also, ViewList objects keep track of the source & offset of each item.
     This information is accessible via the `source()`, `offset()`, and
     `info()` methods.
+
+    Slices do not copy the lines: they are windows on a store shared with
+    the parent list.  A change through one list is made in the store once
+    for the list and those parents that share the store; other lists
+    sharing the store are moved if they follow the changed lines, or get a
+    copy of their lines if they overlap them.  The source & offset
+    information is stored run-length encoded.
+    The `data` and `items` attributes are provided for compatibility: `data`
+    is the actual list of lines of this ViewList (which then no longer
+    shares it), `items` a new list of (source, offset) pairs.
     """
 
     def __init__(self, initlist=None, source=None, items=None,
                  parent=None, parent_offset=None):
-        self.data = []
-        """The actual list of data, flattened from various sources."""
-
-        self.items = []
-        """A list of (source, offset) pairs, same length as `self.data`: the
-        source of each line and the offset of each line from the beginning of
-        its source."""
-
         self.parent = parent
         """The parent list."""
 
         self.parent_offset = parent_offset
         """Offset of this list from the beginning of the parent list."""
 
+        self._start = 0
+        """Index of the first line of this list in `self._store`."""
+
+        self._stop = None
+        """Index after the last line of this list in `self._store`, or None
+        for the end of the store."""
+
+        self._store = None
+        """The `_LineStore` with the lines of this list."""
+
         if isinstance(initlist, ViewList):
-            self.data = initlist.data[:]
-            self.items = initlist.items[:]
+            self._set_store(*initlist._share())
         elif initlist is not None:
-            self.data = list(initlist)
+            data = list(initlist)
             if items:
-                self.items = items
+                assert len(data) == len(items), 'data mismatch'
+                starts, runs = encode_items(items)
+            elif data:
+                starts, runs = [0], [(source, 0)]
             else:
-                self.items = [(source, i) for i in range(len(initlist))]
-        assert len(self.data) == len(self.items), 'data mismatch'
+                starts, runs = [], []
+            self._set_store(_LineStore(data, starts, runs), 0, None)
+        elif parent is None:
+            self._set_store(_LineStore([]), 0, None)
+        # else: a slice, the store is set by the parent
+
+    def _share(self, start=0, stop=None):
+        """
+        Return (store, start, stop) for a new list with lines `start` to
+        `stop` of this list (non-negative indices).
+        """
+        store = self._store
+        base = self._start
+        if stop is None:
+            stop = len(self)
+        if store.exposed:
+            return store.copy(base + start, base + stop), 0, None
+        return store, base + start, base + stop
+
+    def _set_store(self, store, start, stop):
+        """Use the lines `start` to `stop` of `store` (None: to the end)."""
+        if self._store is not None and self._store is not store:
+            self._store.unregister(self)
+        self._store, self._start, self._stop = store, start, stop
+        store.register(self)
+
+    def _own(self):
+        """
+        Make sure `self._store` can be changed without affecting other lists
+        (copy-on-write).
+        """
+        if len(self._store.views) > 1:
+            self._set_store(self._store.copy(self._start, self._end()),
+                            0, None)
+
+    def _end(self):
+        if self._stop is None:
+            return len(self._store.data)
+        return self._stop
+
+    def _change(self, start, stop, data, starts=None, runs=None,
+                propagate=True):
+        """
+        Replace lines `start` to `stop` (non-negative indices) with the lines
+        `data`, in this list and, if `propagate` is true, in the parent
+        lists.  `starts` and `runs` are the run-length encoded source info of
+        `data`; if None, the lines are replaced by as many lines and keep
+        their source info.
+
+        The store is changed once for a list and its parents using the
+        same lines of the same store.
+        """
+        # the list and its parents, with the lines to replace:
+        chain = [(self, start, stop)]
+        view = self
+        while propagate and view.parent:
+            start += view.parent_offset
+            stop += view.parent_offset
+            length = len(view.parent)
+            start = min(start, length)
+            stop = min(max(start, stop), length)
+            if starts is None and stop - start != len(data):
+                break
+            view = view.parent
+            chain.append((view, start, stop))
+        i = 0
+        while i < len(chain):
+            view, start, stop = chain[i]
+            store = view._store
+            start += view._start
+            stop += view._start
+            changing = {id(view): view}
+            i += 1
+            while i < len(chain):
+                parent, parent_start, parent_stop = chain[i]
+                if (parent._store is not store
+                    or parent._start + parent_start != start
+                    or parent._start + parent_stop != stop):
+                    break
+                changing[id(parent)] = parent
+                i += 1
+            delta = len(data) - (stop - start)
+            store.update_views(start, stop, delta, changing)
+            if starts is None:
+                store.data[start:stop] = data
+            else:
+                store.replace(start, stop, data, starts, runs)
+            if delta:
+                for view in changing.values():
+                    if view._stop is not None:
+                        view._stop += delta
+
+    def _get_data(self):
+        self._own()
+        store = self._store
+        if self._start or self._stop is not None:
+            store.replace(self._end(), len(store.data), [], [], [])
+            store.replace(0, self._start, [], [], [])
+            self._start, self._stop = 0, None
+        store.exposed = True
+        return store.data
+
+    def _set_data(self, data):
+        self._get_data()
+        self._store.data = data
+
+    data = property(_get_data, _set_data, doc="""The list of lines.""")
+
+    def _get_items(self):
+        return self._store.get_items(self._start, self._end())
+
+    def _set_items(self, items):
+        self._get_data()
+        self._store.set_runs(*encode_items(items))
+
+    items = property(_get_items, _set_items, doc="""
+        A list of (source, offset) pairs, same length as `self.data`: the
+        source of each line and the offset of each line from the beginning of
+        its source.""")
+
+    def _lines(self):
+        """Return the lines of this list (a copy for views)."""
+        store = self._store
+        if self._start or self._stop is not None:
+            return store.data[self._start:self._end()]
+        return store.data
 
     def __str__(self):
-        return str(self.data)
+        return str(self._lines())
 
     def __repr__(self):
         return '%s(%s, items=%s)' % (self.__class__.__name__,
-                                     self.data, self.items)
+                                     self._lines(), self.items)
 
-    def __lt__(self, other): return self.data <  self.__cast(other)
-    def __le__(self, other): return self.data <= self.__cast(other)
-    def __eq__(self, other): return self.data == self.__cast(other)
-    def __ne__(self, other): return self.data != self.__cast(other)
-    def __gt__(self, other): return self.data >  self.__cast(other)
-    def __ge__(self, other): return self.data >= self.__cast(other)
-    def __cmp__(self, other): return cmp(self.data, self.__cast(other))
+    def __lt__(self, other): return self._lines() <  self.__cast(other)
+    def __le__(self, other): return self._lines() <= self.__cast(other)
+    def __eq__(self, other): return self._lines() == self.__cast(other)
+    def __ne__(self, other): return self._lines() != self.__cast(other)
+    def __gt__(self, other): return self._lines() >  self.__cast(other)
+    def __ge__(self, other): return self._lines() >= self.__cast(other)
+    def __cmp__(self, other): return cmp(self._lines(), self.__cast(other))
 
     def __cast(self, other):
         if isinstance(other, ViewList):
-            return other.data
+            return other._lines()
         else:
             return other
 
-    def __contains__(self, item): return item in self.data
-    def __len__(self): return len(self.data)
+    def __contains__(self, item):
+        return item in self._store.data[self._start:self._end()]
+
+    def __len__(self):
+        if self._stop is None:
+            return len(self._store.data) - self._start
+        return self._stop - self._start
+
+    def __iter__(self):
+        return itertools.islice(self._store.data, self._start, self._end())
+
+    def _index(self, i):
+        """Return the non-negative index for index `i`."""
+        length = len(self)
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError('list index out of range')
+        return i
+
+    def _slice(self, i):
+        """Return (start, stop) for slice `i` (non-negative indices)."""
+        assert i.step in (None, 1), 'cannot handle slice with stride'
+        start, stop, step = i.indices(len(self))
+        return start, max(start, stop)
 
     # The __getitem__()/__setitem__() methods check whether the index
     # is a slice first, since indexing a native list with a slice object
@@ -1144,127 +1588,123 @@ class ViewList:
 
     def __getitem__(self, i):
         if isinstance(i, types.SliceType):
-            assert i.step in (None, 1),  'cannot handle slice with stride'
-            return self.__class__(self.data[i.start:i.stop],
-                                  items=self.items[i.start:i.stop],
-                                  parent=self, parent_offset=i.start or 0)
+            start, stop = self._slice(i)
+            child = self.__class__(parent=self, parent_offset=start)
+            child._set_store(*self._share(start, stop))
+            return child
         else:
-            return self.data[i]
+            return self._store.data[self._start + self._index(i)]
 
     def __setitem__(self, i, item):
         if isinstance(i, types.SliceType):
-            assert i.step in (None, 1), 'cannot handle slice with stride'
             if not isinstance(item, ViewList):
                 raise TypeError('assigning non-ViewList to ViewList slice')
-            self.data[i.start:i.stop] = item.data
-            self.items[i.start:i.stop] = item.items
-            assert len(self.data) == len(self.items), 'data mismatch'
-            if self.parent:
-                self.parent[(i.start or 0) + self.parent_offset
-                            : (i.stop or len(self)) + self.parent_offset] = item
+            start, stop = self._slice(i)
+            self._change(start, stop, item._lines(), *item._runs())
         else:
-            self.data[i] = item
-            if self.parent:
-                self.parent[i + self.parent_offset] = item
+            i = self._index(i)
+            self._change(i, i + 1, [item])
 
     def __delitem__(self, i):
-        try:
-            del self.data[i]
-            del self.items[i]
-            if self.parent:
-                del self.parent[i + self.parent_offset]
-        except TypeError:
-            assert i.step is None, 'cannot handle slice with stride'
-            del self.data[i.start:i.stop]
-            del self.items[i.start:i.stop]
-            if self.parent:
-                del self.parent[(i.start or 0) + self.parent_offset
-                                : (i.stop or len(self)) + self.parent_offset]
+        if isinstance(i, types.SliceType):
+            start, stop = self._slice(i)
+        else:
+            start = self._index(i)
+            stop = start + 1
+        self._change(start, stop, [], [], [])
+
+    def _runs(self):
+        """Return the run-length encoded source info of this list."""
+        return self._store.get_runs(self._start, self._end())
+
+    def _concat(self, first, second):
+        starts, runs = first._runs()
+        second_starts, second_runs = second._runs()
+        length = len(first)
+        starts.extend([start + length for start in second_starts])
+        runs.extend(second_runs)
+        new = self.__class__()
+        new._set_store(_LineStore(first._lines() + second._lines(),
+                                  *merge_runs(starts, runs)), 0, None)
+        return new
 
     def __add__(self, other):
         if isinstance(other, ViewList):
-            return self.__class__(self.data + other.data,
-                                  items=(self.items + other.items))
+            return self._concat(self, other)
         else:
             raise TypeError('adding non-ViewList to a ViewList')
 
     def __radd__(self, other):
         if isinstance(other, ViewList):
-            return self.__class__(other.data + self.data,
-                                  items=(other.items + self.items))
+            return self._concat(other, self)
         else:
             raise TypeError('adding ViewList to a non-ViewList')
 
     def __iadd__(self, other):
         if isinstance(other, ViewList):
-            self.data += other.data
+            length = len(self)
+            starts, runs = other._runs()
+            self._change(length, length, other._lines(), starts, runs,
+                         propagate=False)
         else:
             raise TypeError('argument to += must be a ViewList')
         return self
 
     def __mul__(self, n):
-        return self.__class__(self.data * n, items=(self.items * n))
+        return self.__class__(self._lines() * n, items=(self.items * n))
 
     __rmul__ = __mul__
 
     def __imul__(self, n):
+        items = self.items * n
         self.data *= n
-        self.items *= n
+        self.items = items
         return self
 
     def extend(self, other):
         if not isinstance(other, ViewList):
             raise TypeError('extending a ViewList with a non-ViewList')
-        if self.parent:
-            self.parent.insert(len(self.data) + self.parent_offset, other)
-        self.data.extend(other.data)
-        self.items.extend(other.items)
+        length = len(self)
+        self._change(length, length, other._lines(), *other._runs())
 
     def append(self, item, source=None, offset=0):
         if source is None:
             self.extend(item)
         else:
-            if self.parent:
-                self.parent.insert(len(self.data) + self.parent_offset, item,
-                                   source, offset)
-            self.data.append(item)
-            self.items.append((source, offset))
+            length = len(self)
+            self._change(length, length, [item], [0], [(source, offset)])
 
     def insert(self, i, item, source=None, offset=0):
+        length = len(self)
+        if i < 0:
+            i = max(0, length + i)
+        i = min(i, length)
         if source is None:
             if not isinstance(item, ViewList):
                 raise TypeError('inserting non-ViewList with no source given')
-            self.data[i:i] = item.data
-            self.items[i:i] = item.items
-            if self.parent:
-                index = (len(self.data) + i) % len(self.data)
-                self.parent.insert(index + self.parent_offset, item)
+            self._change(i, i, item._lines(), *item._runs())
         else:
-            self.data.insert(i, item)
-            self.items.insert(i, (source, offset))
-            if self.parent:
-                index = (len(self.data) + i) % len(self.data)
-                self.parent.insert(index + self.parent_offset, item,
-                                   source, offset)
+            self._change(i, i, [item], [0], [(source, offset)])
 
     def pop(self, i=-1):
-        if self.parent:
-            index = (len(self.data) + i) % len(self.data)
-            self.parent.pop(index + self.parent_offset)
-        self.items.pop(i)
-        return self.data.pop(i)
+        i = self._index(i)
+        item = self[i]
+        self._change(i, i + 1, [], [], [])
+        return item
 
     def trim_start(self, n=1):
         """
         Remove items from the start of the list, without touching the parent.
         """
-        if n > len(self.data):
+        if n > len(self):
             raise IndexError("Size of trim too large; can't trim %s items "
-                             "from a list of size %s." % (n, len(self.data)))
+                             "from a list of size %s." % (n, len(self)))
         elif n < 0:
             raise IndexError('Trim size must be >= 0.')
-        del self.data[:n]
-        del self.items[:n]
+        if self._store.exposed:
+            self._change(0, n, [], [], [], propagate=False)
+        else:
+            self._start += n
         if self.parent:
             self.parent_offset += n
 
@@ -1272,28 +1712,33 @@ class ViewList:
         """
         Remove items from the end of the list, without touching the parent.
         """
-        if n > len(self.data):
+        if n > len(self):
             raise IndexError("Size of trim too large; can't trim %s items "
-                             "from a list of size %s." % (n, len(self.data)))
+                             "from a list of size %s." % (n, len(self)))
         elif n < 0:
             raise IndexError('Trim size must be >= 0.')
-        del self.data[-n:]
-        del self.items[-n:]
+        if self._store.exposed:
+            self._change(len(self) - n, len(self), [], [], [],
+                         propagate=False)
+        else:
+            self._stop = self._end() - n
 
     def remove(self, item):
         index = self.index(item)
         del self[index]
 
-    def count(self, item): return self.data.count(item)
-    def index(self, item): return self.data.index(item)
+    def count(self, item): return self._lines().count(item)
+    def index(self, item): return self._lines().index(item)
 
     def reverse(self):
+        items = self.items
+        items.reverse()
         self.data.reverse()
-        self.items.reverse()
+        self.items = items
         self.parent = None
 
     def sort(self, *args):
-        tmp = zip(self.data, self.items)
+        tmp = zip(self._lines(), self.items)
         tmp.sort(*args)
         self.data = [entry[0] for entry in tmp]
         self.items = [entry[1] for entry in tmp]
@@ -1302,10 +1747,10 @@ class ViewList:
     def info(self, i):
         """Return source & offset for index `i`."""
         try:
-            return self.items[i]
+            return self._store.info(self._start + self._index(i))
         except IndexError:
-            if i == len(self.data):     # Just past the end
-                return self.items[i - 1][0], None
+            if i == len(self):          # Just past the end
+                return self.info(i - 1)[0], None
             else:
                 raise
 
@@ -1323,7 +1768,7 @@ class ViewList:
 
     def xitems(self):
         """Return iterator yielding (source, offset, value) tuples."""
-        for (value, (source, offset)) in zip(self.data, self.items):
+        for (value, (source, offset)) in zip(self._lines(), self.items):
             yield (source, offset, value)
 
     def pprint(self):
@@ -1336,14 +1781,24 @@ class StringList(ViewList):
 
     """A `ViewList` with string-specific methods."""
 
+    def _set_lines(self, start, lines):
+        """
+        Replace the lines from index `start` with `lines` (same number of
+        lines, the source info is kept).  Does not affect slice parent.
+        """
+        self._own()
+        start += self._start
+        self._store.data[start:start+len(lines)] = lines
+
     def trim_left(self, length, start=0, end=sys.maxint):
         """
         Trim `length` characters off the beginning of each item, in-place,
         from index `start` to `end`.  No whitespace-checking is done on the
         trimmed text.  Does not affect slice parent.
         """
-        self.data[start:end] = [line[length:]
-                                for line in self.data[start:end]]
+        start, end, step = slice(start, end).indices(len(self))
+        self._set_lines(start, [line[length:]
+                                for line in self._lines()[start:end]])
 
     def get_text_block(self, start, flush_left=False):
         """
@@ -1353,10 +1808,12 @@ class StringList(ViewList):
         indented line is encountered before the text block ends (with a blank
         line).
         """
+        data = self._store.data
+        base = self._start
         end = start
-        last = len(self.data)
+        last = len(self)
         while end < last:
-            line = self.data[end]
+            line = data[base + end]
             if not line.strip():
                 break
             if flush_left and (line[0] == ' '):
@@ -1388,22 +1845,24 @@ class StringList(ViewList):
           - the amount of the indent;
           - a boolean: did the indented block finish with a blank line or EOF?
         """
+        data = self._store.data
+        base = self._start
         indent = block_indent           # start with None if unknown
         end = start
         if block_indent is not None and first_indent is None:
             first_indent = block_indent
         if first_indent is not None:
             end += 1
-        last = len(self.data)
+        last = len(self)
         while end < last:
-            line = self.data[end]
+            line = data[base + end]
             if line and (line[0] != ' '
                          or (block_indent is not None
                              and line[:block_indent].strip())):
                 # Line not indented or insufficiently indented.
                 # Block finished properly iff the last indented line blank:
                 blank_finish = ((end > start)
-                                and not self.data[end - 1].strip())
+                                and not data[base + end - 1].strip())
                 break
             stripped = line.lstrip()
             if not stripped:            # blank line
@@ -1421,7 +1880,7 @@ class StringList(ViewList):
             blank_finish = 1            # block ends at end of lines
         block = self[start:end]
         if first_indent is not None and block:
-            block.data[0] = block.data[0][first_indent:]
+            block._set_lines(0, [block[0][first_indent:]])
         if indent and strip_indent:
             block.trim_left(indent, start=(first_indent is not None))
         return block, indent or 0, blank_finish
@@ -1429,22 +1888,25 @@ class StringList(ViewList):
     def get_2D_block(self, top, left, bottom, right, strip_indent=True):
         block = self[top:bottom]
         indent = right
-        for i in range(len(block.data)):
+        lines = []
+        for line in block:
             # get slice from line, care for combining characters
-            ci = utils.column_indices(block.data[i])
+            ci = utils.column_indices(line)
             try:
                 left = ci[left]
             except IndexError:
-                left += len(block.data[i]) - len(ci)
+                left += len(line) - len(ci)
             try:
                 right = ci[right]
             except IndexError:
-                right += len(block.data[i]) - len(ci)
-            block.data[i] = line = block.data[i][left:right].rstrip()
+                right += len(line) - len(ci)
+            line = line[left:right].rstrip()
+            lines.append(line)
             if line:
                 indent = min(indent, len(line) - len(line.lstrip()))
         if strip_indent and 0 < indent < right:
-            block.data = [line[indent:] for line in block.data]
+            lines = [line[indent:] for line in lines]
+        block._set_lines(0, lines)
         return block
 
     def pad_double_width(self, pad_char):
@@ -1456,20 +1918,20 @@ class StringList(ViewList):
             east_asian_width = unicodedata.east_asian_width
         else:
             return                      # new in Python 2.4
-        for i in range(len(self.data)):
-            line = self.data[i]
+        for i, line in enumerate(self):
             if isinstance(line, unicode):
                 new = []
                 for char in line:
                     new.append(char)
                     if east_asian_width(char) in 'WF': # 'W'ide & 'F'ull-width
                         new.append(pad_char)
-                self.data[i] = ''.join(new)
+                new = ''.join(new)
+                if new != line:
+                    self._set_lines(i, [new])
 
     def replace(self, old, new):
         """Replace all occurrences of substring `old` with `new`."""
-        for i in range(len(self.data)):
-            self.data[i] = self.data[i].replace(old, new)
+        self._set_lines(0, [line.replace(old, new) for line in self])
 
 
 class StateMachineError(Exception): pass
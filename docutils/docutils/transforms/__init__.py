@@ -61,6 +61,129 @@ class Transform:
         raise NotImplementedError('subclass must override this method')
 
 
+class NodeTransform(Transform):
+
+    """
+    Base class for transforms that process the nodes of some classes one
+    at a time, in document order.
+
+    Subclasses set `node_classes` and override `visit()`, and optionally
+    `prepare()` and `finish()`.  The `Transformer` applies consecutive node
+    transforms of the same `fusion_band` in a single walk over the document
+    tree (see `walk_node_transforms()`).  Transforms removing or replacing
+    nodes must report them with `node_removed()`.
+    """
+
+    node_classes = ()
+    """Tuple of the node classes passed to `visit()` (override)."""
+
+    fusion_band = None
+    """Name of the group of node transforms this transform may share a tree
+    walk with, or None (not fused).  Transforms of one band must not depend
+    on each other's changes to other nodes than the visited one, nor visit
+    nodes inserted by an earlier transform of the band."""
+
+    def apply(self):
+        if self.prepare():
+            walk_node_transforms(self.document, [self])
+            self.finish()
+
+    def prepare(self):
+        """
+        Called before the tree walk.  Return a false value to skip the
+        transform (e.g. if it is disabled by a setting).
+        """
+        return True
+
+    def visit(self, node):
+        """
+        Process `node`, an instance of one of `node_classes`.  The node may
+        be changed, removed from the tree, or replaced (call
+        `node_removed()` then).
+        """
+        raise NotImplementedError('subclass must override this method')
+
+    removed_nodes = None
+    """List of the nodes reported by `node_removed()` during a tree walk
+    (set by `walk_node_transforms()`)."""
+
+    def node_removed(self, node):
+        """
+        Report that `node` was removed from the document tree (or replaced)
+        by `visit()`.  The tree walk skips the node and its descendants that
+        were removed with it.
+        """
+        if self.removed_nodes is not None:
+            self.removed_nodes.append(node)
+
+    def finish(self):
+        """Called after the tree walk."""
+        pass
+
+
+def walk_node_transforms(document, transforms):
+    """
+    Call the `visit()` method of the `NodeTransform` instances in
+    `transforms` (in list order) for every node of `document` in one walk.
+
+    Only nodes of the transforms' `node_classes` are visited.  Nodes
+    reported with `NodeTransform.node_removed()` (and their descendants
+    removed with them) are skipped.
+    """
+    if not [transform for transform in transforms if transform.node_classes]:
+        return
+    dispatch = {}
+    found = []
+    visitors = [transform for transform in transforms
+                if isinstance(document, transform.node_classes)]
+    if visitors:
+        found.append((document, visitors))
+    _collect(document, transforms, dispatch, found)
+    reported = []
+    removed = {}
+    for transform in transforms:
+        transform.removed_nodes = reported
+    try:
+        for node, visitors in found:
+            if removed and id(node) in removed:
+                continue
+            for transform in visitors:
+                transform.visit(node)
+                if reported:
+                    for removed_node in reported:
+                        _mark_removed(removed_node, removed)
+                    reported[:] = []
+                    if id(node) in removed:
+                        break
+    finally:
+        for transform in transforms:
+            transform.removed_nodes = None
+
+def _collect(node, transforms, dispatch, found):
+    # Append ``(descendant, transforms visiting it)`` to `found` for the
+    # descendants of `node`, in document order.  `dispatch` caches the
+    # transforms per node class; leaves are not recursed into.
+    for child in node.children:
+        try:
+            visitors = dispatch[child.__class__]
+        except KeyError:
+            visitors = dispatch[child.__class__] = [
+                transform for transform in transforms
+                if isinstance(child, transform.node_classes)]
+        if visitors:
+            found.append((child, visitors))
+        if child.children:
+            _collect(child, transforms, dispatch, found)
+
+def _mark_removed(node, removed):
+    # Add `node` and the descendants still attached to it to `removed`
+    # (a mapping of ids to nodes, which keeps the ids valid).  Children
+    # moved elsewhere (e.g. by `Node.replace_self()`) have a new parent.
+    removed[id(node)] = node
+    for descendant in node.traverse(include_self=False):
+        if id(descendant.parent) in removed:
+            removed[id(descendant)] = descendant
+
 class Transformer(TransformSpec):
 
     """
@@ -93,6 +216,27 @@ class Transformer(TransformSpec):
         """Internal serial number to keep track of the add order of
         transforms."""
 
+        self.observers = []
+        """List of functions called after each transform is applied (see
+        `attach_observer()`)."""
+
+        self.fuse = 1
+        """Boolean: apply consecutive `NodeTransform` subclasses of the same
+        fusion band in one tree walk?  Not done while collecting statistics
+        (see `attach_observer()`)."""
+
+    def attach_observer(self, observer):
+        """
+        Call `observer` after each transform is applied, with its
+        statistics (a `docutils.utils.instrumentation.TransformRecord`:
+        wall time, number of nodes visited and of tree modifications).
+        Measuring slows the transforms down.
+        """
+        self.observers.append(observer)
+
+    def detach_observer(self, observer):
+        self.observers.remove(observer)
+
     def add_transform(self, transform_class, priority=None, **kwargs):
         """
         Store a single transform.  Use `priority` to override the default.
@@ -157,16 +301,75 @@ class Transformer(TransformSpec):
         self.unknown_reference_resolvers.extend([f[1] for f in decorated_list])
 
     def apply_transforms(self):
-        """Apply all of the stored transforms, in priority order."""
+        """
+        Apply all of the stored transforms, in priority order.
+
+        Consecutive node transforms of one fusion band are applied together
+        (see `apply_fused()`).
+        """
         self.document.reporter.attach_observer(
             self.document.note_transform_message)
+        if getattr(self.document.settings, 'node_registry', None):
+            self.document.enable_node_registry()
+        profile_path = getattr(self.document.settings, 'transform_profile',
+                               None)
+        profile = None
+        if self.observers or profile_path:
+            from docutils.utils.instrumentation import TransformProfile
+            profile = TransformProfile()
         while self.transforms:
             if not self.sorted:
                 # Unsorted initially, and whenever a transform is added.
                 self.transforms.sort()
                 self.transforms.reverse()
                 self.sorted = 1
-            priority, transform_class, pending, kwargs = self.transforms.pop()
+            item = self.transforms.pop()
+            if self.fuse and profile is None and self.is_fusible(item):
+                self.apply_fused(item)
+                continue
+            priority, transform_class, pending, kwargs = item
+            transform = transform_class(self.document, startnode=pending)
+            if profile is None:
+                transform.apply(**kwargs)
+            else:
+                profile.start()
+                try:
+                    transform.apply(**kwargs)
+                finally:
+                    record = profile.stop(priority, transform_class, pending)
+                for observer in self.observers:
+                    observer(record)
+            self.applied.append((priority, transform_class, pending, kwargs))
+        if profile_path:
+            profile.write_report(profile_path)
+
+    def is_fusible(self, item):
+        """
+        Can the transform `item` (see `self.transforms`) share a tree walk
+        with others?  It must be a `NodeTransform` with a fusion band that
+        does not override `apply()`, without pending node or arguments.
+        """
+        priority, transform_class, pending, kwargs = item
+        return (pending is None and not kwargs
+                and getattr(transform_class, 'fusion_band', None) is not None
+                and transform_class.apply == NodeTransform.apply)
+
+    def apply_fused(self, item):
+        """
+        Apply the node transform `item` and the following transforms of the
+        same fusion band, with one walk over the document tree.
+        """
+        group = [item]
+        band = item[1].fusion_band
+        while (self.transforms and self.is_fusible(self.transforms[-1])
+               and self.transforms[-1][1].fusion_band == band):
+            group.append(self.transforms.pop())
+        transforms = []
+        for priority, transform_class, pending, kwargs in group:
             transform = transform_class(self.document, startnode=pending)
-            transform.apply(**kwargs)
+            if transform.prepare():
+                transforms.append(transform)
             self.applied.append((priority, transform_class, pending, kwargs))
+        walk_node_transforms(self.document, transforms)
+        for transform in transforms:
+            transform.finish()
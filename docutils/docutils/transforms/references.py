@@ -11,7 +11,7 @@ __docformat__ = 'reStructuredText'
 import sys
 import re
 from docutils import nodes, utils
-from docutils.transforms import TransformError, Transform
+from docutils.transforms import TransformError, Transform, NodeTransform
 
 
 class PropagateTargets(Transform):
@@ -665,81 +665,138 @@ class Substitutions(Transform):
         normed = self.document.substitution_names
         subreflist = self.document.traverse(nodes.substitution_reference)
         nested = {}
-        for ref in subreflist:
-            refname = ref['refname']
-            key = None
-            if refname in defs:
-                key = refname
-            else:
-                normed_name = refname.lower()
-                if normed_name in normed:
-                    key = normed[normed_name]
-            if key is None:
-                msg = self.document.reporter.error(
-                      'Undefined substitution referenced: "%s".'
-                      % refname, base_node=ref)
-                msgid = self.document.set_id(msg)
-                prb = nodes.problematic(
-                      ref.rawsource, ref.rawsource, refid=msgid)
-                prbid = self.document.set_id(prb)
-                msg.add_backref(prbid)
-                ref.replace_self(prb)
-            else:
-                subdef = defs[key]
-                parent = ref.parent
-                index = parent.index(ref)
-                if  ('ltrim' in subdef.attributes
-                     or 'trim' in subdef.attributes):
-                    if index > 0 and isinstance(parent[index - 1],
-                                                nodes.Text):
-                        parent.replace(parent[index - 1],
-                                       parent[index - 1].rstrip())
-                if  ('rtrim' in subdef.attributes
-                     or 'trim' in subdef.attributes):
-                    if  (len(parent) > index + 1
-                         and isinstance(parent[index + 1], nodes.Text)):
-                        parent.replace(parent[index + 1],
-                                       parent[index + 1].lstrip())
-                subdef_copy = subdef.deepcopy()
-                try:
-                    # Take care of nested substitution references:
-                    for nested_ref in subdef_copy.traverse(
-                          nodes.substitution_reference):
-                        nested_name = normed[nested_ref['refname'].lower()]
-                        if nested_name in nested.setdefault(nested_name, []):
-                            raise CircularSubstitutionDefinitionError
-                        else:
-                            nested[nested_name].append(key)
-                            subreflist.append(nested_ref)
-                except CircularSubstitutionDefinitionError:
+        while subreflist:
+            # References in the replacement nodes are resolved in the
+            # next round, after the references of this round are replaced.
+            nested_refs = []
+            replacements = []
+            for ref in subreflist:
+                refname = ref['refname']
+                key = None
+                if refname in defs:
+                    key = refname
+                else:
+                    normed_name = refname.lower()
+                    if normed_name in normed:
+                        key = normed[normed_name]
+                if key is None:
+                    msg = self.document.reporter.error(
+                          'Undefined substitution referenced: "%s".'
+                          % refname, base_node=ref)
+                    msgid = self.document.set_id(msg)
+                    prb = nodes.problematic(
+                          ref.rawsource, ref.rawsource, refid=msgid)
+                    prbid = self.document.set_id(prb)
+                    msg.add_backref(prbid)
+                    ref.replace_self(prb)
+                else:
+                    subdef = defs[key]
                     parent = ref.parent
-                    if isinstance(parent, nodes.substitution_definition):
-                        msg = self.document.reporter.error(
-                            'Circular substitution definition detected:',
-                            nodes.literal_block(parent.rawsource,
-                                                parent.rawsource),
-                            line=parent.line, base_node=parent)
-                        parent.replace_self(msg)
+                    index = parent.index(ref)
+                    subdef_copy = subdef.deepcopy()
+                    # References in substitution definitions are replaced
+                    # at once, as later copies of the definition include
+                    # the replacement.
+                    batched = (subdef_copy.children
+                               and not self.in_definition(ref))
+                    ltrim = ('ltrim' in subdef.attributes
+                             or 'trim' in subdef.attributes)
+                    if ltrim and not batched:
+                        self.ltrim(parent, index)
+                    if  ('rtrim' in subdef.attributes
+                         or 'trim' in subdef.attributes):
+                        if  (len(parent) > index + 1
+                             and isinstance(parent[index + 1], nodes.Text)):
+                            parent.replace(parent[index + 1],
+                                           parent[index + 1].lstrip())
+                    try:
+                        # Take care of nested substitution references:
+                        for nested_ref in subdef_copy.traverse(
+                              nodes.substitution_reference):
+                            nested_name = normed[nested_ref['refname'].lower()]
+                            if nested_name in nested.setdefault(nested_name, []):
+                                raise CircularSubstitutionDefinitionError
+                            else:
+                                nested[nested_name].append(key)
+                                nested_refs.append(nested_ref)
+                    except CircularSubstitutionDefinitionError:
+                        if ltrim and batched:
+                            self.ltrim(parent, index)
+                        parent = ref.parent
+                        if isinstance(parent, nodes.substitution_definition):
+                            msg = self.document.reporter.error(
+                                'Circular substitution definition detected:',
+                                nodes.literal_block(parent.rawsource,
+                                                    parent.rawsource),
+                                line=parent.line, base_node=parent)
+                            parent.replace_self(msg)
+                        else:
+                            msg = self.document.reporter.error(
+                                'Circular substitution definition referenced: "%s".'
+                                % refname, base_node=ref)
+                            msgid = self.document.set_id(msg)
+                            prb = nodes.problematic(
+                                ref.rawsource, ref.rawsource, refid=msgid)
+                            prbid = self.document.set_id(prb)
+                            msg.add_backref(prbid)
+                            ref.replace_self(prb)
                     else:
-                        msg = self.document.reporter.error(
-                            'Circular substitution definition referenced: "%s".'
-                            % refname, base_node=ref)
-                        msgid = self.document.set_id(msg)
-                        prb = nodes.problematic(
-                            ref.rawsource, ref.rawsource, refid=msgid)
-                        prbid = self.document.set_id(prb)
-                        msg.add_backref(prbid)
-                        ref.replace_self(prb)
-                else:
-                    ref.replace_self(subdef_copy.children)
-                    # register refname of the replacment node(s)
-                    # (needed for resolution of references)
-                    for node in subdef_copy.children:
-                        if isinstance(node, nodes.Referential):
-                            # HACK: verify refname attribute exists.
-                            # Test with docs/dev/todo.txt, see. |donate|
-                            if 'refname' in node:
-                                self.document.note_refname(node)
+                        if batched:
+                            ref.transfer_basic_atts(subdef_copy.children)
+                            replacements.append(
+                                (ref, subdef_copy.children, ltrim))
+                        else:
+                            ref.replace_self(subdef_copy.children)
+                        # register refname of the replacment node(s)
+                        # (needed for resolution of references)
+                        for node in subdef_copy.children:
+                            if isinstance(node, nodes.Referential):
+                                # HACK: verify refname attribute exists.
+                                # Test with docs/dev/todo.txt, see. |donate|
+                                if 'refname' in node:
+                                    self.document.note_refname(node)
+            self.replace_references(replacements)
+            subreflist = nested_refs
+
+    def replace_references(self, replacements):
+        """
+        Replace substitution references with the contents of their
+        definitions.  `replacements` is a list of ``(reference, nodes,
+        ltrim)`` tuples in document order.
+
+        The children of each parent element are replaced in one pass
+        (`nodes.Element.replace_children()`), so that paragraphs or tables
+        with many substitutions are processed in linear time.
+        """
+        parents = []
+        by_parent = {}
+        for ref, new, ltrim in replacements:
+            parent = ref.parent
+            if id(parent) not in by_parent:
+                parents.append(parent)
+                by_parent[id(parent)] = []
+            by_parent[id(parent)].append((ref, new))
+        for parent in parents:
+            parent.replace_children(by_parent[id(parent)])
+        # "ltrim" applies to the text before the replacement nodes (which
+        # may be the end of a preceding replacement):
+        for ref, new, ltrim in replacements:
+            if ltrim:
+                parent = new[0].parent
+                self.ltrim(parent, parent.index(new[0]))
+
+    def in_definition(self, node):
+        """Is `node` part of a substitution definition?"""
+        while node is not None:
+            if isinstance(node, nodes.substitution_definition):
+                return True
+            node = node.parent
+        return False
+
+    def ltrim(self, parent, index):
+        """Remove whitespace at the end of the Text node before `index`."""
+        if index > 0 and isinstance(parent[index - 1], nodes.Text):
+            parent.replace(parent[index - 1], parent[index - 1].rstrip())
 
 
 class TargetNotes(Transform):
@@ -825,7 +882,7 @@ class TargetNotes(Transform):
         return footnote
 
 
-class DanglingReferences(Transform):
+class DanglingReferences(NodeTransform):
 
     """
     Check for dangling references (incl. footnote & citation) and for
@@ -833,15 +890,27 @@ class DanglingReferences(Transform):
     """
 
     default_priority = 850
+    node_classes = (nodes.reference, nodes.footnote_reference,
+                    nodes.citation_reference, nodes.target)
+    fusion_band = 'checks'
 
-    def apply(self):
-        visitor = DanglingReferencesVisitor(
+    def prepare(self):
+        self.visitor = DanglingReferencesVisitor(
             self.document,
             self.document.transformer.unknown_reference_resolvers)
-        self.document.walk(visitor)
+        self.visitor.node_removed = self.node_removed
+        self.targets = []
+        return True
+
+    def visit(self, node):
+        if isinstance(node, nodes.target):
+            self.targets.append(node)
+        self.visitor.dispatch_visit(node)
+
+    def finish(self):
         # *After* resolving all references, check for unreferenced
         # targets:
-        for target in self.document.traverse(nodes.target):
+        for target in self.targets:
             if not target.referenced:
                 if target.get('anonymous'):
                     # If we have unreferenced anonymous targets, there
@@ -863,7 +932,11 @@ class DanglingReferences(Transform):
 
 
 class DanglingReferencesVisitor(nodes.SparseNodeVisitor):
-    
+
+    node_removed = None
+    """Function called with the references replaced by "problematic"
+    nodes, or None."""
+
     def __init__(self, document, unknown_reference_resolvers):
         nodes.SparseNodeVisitor.__init__(self, document)
         self.document = document
@@ -896,6 +969,8 @@ class DanglingReferencesVisitor(nodes.SparseNodeVisitor):
                 prbid = self.document.set_id(prb)
                 msg.add_backref(prbid)
                 node.replace_self(prb)
+                if self.node_removed is not None:
+                    self.node_removed(node)
         else:
             del node['refname']
             node['refid'] = id
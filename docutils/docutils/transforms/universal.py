@@ -20,7 +20,7 @@ import re
 import sys
 import time
 from docutils import nodes, utils
-from docutils.transforms import TransformError, Transform
+from docutils.transforms import TransformError, Transform, NodeTransform
 from docutils.utils import smartquotes
 
 class Decorations(Transform):
@@ -81,27 +81,30 @@ class Decorations(Transform):
             return None
 
 
-class ExposeInternals(Transform):
+class ExposeInternals(NodeTransform):
 
     """
     Expose internal attributes if ``expose_internals`` setting is set.
     """
 
     default_priority = 840
+    node_classes = (nodes.Element,)
+    fusion_band = 'cleanup'
 
     def not_Text(self, node):
         return not isinstance(node, nodes.Text)
 
-    def apply(self):
-        if self.document.settings.expose_internals:
-            for node in self.document.traverse(self.not_Text):
-                for att in self.document.settings.expose_internals:
-                    value = getattr(node, att, None)
-                    if value is not None:
-                        node['internal:' + att] = value
+    def prepare(self):
+        return self.document.settings.expose_internals
+
+    def visit(self, node):
+        for att in self.document.settings.expose_internals:
+            value = getattr(node, att, None)
+            if value is not None:
+                node['internal:' + att] = value
 
 
-class Messages(Transform):
+class Messages(NodeTransform):
 
     """
     Place any system messages generated after parsing into a dedicated section
@@ -109,8 +112,9 @@ class Messages(Transform):
     """
 
     default_priority = 860
+    fusion_band = 'cleanup'
 
-    def apply(self):
+    def finish(self):
         unfiltered = self.document.transform_messages
         threshold = self.document.reporter.report_level
         messages = []
@@ -126,21 +130,23 @@ class Messages(Transform):
             self.document += section
 
 
-class FilterMessages(Transform):
+class FilterMessages(NodeTransform):
 
     """
     Remove system messages below verbosity threshold.
     """
 
     default_priority = 870
+    node_classes = (nodes.system_message,)
+    fusion_band = 'cleanup'
 
-    def apply(self):
-        for node in self.document.traverse(nodes.system_message):
-            if node['level'] < self.document.reporter.report_level:
-                node.parent.remove(node)
+    def visit(self, node):
+        if node['level'] < self.document.reporter.report_level:
+            node.parent.remove(node)
+            self.node_removed(node)
 
 
-class TestMessages(Transform):
+class TestMessages(NodeTransform):
 
     """
     Append all post-parse system messages to the end of the document.
@@ -149,14 +155,15 @@ class TestMessages(Transform):
     """
 
     default_priority = 880
+    fusion_band = 'cleanup'
 
-    def apply(self):
+    def finish(self):
         for msg in self.document.transform_messages:
             if not msg.parent:
                 self.document += msg
 
 
-class StripComments(Transform):
+class StripComments(NodeTransform):
 
     """
     Remove comment elements from the document tree (only if the
@@ -164,14 +171,18 @@ class StripComments(Transform):
     """
 
     default_priority = 740
+    node_classes = (nodes.comment,)
+    fusion_band = 'cleanup'
 
-    def apply(self):
-        if self.document.settings.strip_comments:
-            for node in self.document.traverse(nodes.comment):
-                node.parent.remove(node)
+    def prepare(self):
+        return self.document.settings.strip_comments
 
+    def visit(self, node):
+        node.parent.remove(node)
+        self.node_removed(node)
 
-class StripClassesAndElements(Transform):
+
+class StripClassesAndElements(NodeTransform):
 
     """
     Remove from the document tree all elements with classes in
@@ -180,11 +191,13 @@ class StripClassesAndElements(Transform):
     """
 
     default_priority = 420
+    node_classes = (nodes.Element,)
+    fusion_band = 'cleanup'
 
-    def apply(self):
+    def prepare(self):
         if not (self.document.settings.strip_elements_with_classes
                 or self.document.settings.strip_classes):
-            return
+            return False
         # prepare dicts for lookup (not sets, for Python 2.2 compatibility):
         self.strip_elements = dict(
             [(key, None)
@@ -193,8 +206,12 @@ class StripClassesAndElements(Transform):
         self.strip_classes = dict(
             [(key, None) for key in (self.document.settings.strip_classes
                                      or [])])
-        for node in self.document.traverse(self.check_classes):
+        return True
+
+    def visit(self, node):
+        if self.check_classes(node):
             node.parent.remove(node)
+            self.node_removed(node)
 
     def check_classes(self, node):
         if isinstance(node, nodes.Element):
@@ -204,7 +221,7 @@ class StripClassesAndElements(Transform):
                 if class_value in self.strip_elements:
                     return 1
 
-class SmartQuotes(Transform):
+class SmartQuotes(NodeTransform):
 
     """
     Replace ASCII quotation marks with typographic form.
@@ -213,9 +230,11 @@ class SmartQuotes(Transform):
     """
 
     default_priority = 850
+    node_classes = (nodes.TextElement,)
+    fusion_band = 'cleanup'
 
     def __init__(self, document, startnode):
-        Transform.__init__(self, document, startnode=startnode)
+        NodeTransform.__init__(self, document, startnode=startnode)
         self.unsupported_languages = set()
 
     def get_tokens(self, txtnodes):
@@ -234,59 +253,60 @@ class SmartQuotes(Transform):
             yield (nodetype, txtnode.astext())
 
 
-    def apply(self):
+    def prepare(self):
         smart_quotes = self.document.settings.smart_quotes
         if not smart_quotes:
-            return
+            return False
         try:
-            alternative = smart_quotes.startswith('alt')
+            self.alternative = smart_quotes.startswith('alt')
         except AttributeError:
-            alternative = False
+            self.alternative = False
         # print repr(alternative)
 
-        document_language = self.document.settings.language_code
+        self.document_language = self.document.settings.language_code
+        return True
 
+    def visit(self, node):
         # "Educate" quotes in normal text. Handle each block of text
-        # (TextElement node) as a unit to keep context around inline nodes:
-        for node in self.document.traverse(nodes.TextElement):
-            # skip preformatted text blocks and special elements:
-            if isinstance(node, (nodes.FixedTextElement, nodes.Special)):
-                continue
-            # nested TextElements are not "block-level" elements:
-            if isinstance(node.parent, nodes.TextElement):
-                continue
-
-            # list of text nodes in the "text block":
-            txtnodes = [txtnode for txtnode in node.traverse(nodes.Text)
-                        if not isinstance(txtnode.parent,
-                                          nodes.option_string)]
-
-            # language: use typographical quotes for language "lang"
-            lang = node.get_language_code(document_language)
-            # use alternative form if `smart-quotes` setting starts with "alt":
-            if alternative:
-                if '-x-altquot' in lang:
-                    lang = lang.replace('-x-altquot', '')
-                else:
-                    lang += '-x-altquot'
-            # drop subtags missing in quotes:
-            for tag in utils.normalize_language_tag(lang):
-                if tag in smartquotes.smartchars.quotes:
-                    lang = tag
-                    break
-            else: # language not supported: (keep ASCII quotes)
-                if lang not in self.unsupported_languages:
-                    self.document.reporter.warning('No smart quotes '
-                        'defined for language "%s".'%lang, base_node=node)
-                self.unsupported_languages.add(lang)
-                lang = ''
-
-            # Iterator educating quotes in plain text:
-            # '2': set all, using old school en- and em- dash shortcuts
-            teacher = smartquotes.educate_tokens(self.get_tokens(txtnodes),
-                                                 attr='2', language=lang)
-
-            for txtnode, newtext in zip(txtnodes, teacher):
-                txtnode.parent.replace(txtnode, nodes.Text(newtext))
-
-            self.unsupported_languages = set() # reset
+        # (TextElement node) as a unit to keep context around inline nodes.
+        # Skip preformatted text blocks and special elements:
+        if isinstance(node, (nodes.FixedTextElement, nodes.Special)):
+            return
+        # nested TextElements are not "block-level" elements:
+        if isinstance(node.parent, nodes.TextElement):
+            return
+
+        # list of text nodes in the "text block":
+        txtnodes = [txtnode for txtnode in node.traverse(nodes.Text)
+                    if not isinstance(txtnode.parent,
+                                      nodes.option_string)]
+
+        # language: use typographical quotes for language "lang"
+        lang = node.get_language_code(self.document_language)
+        # use alternative form if `smart-quotes` setting starts with "alt":
+        if self.alternative:
+            if '-x-altquot' in lang:
+                lang = lang.replace('-x-altquot', '')
+            else:
+                lang += '-x-altquot'
+        # drop subtags missing in quotes:
+        for tag in utils.normalize_language_tag(lang):
+            if tag in smartquotes.smartchars.quotes:
+                lang = tag
+                break
+        else: # language not supported: (keep ASCII quotes)
+            if lang not in self.unsupported_languages:
+                self.document.reporter.warning('No smart quotes '
+                    'defined for language "%s".'%lang, base_node=node)
+            self.unsupported_languages.add(lang)
+            lang = ''
+
+        # Iterator educating quotes in plain text:
+        # '2': set all, using old school en- and em- dash shortcuts
+        teacher = smartquotes.educate_tokens(self.get_tokens(txtnodes),
+                                             attr='2', language=lang)
+
+        for txtnode, newtext in zip(txtnodes, teacher):
+            txtnode.parent.replace(txtnode, nodes.Text(newtext))
+
+        self.unsupported_languages = set() # reset
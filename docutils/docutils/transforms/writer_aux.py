@@ -15,10 +15,10 @@ conflicting imports like this one::
 __docformat__ = 'reStructuredText'
 
 from docutils import nodes, utils, languages
-from docutils.transforms import Transform
+from docutils.transforms import Transform, NodeTransform
 
 
-class Compound(Transform):
+class Compound(NodeTransform):
 
     """
     Flatten all compound paragraphs.  For example, transform ::
@@ -36,21 +36,23 @@ class Compound(Transform):
     """
 
     default_priority = 910
+    node_classes = (nodes.compound,)
+    fusion_band = 'cleanup'
 
-    def apply(self):
-        for compound in self.document.traverse(nodes.compound):
-            first_child = True
-            for child in compound:
-                if first_child:
-                    if not isinstance(child, nodes.Invisible):
-                        first_child = False
-                else:
-                    child['classes'].append('continued')
-            # Substitute children for compound.
-            compound.replace_self(compound[:])
+    def visit(self, compound):
+        first_child = True
+        for child in compound:
+            if first_child:
+                if not isinstance(child, nodes.Invisible):
+                    first_child = False
+            else:
+                child['classes'].append('continued')
+        # Substitute children for compound.
+        compound.replace_self(compound[:])
+        self.node_removed(compound)
 
 
-class Admonitions(Transform):
+class Admonitions(NodeTransform):
 
     """
     Transform specific admonitions, like this:
@@ -71,18 +73,24 @@ class Admonitions(Transform):
     """
 
     default_priority = 920
-
-    def apply(self):
-        language = languages.get_language(self.document.settings.language_code,
-                                          self.document.reporter)
-        for node in self.document.traverse(nodes.Admonition):
-            node_name = node.__class__.__name__
-            # Set class, so that we know what node this admonition came from.
-            node['classes'].append(node_name)
-            if not isinstance(node, nodes.admonition):
-                # Specific admonition.  Transform into a generic admonition.
-                admonition = nodes.admonition(node.rawsource, *node.children,
-                                              **node.attributes)
-                title = nodes.title('', language.labels[node_name])
-                admonition.insert(0, title)
-                node.replace_self(admonition)
+    node_classes = (nodes.Admonition,)
+    fusion_band = 'cleanup'
+
+    def prepare(self):
+        self.labels = languages.get_language(
+            self.document.settings.language_code,
+            self.document.reporter).labels
+        return True
+
+    def visit(self, node):
+        node_name = node.__class__.__name__
+        # Set class, so that we know what node this admonition came from.
+        node['classes'].append(node_name)
+        if not isinstance(node, nodes.admonition):
+            # Specific admonition.  Transform into a generic admonition.
+            admonition = nodes.admonition(node.rawsource, *node.children,
+                                          **node.attributes)
+            title = nodes.title('', self.labels[node_name])
+            admonition.insert(0, title)
+            node.replace_self(admonition)
+            self.node_removed(node)
@@ -8,6 +8,7 @@
 # :Copyright: This module has been placed in the public domain.
 
 from docutils import ApplicationError
+from docutils.utils.result_cache import ResultCache
 try:
     import pygments
     from pygments.lexers import get_lexer_by_name
@@ -25,6 +26,46 @@ unstyled_tokens = ['token', # Token (base token type)
 class LexerError(ApplicationError): 
     pass
 
+
+_lexers = {}
+"""Cache of Pygments lexer instances by (language, options)."""
+
+def get_lexer(language, **options):
+    """Return a (shared) Pygments lexer for `language`.
+
+    Raise `pygments.util.ClassNotFound` if there is none.
+    """
+    key = (language, tuple(sorted(options.items())))
+    try:
+        return _lexers[key]
+    except KeyError:
+        lexer = _lexers[key] = get_lexer_by_name(language, **options)
+        return lexer
+
+
+class TokenCache(ResultCache):
+    """Store the classified tokens of analyzed code.
+
+    Keys are ``(language, tokennames, code)``, values lists of tokens.
+    """
+
+    suffix = '.tokens'
+
+    def version(self):
+        return pygments.__version__
+
+
+_token_caches = {}
+
+def get_token_cache(directory=None):
+    """Return the (shared) `TokenCache` storing files in `directory`."""
+    try:
+        return _token_caches[directory]
+    except KeyError:
+        cache = _token_caches[directory] = TokenCache(directory)
+        return cache
+
+
 class Lexer(object):
     """Parse `code` lines and yield "classified" tokens.
 
@@ -32,7 +73,8 @@ class Lexer(object):
 
       code       -- string of source code to parse,
       language   -- formal language the code is written in,
-      tokennames -- either 'long', 'short', or '' (see below).
+      tokennames -- either 'long', 'short', or '' (see below),
+      cache      -- `TokenCache` for the classified tokens (optional).
 
     Merge subsequent tokens of the same token-type.
 
@@ -45,13 +87,14 @@ class Lexer(object):
       'none':      skip lexical analysis.
     """
 
-    def __init__(self, code, language, tokennames='short'):
+    def __init__(self, code, language, tokennames='short', cache=None):
         """
         Set up a lexical analyzer for `code` in `language`.
         """
         self.code = code
         self.language = language
         self.tokennames = tokennames
+        self.cache = cache
         self.lexer = None
         # get lexical analyzer for `language`:
         if language in ('', 'text') or tokennames == 'none':
@@ -60,7 +103,7 @@ class Lexer(object):
             raise LexerError('Cannot analyze code. '
                                     'Pygments package not found.')
         try:
-            self.lexer = get_lexer_by_name(self.language)
+            self.lexer = get_lexer(self.language)
         except pygments.util.ClassNotFound:
             raise LexerError('Cannot analyze code. '
                 'No Pygments lexer found for "%s".' % language)
@@ -93,6 +136,21 @@ class Lexer(object):
         if self.lexer is None:
             yield ([], self.code)
             return
+        if self.cache is None:
+            for classes, value in self.classify():
+                yield (classes, value)
+            return
+        key = (self.language, self.tokennames, self.code)
+        tokens = self.cache.get(key)
+        if tokens is None:
+            tokens = [(tuple(classes), value)
+                      for classes, value in self.classify()]
+            self.cache.put(key, tokens)
+        for classes, value in tokens:
+            yield (list(classes), value)
+
+    def classify(self):
+        """Analyze self.code and yield "classified" tokens."""
         tokens = pygments.lex(self.code, self.lexer)
         for tokentype, value in self.merge(tokens):
             if self.tokennames == 'long': # long CSS class args
@@ -0,0 +1,265 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+A disk cache for parsed document trees.
+
+Rendering one source into several output formats parses the source once
+per format.  With the "doctree_cache" setting, the `Publisher` stores the
+document tree returned by the parser (before the transforms are applied,
+as these depend on the writer) in a cache directory and reuses it for the
+next run with the same source text, Docutils version, reader, parser, and
+parse-relevant settings.
+
+System messages generated by the parser are reported only when the source
+is actually parsed.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import os
+import sys
+import tempfile
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import sha1
+except ImportError:                     # Python < 2.5
+    from sha import new as sha1
+
+import docutils
+from docutils import nodes, transforms, utils
+
+
+general_parse_settings = ('_source', 'input_encoding',
+                          'input_encoding_error_handler', 'language_code',
+                          'id_prefix', 'auto_id_prefix', 'report_level',
+                          'halt_level', 'debug')
+"""General settings that may change the result of parsing.  The settings
+of the reader and parser components are used as well."""
+
+def setting_names(settings_spec):
+    """Return the names of the settings specified by `settings_spec`."""
+    names = []
+    for i in range(0, len(settings_spec), 3):
+        for help, option_strings, kwargs in settings_spec[i+2] or ():
+            name = kwargs.get('dest')
+            if name is None:
+                long_options = [option for option in option_strings
+                                if option.startswith('--')]
+                if not long_options:
+                    continue
+                name = long_options[0][2:].replace('-', '_')
+            names.append(name)
+    return names
+
+def parse_settings(components):
+    """Return the names of the settings used for the cache key."""
+    names = set(general_parse_settings)
+    for component in components:
+        if component is not None and component.settings_spec:
+            names.update(setting_names(component.settings_spec))
+    return sorted(names)
+
+simple_types = (type(None), bool, int, long, float, str, unicode)
+
+def setting_value(value):
+    """
+    Return a representation of a setting value for the cache key, or None
+    if the value is not a (list of) simple value(s).
+    """
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            if not isinstance(item, simple_types):
+                return None
+    elif not isinstance(value, simple_types):
+        return None
+    return repr(value)
+
+
+class DoctreeCache(object):
+
+    """
+    Document trees stored in a directory, one pickle file per source.
+
+    Besides the document tree, a cache entry holds the transforms added by
+    the parser, the maximum level of system messages, and the files read
+    by the parser (included files etc.) with their modification times.
+    An entry is not used if one of these files has changed.
+    """
+
+    size = 1000
+    """Maximum number of entries; the least recently used entries are
+    removed when it is exceeded."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        """The cache directory."""
+
+    def key(self, text, reader, parser, settings):
+        """Return the cache key for the source `text`."""
+        key = sha1()
+        key.update(repr((docutils.__version__, docutils.__version_details__,
+                         sys.version_info[:2], nodes.compact_nodes)))
+        for component in reader, parser:
+            key.update('%s.%s\n' % (component.__class__.__module__,
+                                    component.__class__.__name__))
+        for name in parse_settings((reader, parser)):
+            value = setting_value(getattr(settings, name, None))
+            if value is not None:
+                key.update('%s=%s\n' % (name, value))
+        # depends on a writer setting ("footnote_references"):
+        key.update('trim_footnote_ref_space=%r\n'
+                   % utils.get_trim_footnote_ref_space(settings))
+        if isinstance(text, unicode):
+            text = text.encode('utf-8')
+        key.update(text)
+        return key.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.doctree')
+
+    def read(self, reader, source, parser, settings):
+        """
+        Run `reader.read()` with the document tree from the cache, or parse
+        and store it: `reader.parse()` is replaced by `parse()` meanwhile.
+        """
+        parse = reader.parse
+        reader.parse = lambda: self.parse(reader, parse)
+        try:
+            return reader.read(source, parser, settings)
+        finally:
+            del reader.parse
+
+    def parse(self, reader, parse):
+        """
+        Set `reader.document` to the cached document tree of `reader.input`
+        or call `parse` (the original `reader.parse()`) and store it.
+        """
+        settings = reader.settings
+        if (not isinstance(reader.input, basestring) # e.g. doctree reader
+            or getattr(settings, 'parse_profile', None)
+            or getattr(reader.parser, 'profile', None) is not None):
+            # parse statistics are recorded only when parsing
+            parse()
+            return
+        key = self.key(reader.input, reader, reader.parser, settings)
+        reader.document = self.load(key, reader.source.source_path, settings)
+        if reader.document is not None:
+            return
+        # record the files read by this parse only (the shared list does
+        # not repeat files recorded for other documents)
+        recorded = settings.record_dependencies
+        settings.record_dependencies = utils.DependencyList()
+        try:
+            parse()
+        finally:
+            dependencies = settings.record_dependencies.list
+            settings.record_dependencies = recorded
+            recorded.add(*dependencies)
+        self.store(key, reader.document, dependencies)
+
+    def load(self, key, source_path, settings):
+        """Return the cached document tree for `key` or None."""
+        try:
+            cache_file = open(self.path(key), 'rb')
+            try:
+                entry = pickle.load(cache_file)
+            finally:
+                cache_file.close()
+        except (IOError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(self.path(key), None)  # recently used
+        except OSError:
+            pass
+        for path, mtime in entry['dependencies']:
+            try:
+                if os.path.getmtime(path) != mtime:
+                    return None
+            except OSError:
+                return None
+        document = entry['document']
+        document.settings = settings
+        document.reporter = utils.new_reporter(utils.decode_path(source_path),
+                                               settings)
+        document.reporter.max_level = entry['max_level']
+        document.transformer = transforms.Transformer(document)
+        document.transformer.transforms = entry['transforms']
+        document.transformer.serialno = entry['serialno']
+        settings.record_dependencies.add(
+            *[path for path, mtime in entry['dependencies']])
+        return document
+
+    def store(self, key, document, dependencies):
+        """
+        Store `document` (with its parse-time transforms) under `key`.
+        Do nothing if the document tree cannot be pickled.
+        """
+        entry = {'document': document,
+                 'transforms': document.transformer.transforms,
+                 'serialno': document.transformer.serialno,
+                 'max_level': document.reporter.max_level,
+                 'dependencies': []}
+        try:
+            for path in dependencies:
+                entry['dependencies'].append((path, os.path.getmtime(path)))
+        except OSError:
+            return
+        settings = document.settings
+        document.settings = None        # may hold open files
+        try:
+            try:
+                data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                return
+        finally:
+            document.settings = settings
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            # write to a temporary file first: concurrent readers see
+            # either no or a complete cache file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        except (IOError, OSError):
+            return
+        try:
+            tmp_file = os.fdopen(fd, 'wb')
+            try:
+                tmp_file.write(data)
+            finally:
+                tmp_file.close()
+            if os.name == 'nt' and os.path.exists(self.path(key)):
+                os.remove(self.path(key))
+            os.rename(tmp_path, self.path(key))
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries beyond `size`."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        paths = [os.path.join(self.directory, name) for name in names
+                 if name.endswith('.doctree')]
+        if len(paths) <= self.size:
+            return
+        entries = []
+        for path in paths:
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:             # removed by another process
+                pass
+        entries.sort()
+        for mtime, path in entries[:len(entries) - self.size]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,262 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Fetching of remote resources (the ":url:" option of the "csv-table" and
+"raw" directives).
+
+A `Fetcher` retrieves URLs with a pool of worker threads, so that the
+URLs found in a document can be fetched concurrently before they are
+used (`Fetcher.prefetch()`), and keeps the responses in an HTTP cache
+that is revalidated with the ETag and Last-Modified headers of the
+response.  In offline mode, only cached responses are used.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import threading
+try:
+    import Queue as queue
+except ImportError:                     # Python 3
+    import queue
+
+from docutils.utils.result_cache import ResultCache
+
+
+class ResponseCache(ResultCache):
+
+    """
+    Responses by URL: ``(data, etag, last_modified)`` tuples, with the
+    values of the "ETag" and "Last-Modified" headers (or None).
+    """
+
+    suffix = '.response'
+
+    def version(self):
+        # responses do not depend on the Docutils version
+        return 'response'
+
+
+class Job(object):
+
+    """The retrieval of one URL."""
+
+    def __init__(self, url):
+        self.url = url
+        self.done = threading.Event()
+        self.data = None
+        """The content (a byte string)."""
+        self.error = None
+        """The exception raised by the retrieval, or None."""
+
+
+class Fetcher(object):
+
+    """
+    Retrieve URLs concurrently and cache the responses.
+
+    A prefetched response is used by one `fetch()` call (unused ones are
+    dropped with `discard()`); later calls revalidate the cached response
+    with a conditional request.
+    """
+
+    workers = 4
+    """Maximum number of worker threads.  Workers stop when the queue is
+    empty and are started again by `prefetch()`."""
+
+    def __init__(self, directory=None, timeout=None, offline=False):
+        self.cache = ResponseCache(directory, size=100)
+        """The HTTP cache, on disk if `directory` is set."""
+
+        self.timeout = timeout
+        """Timeout in seconds for blocking operations, or None (the
+        default socket timeout)."""
+
+        self.offline = offline
+        """Use cached responses only."""
+
+        self.jobs = {}
+        """`Job` by URL."""
+
+        self.queue = queue.Queue()
+
+        self.threads = []
+        """The running worker threads."""
+
+        self.lock = threading.Lock()
+        """Guards `jobs`, `threads`, `cache` and the counters."""
+
+        self.requests = 0
+        """Number of requests sent."""
+
+        self.revalidated = 0
+        """Number of cached responses found unchanged by the server."""
+
+    def prefetch(self, urls):
+        """Start retrieving `urls` in the worker threads."""
+        self.lock.acquire()
+        try:
+            for url in urls:
+                if url not in self.jobs:
+                    self.jobs[url] = job = Job(url)
+                    self.queue.put(job)
+            while (len(self.threads) < self.workers
+                   and len(self.threads) < self.queue.qsize()):
+                thread = threading.Thread(target=self.work)
+                thread.setDaemon(True)
+                thread.start()
+                self.threads.append(thread)
+        finally:
+            self.lock.release()
+
+    def discard(self, urls):
+        """
+        Forget the prefetched responses of `urls` that were not used by
+        `fetch()` (call after processing the document).  Running
+        retrievals complete, but their responses are not used.
+        """
+        self.lock.acquire()
+        try:
+            for url in urls:
+                self.jobs.pop(url, None)
+        finally:
+            self.lock.release()
+
+    def fetch(self, url):
+        """
+        Return the content of `url` (a byte string).
+
+        Wait for a prefetched URL, retrieve other URLs in this thread.
+        Raise the exception of a failed retrieval (`urllib2.URLError`,
+        `IOError`, `OSError`, or `ValueError`).
+        """
+        self.lock.acquire()
+        try:
+            job = self.jobs.get(url)
+            if job is None:
+                self.jobs[url] = job = Job(url)
+                run = True
+            else:
+                run = False
+        finally:
+            self.lock.release()
+        if run:
+            self.run(job)
+        job.done.wait()
+        self.lock.acquire()
+        try:
+            if self.jobs.get(url) is job:
+                del self.jobs[url]
+        finally:
+            self.lock.release()
+        if job.error is not None:
+            raise job.error
+        return job.data
+
+    def work(self):
+        """Run queued jobs (in a worker thread) until the queue is empty."""
+        while True:
+            self.lock.acquire()
+            try:
+                try:
+                    job = self.queue.get_nowait()
+                except queue.Empty:
+                    # checked with the lock held: `prefetch()` starts a
+                    # new worker for jobs queued after this point
+                    self.threads.remove(threading.currentThread())
+                    return
+            finally:
+                self.lock.release()
+            self.run(job)
+
+    def run(self, job):
+        try:
+            try:
+                job.data = self.retrieve(job.url)
+            except Exception, error:
+                job.error = error
+        finally:
+            job.done.set()
+
+    def retrieve(self, url):
+        """Return the content of `url`, using and updating the cache."""
+        # Do not import urllib2 at the top of the module because
+        # it may fail due to broken SSL dependencies, and it takes
+        # about 0.15 seconds to load.
+        import urllib2
+        self.lock.acquire()
+        try:
+            entry = self.cache.get((url,))
+        finally:
+            self.lock.release()
+        if self.offline:
+            if entry is None:
+                raise urllib2.URLError('offline, and "%s" is not cached'
+                                       % url)
+            return entry[0]
+        request = urllib2.Request(url)
+        if entry is not None:
+            data, etag, last_modified = entry
+            if etag:
+                request.add_header('If-None-Match', etag)
+            if last_modified:
+                request.add_header('If-Modified-Since', last_modified)
+        self.count('requests')
+        try:
+            if self.timeout is None:
+                response = urllib2.urlopen(request)
+            else:
+                response = urllib2.urlopen(request, timeout=self.timeout)
+        except urllib2.HTTPError, error:
+            if error.code == 304 and entry is not None:
+                self.count('revalidated')
+                return entry[0]
+            raise
+        try:
+            data = response.read()
+            headers = response.info()
+        finally:
+            response.close()
+        self.lock.acquire()
+        try:
+            self.cache.put((url,), (data, headers.get('ETag'),
+                                    headers.get('Last-Modified')))
+        finally:
+            self.lock.release()
+        return data
+
+    def count(self, counter):
+        """Increment the counter attribute `counter` (from any thread)."""
+        self.lock.acquire()
+        try:
+            setattr(self, counter, getattr(self, counter) + 1)
+        finally:
+            self.lock.release()
+
+
+_fetchers = {}
+
+max_fetchers = 8
+"""Maximum number of shared fetchers kept by `get_fetcher()`."""
+
+def get_fetcher(settings):
+    """
+    Return the shared `Fetcher` for the "url_cache", "url_timeout", and
+    "url_offline" settings in `settings`.
+    """
+    key = (getattr(settings, 'url_cache', None),
+           getattr(settings, 'url_timeout', None),
+           bool(getattr(settings, 'url_offline', False)))
+    try:
+        return _fetchers[key]
+    except KeyError:
+        if len(_fetchers) >= max_fetchers:
+            # idle fetchers have no threads; busy ones are kept alive by
+            # their users
+            _fetchers.clear()
+        fetcher = _fetchers[key] = Fetcher(*key)
+        return fetcher
+
+def clear_fetchers():
+    """Drop the shared fetchers (and their in-memory caches)."""
+    _fetchers.clear()
@@ -0,0 +1,112 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Image metadata (dimensions, format, resolution, file size, content hash)
+for the image sizing of directives and writers.
+
+The metadata is read with the Python Imaging Library, which only parses
+the image header (the pixel data is not decoded), and cached by path,
+modification time, and file size: in memory for all documents of a
+process and, with the "image_cache" setting, in a directory.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import os
+try:
+    from hashlib import sha1
+except ImportError:                     # Python < 2.5
+    from sha import new as sha1
+
+from docutils.utils.result_cache import ResultCache
+
+try: # check for the Python Imaging Library
+    import PIL.Image
+except ImportError:
+    try:  # sometimes PIL modules are put in PYTHONPATH's root
+        import Image
+        class PIL(object): pass  # dummy wrapper
+        PIL.Image = Image
+    except ImportError:
+        PIL = None
+
+
+class ImageInfoCache(ResultCache):
+
+    """
+    Image metadata by ``(path, modification time, file size)``.
+
+    The results are dictionaries, see `get_image_info()`.
+    """
+
+    suffix = '.imageinfo'
+
+
+_image_info_caches = {}
+
+def get_image_info_cache(directory=None):
+    """Return the (shared) `ImageInfoCache` storing files in `directory`."""
+    try:
+        return _image_info_caches[directory]
+    except KeyError:
+        cache = _image_info_caches[directory] = ImageInfoCache(directory)
+        return cache
+
+
+def read_image_info(path):
+    """
+    Return the metadata of the image file `path` (see `get_image_info()`).
+
+    Raise `IOError` if the file cannot be read or is not an image.
+    """
+    image_file = open(path, 'rb')
+    try:
+        image = PIL.Image.open(image_file)
+        info = {'size': tuple(image.size),
+                'format': image.format,
+                'dpi': image.info.get('dpi')}
+        del image
+        # the content hash: read the file, but do not decode it
+        image_file.seek(0)
+        digest = sha1()
+        length = 0
+        while True:
+            chunk = image_file.read(65536)
+            if not chunk:
+                break
+            digest.update(chunk)
+            length += len(chunk)
+    finally:
+        image_file.close()
+    info['bytes'] = length
+    info['digest'] = digest.hexdigest()
+    return info
+
+
+def get_image_info(path, directory=None):
+    """
+    Return a dictionary with the metadata of the image file `path`, or
+    None if the Python Imaging Library is not installed:
+
+    :size: ``(width, height)`` in pixels,
+    :format: the format name of PIL (e.g. "PNG"),
+    :dpi: the resolution stored in the file (a number or a
+          ``(x, y)`` pair), or None,
+    :bytes: the file size,
+    :digest: the SHA-1 hash of the file content (hexadecimal).
+
+    `directory` is the "image_cache" setting.  Raise `OSError` if the
+    file does not exist (or cannot be accessed), `IOError` if it cannot
+    be read or is not an image.
+    """
+    if PIL is None:
+        return None
+    stat = os.stat(path)
+    key = (os.path.abspath(path), repr(stat.st_mtime), str(stat.st_size))
+    cache = get_image_info_cache(directory)
+    info = cache.get(key)
+    if info is None:
+        info = read_image_info(path)
+        cache.put(key, info)
+    return info.copy()
@@ -0,0 +1,398 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Instrumentation of the document processing: counters of document tree
+operations, statistics per transform (see the "transform_profile"
+setting and `docutils.transforms.Transformer.attach_observer()`), and
+statistics of the reStructuredText parser (see the "parse_profile"
+setting and `ParseProfile`).
+"""
+
+__docformat__ = 'reStructuredText'
+
+import threading
+import time
+
+from docutils import nodes
+
+
+class TreeOperationCounter(object):
+
+    """
+    Count the nodes visited by tree traversals and the modifications of
+    document trees.
+
+    While a counter is installed, the traversal and modification methods
+    of `nodes.Node` and `nodes.Element` are replaced by counting wrappers
+    (shared by all installed counters; the original methods are restored
+    when the last counter is uninstalled).  A counter counts the
+    operations of the thread that installed it.  Otherwise, counting
+    costs nothing.
+    """
+
+    traversal_methods = ('walk', 'walkabout', '_fast_traverse',
+                         '_all_traverse')
+    """Recursive methods, called once for every node visited."""
+
+    mutation_methods = ('__setitem__', '__delitem__', 'append', 'insert',
+                        'pop', 'remove', 'clear', 'replace',
+                        'replace_children')
+    """Methods modifying an element.  Calls made by another of these
+    methods (e.g. `replace()` calls `__setitem__()`) are not counted."""
+
+    _lock = threading.Lock()
+    _installs = 0
+    """Number of installed counters (in all threads)."""
+    _originals = None
+    """The replaced ``(owner, name, original)`` while installed."""
+    _local = threading.local()
+    """The installed counters of a thread (``counters`` attribute)."""
+
+    def __init__(self):
+        self.visited = 0
+        """Number of nodes visited."""
+
+        self.mutations = 0
+        """Number of element modifications."""
+
+        self._depth = 0
+        self._counters = None
+        """The list of installed counters this counter is in, or None."""
+
+    def install(self):
+        """Start counting (in all document trees, in this thread)."""
+        if self._counters is not None:
+            return
+        cls = TreeOperationCounter
+        cls._lock.acquire()
+        try:
+            if not cls._installs:
+                cls.replace_methods()
+            cls._installs += 1
+        finally:
+            cls._lock.release()
+        try:
+            counters = cls._local.counters
+        except AttributeError:
+            counters = cls._local.counters = []
+        counters.append(self)
+        self._counters = counters
+
+    def uninstall(self):
+        """Stop counting; restore the original methods if no other
+        counter is installed."""
+        if self._counters is None:
+            return
+        self._counters.remove(self)
+        self._counters = None
+        cls = TreeOperationCounter
+        cls._lock.acquire()
+        try:
+            cls._installs -= 1
+            if not cls._installs:
+                for owner, name, original in cls._originals:
+                    setattr(owner, name, original)
+                cls._originals = None
+        finally:
+            cls._lock.release()
+
+    def replace_methods(cls):
+        originals = []
+        for owner in nodes.Node, nodes.Element:
+            for name in cls.traversal_methods + cls.mutation_methods:
+                if name in owner.__dict__:
+                    method = owner.__dict__[name]
+                    originals.append((owner, name, method))
+                    if name in cls.traversal_methods:
+                        setattr(owner, name, counting_visit(method))
+                    else:
+                        setattr(owner, name, counting_mutation(method))
+        originals.append((nodes, '_iter_nodes', nodes._iter_nodes))
+        nodes._iter_nodes = counting_iter_nodes(nodes._iter_nodes)
+        cls._originals = originals
+    replace_methods = classmethod(replace_methods)
+
+
+def installed_counters():
+    """Return the `TreeOperationCounter` objects of this thread."""
+    return getattr(TreeOperationCounter._local, 'counters', ())
+
+def counting_visit(method):
+    def wrapper(node, *args, **kwargs):
+        for counter in installed_counters():
+            counter.visited += 1
+        return method(node, *args, **kwargs)
+    return wrapper
+
+def counting_mutation(method):
+    def wrapper(node, *args, **kwargs):
+        counters = [counter for counter in installed_counters()
+                    if not counter._depth]
+        for counter in counters:
+            counter.mutations += 1
+            counter._depth += 1
+        try:
+            return method(node, *args, **kwargs)
+        finally:
+            for counter in counters:
+                counter._depth -= 1
+    return wrapper
+
+def counting_iter_nodes(iter_nodes):
+    # `condition` is called once for every node visited by
+    # `nodes.Node.iter_traverse()`
+    def wrapper(node_list, condition, descend):
+        def counting_condition(node):
+            for counter in installed_counters():
+                counter.visited += 1
+            return condition is None or condition(node)
+        return iter_nodes(node_list, counting_condition, descend)
+    return wrapper
+
+
+class TransformRecord(object):
+
+    """Statistics of one applied transform."""
+
+    fields = ('priority', 'transform', 'pending', 'seconds', 'visited',
+              'mutations')
+    """Columns of the transform profile report."""
+
+    def __init__(self, priority, transform_class, pending, seconds,
+                 visited, mutations):
+        self.priority = priority
+        """Priority string (see `Transformer.get_priority_string()`)."""
+
+        self.transform_class = transform_class
+
+        self.pending = pending
+        """The `nodes.pending` node of the transform, or None."""
+
+        self.seconds = seconds
+        """Wall time of `Transform.apply()`."""
+
+        self.visited = visited
+        """Number of nodes visited (see `TreeOperationCounter`)."""
+
+        self.mutations = mutations
+        """Number of document tree modifications."""
+
+    def transform_name(self):
+        return class_name(self.transform_class)
+
+    def values(self):
+        """Return the values of the `fields`, as strings."""
+        return (self.priority, self.transform_name(),
+                str(int(self.pending is not None)), '%.6f' % self.seconds,
+                str(self.visited), str(self.mutations))
+
+
+class TransformProfile(object):
+
+    """
+    Measure the transforms applied by a `Transformer`.
+
+    Call `start()` before and `stop()` after applying a transform.
+    """
+
+    def __init__(self):
+        self.records = []
+        """`TransformRecord` objects, in order of application."""
+
+        self.counter = TreeOperationCounter()
+        self._start = None
+
+    def start(self):
+        self.counter.visited = self.counter.mutations = 0
+        self.counter.install()
+        self._start = time.time()
+
+    def stop(self, priority, transform_class, pending):
+        """Return and store the `TransformRecord` of the transform."""
+        seconds = time.time() - self._start
+        self.counter.uninstall()
+        record = TransformRecord(priority, transform_class, pending, seconds,
+                                 self.counter.visited, self.counter.mutations)
+        self.records.append(record)
+        return record
+
+    def report(self):
+        """
+        Return the statistics as tab-separated values, one line per
+        transform, with a header line.
+        """
+        lines = ['\t'.join(TransformRecord.fields)]
+        for record in self.records:
+            lines.append('\t'.join(record.values()))
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        report_file = open(path, 'w')
+        try:
+            report_file.write(self.report())
+        finally:
+            report_file.close()
+
+
+class ParseProfile(object):
+
+    """
+    Statistics of a parser run (see the "parse_profile" setting of the
+    reStructuredText parser):
+
+    * attempts and matches of each state machine transition and the time
+      spent in its transition method,
+    * the time spent in each directive class,
+    * the number of nested parses per nesting depth, and their time,
+    * the time spent in inline markup parsing (`Inliner.parse()`).
+
+    Times are inclusive: the time of a transition method includes the time
+    of the nested parses and directives it runs.
+
+    Functions attached with `attach_observer()` are called for every
+    timed event, with the kind of event ("transition", "directive",
+    "nested_parse", or "inline"), the name of the transition, directive
+    class, nesting depth, or parser, the time in seconds, and the line
+    number (or None).  For example, to log slow directives::
+
+        def observer(kind, name, seconds, line):
+            if kind == 'directive' and seconds > 1:
+                sys.stderr.write('line %s: %s\\n' % (line, name))
+    """
+
+    fields = ('kind', 'name', 'count', 'hits', 'seconds')
+    """Columns of the parse profile report."""
+
+    def __init__(self):
+        self.transitions = {}
+        """Mapping of ``(state name, transition name)`` to a list
+        ``[attempts, matches, seconds]``."""
+
+        self.directives = {}
+        """Mapping of directive class to ``[calls, seconds]``."""
+
+        self.nested_parses = {}
+        """Mapping of nesting depth to ``[nested parses, seconds]``."""
+
+        self.inline = [0, 0.0]
+        """Calls of `Inliner.parse()` and their time."""
+
+        self.observers = []
+        """Functions called for every timed event."""
+
+        self._nested_starts = []
+
+    def attach_observer(self, observer):
+        self.observers.append(observer)
+
+    def detach_observer(self, observer):
+        self.observers.remove(observer)
+
+    def notify(self, kind, name, seconds, line):
+        for observer in self.observers:
+            observer(kind, name, seconds, line)
+
+    def add_attempt(self, state_name, transition_name):
+        """Count an attempt to match a transition which did not match."""
+        key = (state_name, transition_name)
+        try:
+            self.transitions[key][0] += 1
+        except KeyError:
+            self.transitions[key] = [1, 0, 0.0]
+
+    def add_match(self, state_name, transition_name, seconds, line):
+        """Count a matching transition whose method took `seconds`."""
+        key = (state_name, transition_name)
+        try:
+            counts = self.transitions[key]
+        except KeyError:
+            counts = self.transitions[key] = [0, 0, 0.0]
+        counts[0] += 1
+        counts[1] += 1
+        counts[2] += seconds
+        if self.observers:
+            self.notify('transition', '%s.%s' % key, seconds, line)
+
+    def run_directive(self, directive):
+        """Return the result of ``directive.run()``, timed."""
+        start = time.time()
+        try:
+            return directive.run()
+        finally:
+            seconds = time.time() - start
+            cls = directive.__class__
+            try:
+                counts = self.directives[cls]
+            except KeyError:
+                counts = self.directives[cls] = [0, 0.0]
+            counts[0] += 1
+            counts[1] += seconds
+            if self.observers:
+                self.notify('directive', class_name(cls), seconds,
+                            directive.lineno)
+
+    def begin_nested_parse(self):
+        self._nested_starts.append(time.time())
+
+    def end_nested_parse(self, line):
+        """Count a nested parse started at (0-based) input offset `line`."""
+        depth = len(self._nested_starts)
+        seconds = time.time() - self._nested_starts.pop()
+        try:
+            counts = self.nested_parses[depth]
+        except KeyError:
+            counts = self.nested_parses[depth] = [0, 0.0]
+        counts[0] += 1
+        counts[1] += seconds
+        if self.observers:
+            self.notify('nested_parse', depth, seconds, line + 1)
+
+    def parse_inline(self, inliner, text, lineno, memo, parent):
+        """Return the result of ``inliner.parse()``, timed."""
+        start = time.time()
+        try:
+            return inliner.parse(text, lineno, memo, parent)
+        finally:
+            seconds = time.time() - start
+            self.inline[0] += 1
+            self.inline[1] += seconds
+            if self.observers:
+                self.notify('inline', 'Inliner.parse', seconds, lineno)
+
+    def report(self):
+        """
+        Return the statistics as tab-separated values with a header line.
+        The "hits" column holds the matches of transitions and is empty
+        for the other kinds of rows.
+        """
+        rows = []
+        for (state_name, name), (attempts, hits, seconds) in sorted(
+            self.transitions.items()):
+            rows.append(('transition', '%s.%s' % (state_name, name),
+                         str(attempts), str(hits), seconds))
+        directives = [(class_name(cls), counts)
+                      for cls, counts in self.directives.items()]
+        for name, (calls, seconds) in sorted(directives):
+            rows.append(('directive', name, str(calls), '', seconds))
+        for depth, (count, seconds) in sorted(self.nested_parses.items()):
+            rows.append(('nested_parse', str(depth), str(count), '',
+                         seconds))
+        if self.inline[0]:
+            rows.append(('inline', 'Inliner.parse', str(self.inline[0]), '',
+                         self.inline[1]))
+        lines = ['\t'.join(self.fields)]
+        for row in rows:
+            lines.append('\t'.join(row[:-1] + ('%.6f' % row[-1],)))
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        report_file = open(path, 'w')
+        try:
+            report_file.write(self.report())
+        finally:
+            report_file.close()
+
+
+def class_name(cls):
+    return '%s.%s' % (cls.__module__, cls.__name__)
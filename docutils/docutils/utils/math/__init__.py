@@ -21,9 +21,25 @@ It contains various modules for conversion between different math formats
 :tex2unichar: LaTeX math to Unicode character translation dictionaries
 """
 
+from docutils.utils.result_cache import ResultCache
+
 # helpers for Docutils math support
 # =================================
 
+_math_caches = {}
+
+def get_math_cache(directory=None):
+    """Return the (shared) cache of converted math formulas storing files
+    in `directory` (see `docutils.utils.result_cache.ResultCache`).
+
+    Keys are ``(output format, math environment, LaTeX code)``.
+    """
+    try:
+        return _math_caches[directory]
+    except KeyError:
+        cache = _math_caches[directory] = ResultCache(directory)
+        return cache
+
 def pick_math_environment(code, numbered=False):
     """Return the right math environment to display `code`.
 
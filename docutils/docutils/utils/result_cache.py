@@ -0,0 +1,155 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Caches for the results of expensive conversions (code highlighting, math
+conversion) that are repeated within and across documents.
+
+A `ResultCache` keeps the most recently used results in memory and,
+optionally, all results in a directory, so that later runs reuse them.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import os
+import tempfile
+import threading
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import sha1
+except ImportError:                     # Python < 2.5
+    from sha import new as sha1
+
+import docutils
+
+
+class ResultCache(object):
+
+    """
+    Store conversion results by key.
+
+    Keys are tuples of strings.  The results of the `size` most recently
+    used keys are kept in memory; if `directory` is set, all results are
+    stored in files in `directory` (one pickle file per key).
+
+    A cache may be shared by several threads.
+    """
+
+    suffix = '.pickle'
+    """File name extension of the cache files."""
+
+    def __init__(self, directory=None, size=1000):
+        self.directory = directory
+        """Directory for the cache files, or None (memory only)."""
+
+        self.size = size
+        """Maximum number of results kept in memory."""
+
+        self.entries = {}
+        """Mapping of keys to ``[last use, result]`` lists."""
+
+        self.clock = 0
+
+        self.hits = 0
+        """Number of results found in the cache."""
+
+        self.misses = 0
+        """Number of results not found in the cache."""
+
+        self.lock = threading.Lock()
+        """Guards `entries` and the counters."""
+
+    def version(self):
+        """
+        Return a string identifying the converter version (part of the
+        file names, so that results of other versions are not used).
+        """
+        return docutils.__version__
+
+    def get(self, key):
+        """Return the result for `key` or None."""
+        self.lock.acquire()
+        try:
+            self.clock += 1
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry[0] = self.clock
+                self.hits += 1
+                return entry[1]
+        finally:
+            self.lock.release()
+        if self.directory is not None:
+            try:
+                cache_file = open(self.path(key), 'rb')
+                try:
+                    result = pickle.load(cache_file)
+                finally:
+                    cache_file.close()
+            except (IOError, EOFError, pickle.UnpicklingError,
+                    AttributeError, ImportError, ValueError, TypeError):
+                pass
+            else:
+                self.lock.acquire()
+                try:
+                    self.remember(key, result)
+                    self.hits += 1
+                finally:
+                    self.lock.release()
+                return result
+        self.lock.acquire()
+        try:
+            self.misses += 1
+        finally:
+            self.lock.release()
+        return None
+
+    def put(self, key, result):
+        """Store `result` (not None) under `key`."""
+        self.lock.acquire()
+        try:
+            self.clock += 1
+            self.remember(key, result)
+        finally:
+            self.lock.release()
+        if self.directory is None:
+            return
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            # write to a temporary file first: concurrent readers see
+            # either no or a complete cache file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            tmp_file = os.fdopen(fd, 'wb')
+            try:
+                pickle.dump(result, tmp_file, pickle.HIGHEST_PROTOCOL)
+            finally:
+                tmp_file.close()
+            if os.path.exists(self.path(key)):    # for Windows
+                os.remove(self.path(key))
+            os.rename(tmp_path, self.path(key))
+        except (IOError, OSError, pickle.PicklingError):
+            pass
+
+    def remember(self, key, result):
+        """Keep `result` in memory (call with `lock` held)."""
+        entries = self.entries
+        entries[key] = [self.clock, result]
+        if len(entries) > self.size:
+            # drop the least recently used quarter
+            stamps = sorted([entry[0] for entry in entries.values()])
+            limit = stamps[len(stamps) // 4]
+            for key, entry in entries.items():
+                if entry[0] < limit:
+                    entries.pop(key, None)
+
+    def path(self, key):
+        """Return the path of the cache file for `key`."""
+        digest = sha1(self.version())
+        for part in key:
+            if isinstance(part, unicode):
+                part = part.encode('utf-8')
+            digest.update('\0' + part)
+        return os.path.join(self.directory, digest.hexdigest() + self.suffix)
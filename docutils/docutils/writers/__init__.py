@@ -49,6 +49,11 @@ class Writer(Component):
     language = None
     """Language module for the document; set by `write`."""
 
+    streamed = False
+    """True if `translate` wrote the output to `destination` itself, part
+    by part (using `docutils.io.Output.write_chunk`); `output` is None then.
+    """
+
     destination = None
     """`docutils.io` Output object; where to write the document.
     Set by `write`."""
@@ -70,6 +75,11 @@ class Writer(Component):
         native format, and write it out to its `destination` (a
         `docutils.io.Output` subclass object).
 
+        Return the value of ``destination.write()`` (usually the encoded
+        output), or None if the writer wrote the output to `destination`
+        itself (`streamed`, e.g. the HTML writer with the "stream_output"
+        setting); `self.output` is None then, too.
+
         Normally not overridden or extended in subclasses.
         """
         self.document = document
@@ -77,7 +87,10 @@ class Writer(Component):
             document.settings.language_code,
             document.reporter)
         self.destination = destination
+        self.streamed = False
         self.translate()
+        if self.streamed:
+            return None
         output = self.destination.write(self.output)
         return output
 
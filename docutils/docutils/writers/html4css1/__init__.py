@@ -21,22 +21,32 @@ import os.path
 import time
 import re
 import urllib
-try: # check for the Python Imaging Library
-    import PIL.Image
-except ImportError:
-    try:  # sometimes PIL modules are put in PYTHONPATH's root
-        import Image
-        class PIL(object): pass  # dummy wrapper
-        PIL.Image = Image
-    except ImportError:
-        PIL = None
 import docutils
 from docutils import frontend, nodes, utils, writers, languages, io
 from docutils.utils.error_reporting import SafeString
 from docutils.transforms import writer_aux
 from docutils.utils.math import unichar2tex, pick_math_environment, math2html
+from docutils.utils.math import get_math_cache
+from docutils.utils.image_info import PIL, get_image_info
 from docutils.utils.math.latex2mathml import parse_latex_math
 
+
+# Translation tables for `HTMLTranslator.encode()` and `.attval()`
+# (a codec to do these and all other HTML entities would be nice):
+special_characters = {
+    ord('&'): u'&amp;',
+    ord('<'): u'&lt;',
+    ord('"'): u'&quot;',
+    ord('>'): u'&gt;',
+    ord('@'): u'&#64;', # may thwart some address harvesters
+    # TODO: convert non-breaking space only if needed?
+    0xa0: u'&nbsp;', # non-breaking space
+    }
+whitespace_characters = dict([(ord(_char), u' ')
+                              for _char in u'\n\r\t\v\f'])
+"""Whitespace normalized to blanks in attribute values."""
+
+
 class Writer(writers.Writer):
 
     supported = ('html', 'html4css1', 'xhtml')
@@ -143,6 +153,9 @@ class Writer(writers.Writer):
           'or "LaTeX". Default: "HTML math.css"',
           ['--math-output'],
           {'default': 'HTML math.css'}),
+         ('Keep the HTML or MathML code of converted math in <directory> and '
+          'reuse it for identical formulas (also in later runs).',
+          ['--math-cache'], {'metavar': '<directory>'}),
          ('Omit the XML declaration.  Use with caution.',
           ['--no-xml-declaration'],
           {'dest': 'xml_declaration', 'default': 1, 'action': 'store_false',
@@ -150,10 +163,19 @@ class Writer(writers.Writer):
          ('Obfuscate email addresses to confuse harvesters while still '
           'keeping email links usable with standards-compliant browsers.',
           ['--cloak-email-addresses'],
-          {'action': 'store_true', 'validator': frontend.validate_boolean}),))
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Write the output file section by section while translating, '
+          'to limit the memory used for large documents.',
+          ['--stream-output'],
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Translate the whole document before writing it.  (default)',
+          ['--no-stream-output'],
+          {'dest': 'stream_output', 'action': 'store_false'}),))
 
     settings_defaults = {'output_encoding_error_handler': 'xmlcharrefreplace'}
 
+    relative_path_settings = ('math_cache',)
+
     config_section = 'html4css1 writer'
     config_section_dependencies = ('writers',)
 
@@ -164,6 +186,15 @@ class Writer(writers.Writer):
         'html_prolog', 'html_head', 'html_title', 'html_subtitle',
         'html_body')
 
+    streaming_supported = True
+    """Whether the "stream_output" setting is supported.  Subclasses
+    interpolating the body or finishing the document head differently
+    must disable it."""
+
+    streaming_template_parts = ('body', 'fragment', 'html_body')
+    """Parts which must not be used by templates in streaming mode (except
+    "body", once)."""
+
     def get_transforms(self):
         return writers.Writer.get_transforms(self) + [writer_aux.Admonitions]
 
@@ -173,18 +204,74 @@ class Writer(writers.Writer):
 
     def translate(self):
         self.visitor = visitor = self.translator_class(self.document)
+        self.stream_template = self.get_stream_template()
+        if self.stream_template:
+            self.stream_newlines = ''
+            visitor.stream = self.stream_body
         self.document.walkabout(visitor)
         for attr in self.visitor_attributes:
             setattr(self, attr, getattr(visitor, attr))
-        self.output = self.apply_template()
+        if self.streamed:
+            self.stream_body(self.body, final=True)
+            self.output = None
+        else:
+            self.output = self.apply_template()
 
-    def apply_template(self):
+    def read_template(self):
         template_file = open(self.document.settings.template, 'rb')
         template = unicode(template_file.read(), 'utf-8')
         template_file.close()
+        return template
+
+    def apply_template(self):
+        template = self.read_template()
         subs = self.interpolation_dict()
         return template % subs
 
+    def get_stream_template(self):
+        """
+        Return the template split at the body, or None if the output is not
+        streamed.  The output is streamed if the "stream_output" setting
+        is true and streaming is supported by the writer, the destination,
+        and the template.
+        """
+        if not (self.streaming_supported
+                and getattr(self.destination, 'streaming', False)
+                and self.document.settings.stream_output):
+            return None
+        template = self.read_template()
+        parts = re.findall(r'%\((\w+)\)', template)
+        if ([part for part in parts if part in self.streaming_template_parts]
+            != ['body']):
+            return None
+        return template.split('%(body)s')
+
+    def stream_body(self, body, final=False):
+        """
+        Write the translated `body` parts to the destination.
+
+        Called by the translator for each complete top-level section, and
+        with the remaining body and `final` set after the translation.
+        The first call writes the template up to the body, the final call
+        the rest of it.
+        """
+        if not self.streamed:
+            for attr in self.visitor_attributes:
+                setattr(self, attr, getattr(self.visitor, attr))
+            self.destination.write_chunk(
+                self.stream_template[0] % self.interpolation_dict())
+            self.streamed = True
+        # trailing newlines of the whole body are stripped (as in
+        # `interpolation_dict()`), keep them until more text follows:
+        text = self.stream_newlines + ''.join(body)
+        stripped = text.rstrip('\n')
+        self.stream_newlines = text[len(stripped):]
+        self.destination.write_chunk(stripped)
+        if final:
+            self.destination.write_chunk(
+                self.stream_template[1] % self.interpolation_dict())
+            self.destination.finish_chunks()
+
     def interpolation_dict(self):
         subs = {}
         settings = self.document.settings
@@ -197,7 +284,10 @@ class Writer(writers.Writer):
     def assemble_parts(self):
         writers.Writer.assemble_parts(self)
         for part in self.visitor_attributes:
-            self.parts[part] = ''.join(getattr(self, part))
+            if self.streamed and part in self.streaming_template_parts:
+                self.parts[part] = None     # already written
+            else:
+                self.parts[part] = ''.join(getattr(self, part))
 
 
 class HTMLTranslator(nodes.NodeVisitor):
@@ -304,6 +394,9 @@ class HTMLTranslator(nodes.NodeVisitor):
         self.math_output = settings.math_output.split()
         self.math_output_options = self.math_output[1:]
         self.math_output = self.math_output[0].lower()
+        self.math_cache = get_math_cache(getattr(settings, 'math_cache',
+                                                 None))
+        """Cache of converted math (shared by all translators)."""
 
         # A heterogenous stack used in conjunction with the tree traversal.
         # Make sure that the pops correspond to the pushes:
@@ -327,6 +420,12 @@ class HTMLTranslator(nodes.NodeVisitor):
         self.in_mailto = False
         self.author_in_authors = False
         self.math_header = []
+        self.head_finished = False
+        self.head_nodes = {}            # nodes added by `flush_body()`
+
+    stream = None
+    """Function called with the list of translated body parts whenever a
+    top-level section is complete (streaming mode, see `flush_body()`)."""
 
     def astext(self):
         return ''.join(self.head_prefix + self.head
@@ -336,16 +435,7 @@ class HTMLTranslator(nodes.NodeVisitor):
 
     def encode(self, text):
         """Encode special characters in `text` & return."""
-        # @@@ A codec to do these and all other HTML entities would be nice.
-        text = unicode(text)
-        return text.translate({
-            ord('&'): u'&amp;',
-            ord('<'): u'&lt;',
-            ord('"'): u'&quot;',
-            ord('>'): u'&gt;',
-            ord('@'): u'&#64;', # may thwart some address harvesters
-            # TODO: convert non-breaking space only if needed?
-            0xa0: u'&nbsp;'}) # non-breaking space
+        return unicode(text).translate(special_characters)
 
     def cloak_mailto(self, uri):
         """Try to hide a mailto: URL from harvesters."""
@@ -362,10 +452,9 @@ class HTMLTranslator(nodes.NodeVisitor):
         addr = addr.replace('.', '<span>&#46;</span>')
         return addr
 
-    def attval(self, text,
-               whitespace=re.compile('[\n\r\t\v\f]')):
+    def attval(self, text):
         """Cleanse, HTML encode, and return attribute value text."""
-        encoded = self.encode(whitespace.sub(' ', text))
+        encoded = self.encode(unicode(text).translate(whitespace_characters))
         if self.in_mailto and self.settings.cloak_email_addresses:
             # Cloak at-signs ("%40") and periods with HTML entities.
             encoded = encoded.replace('%40', '&#37;&#52;&#48;')
@@ -391,69 +480,98 @@ class HTMLTranslator(nodes.NodeVisitor):
             path = utils.relative_path(self.settings._destination, path)
         return self.stylesheet_link % self.encode(path)
 
+    tag_cache = {}
+    """Cached results of `tag_parts()`, shared by all translators."""
+
+    tag_cache_size = 1000
+    """Maximal number of entries in `tag_cache`."""
+
     def starttag(self, node, tagname, suffix='\n', empty=False, **attributes):
         """
         Construct and return a start tag given a node (id & class attributes
         are extracted), tag name, and optional attributes.
         """
-        tagname = tagname.lower()
-        prefix = []
         atts = {}
-        ids = []
-        for (name, value) in attributes.items():
+        for (name, value) in attributes.iteritems():
             atts[name.lower()] = value
-        classes = []
+        key = (self.__class__, tagname, tuple(node.get('classes', ())),
+               atts.pop('class', ''))
+        if self.in_mailto and self.settings.cloak_email_addresses:
+            # attribute values are cloaked, don't cache
+            parts = self.tag_parts(*key[1:])
+        else:
+            parts = self.tag_cache.get(key)
+            if parts is None:
+                if len(self.tag_cache) >= self.tag_cache_size:
+                    self.tag_cache.clear()
+                parts = self.tag_cache[key] = self.tag_parts(*key[1:])
+        tagname, class_atts, start = parts
+        assert 'id' not in atts
+        ids = list(node.get('ids', []))
+        if 'ids' in atts:
+            ids.extend(atts.pop('ids'))
+        prefix = ''
+        if ids:
+            atts['id'] = ids[0]
+            # Add empty "span" elements for additional IDs.  Note that
+            # we cannot use empty "a" elements because there may be
+            # targets inside of references, but nested "a" elements
+            # aren't allowed in XHTML (even if they do not all have a
+            # "href" attribute).
+            spans = ''.join(['<span id="%s"></span>' % id for id in ids[1:]])
+            if empty:
+                # Empty tag.  Insert target right in front of element.
+                prefix = spans
+            else:
+                # Non-empty tag.  Place the auxiliary <span> tag
+                # *inside* the element, as the first child.
+                suffix += spans
+        if atts:
+            attlist = list(class_atts)
+            for name, att in class_atts:
+                atts.pop(name, None)
+            for name, value in atts.iteritems():
+                # value=None was used for boolean attributes without
+                # value, but this isn't supported by XHTML.
+                assert value is not None
+                if isinstance(value, list):
+                    value = ' '.join([unicode(v) for v in value])
+                else:
+                    value = unicode(value)
+                attlist.append((name, '%s="%s"' % (name, self.attval(value))))
+            attlist.sort()
+            start = ' '.join(['<' + tagname] + [att for name, att in attlist])
+        if empty:
+            return prefix + start + ' />' + suffix
+        return prefix + start + '>' + suffix
+
+    def tag_parts(self, tagname, classes, class_attribute):
+        """
+        Return the parts of a start tag that depend only on the tag name,
+        the node's `classes` and the `class_attribute` argument of
+        `starttag()`: the lowercase tag name, the sorted list of
+        ``(name, 'name="value"')`` pairs of the "class" and language
+        attributes, and the start of the tag with these attributes only.
+        """
+        tagname = tagname.lower()
+        atts = {}
+        classes_ = []
         languages = []
         # unify class arguments and move language specification
-        for cls in node.get('classes', []) + atts.pop('class', '').split() :
+        for cls in list(classes) + class_attribute.split():
             if cls.startswith('language-'):
                 languages.append(cls[9:])
-            elif cls.strip() and cls not in classes:
-                classes.append(cls)
+            elif cls.strip() and cls not in classes_:
+                classes_.append(cls)
         if languages:
             # attribute name is 'lang' in XHTML 1.0 but 'xml:lang' in 1.1
             atts[self.lang_attribute] = languages[0]
-        if classes:
-            atts['class'] = ' '.join(classes)
-        assert 'id' not in atts
-        ids.extend(node.get('ids', []))
-        if 'ids' in atts:
-            ids.extend(atts['ids'])
-            del atts['ids']
-        if ids:
-            atts['id'] = ids[0]
-            for id in ids[1:]:
-                # Add empty "span" elements for additional IDs.  Note
-                # that we cannot use empty "a" elements because there
-                # may be targets inside of references, but nested "a"
-                # elements aren't allowed in XHTML (even if they do
-                # not all have a "href" attribute).
-                if empty:
-                    # Empty tag.  Insert target right in front of element.
-                    prefix.append('<span id="%s"></span>' % id)
-                else:
-                    # Non-empty tag.  Place the auxiliary <span> tag
-                    # *inside* the element, as the first child.
-                    suffix += '<span id="%s"></span>' % id
-        attlist = atts.items()
-        attlist.sort()
-        parts = [tagname]
-        for name, value in attlist:
-            # value=None was used for boolean attributes without
-            # value, but this isn't supported by XHTML.
-            assert value is not None
-            if isinstance(value, list):
-                values = [unicode(v) for v in value]
-                parts.append('%s="%s"' % (name.lower(),
-                                          self.attval(' '.join(values))))
-            else:
-                parts.append('%s="%s"' % (name.lower(),
-                                          self.attval(unicode(value))))
-        if empty:
-            infix = ' /'
-        else:
-            infix = ''
-        return ''.join(prefix) + '<%s%s>' % (' '.join(parts), infix) + suffix
+        if classes_:
+            atts['class'] = ' '.join(classes_)
+        class_atts = [(name, '%s="%s"' % (name, self.attval(value)))
+                      for name, value in sorted(atts.items())]
+        start = ' '.join(['<' + tagname] + [att for name, att in class_atts])
+        return tagname, tuple(class_atts), start
 
     def emptytag(self, node, tagname, suffix='\n', **attributes):
         """Construct and return an XML-compatible empty tag."""
@@ -764,6 +882,17 @@ class HTMLTranslator(nodes.NodeVisitor):
                          % self.encode(node.get('title', '')))
 
     def depart_document(self, node):
+        if not self.head_finished:
+            self.finish_head(node)
+        self.body_suffix.insert(0, '</div>\n')
+        self.fragment.extend(self.body) # self.fragment is the "naked" body
+        self.html_body.extend(self.body_prefix[1:] + self.body_pre_docinfo
+                              + self.docinfo + self.body
+                              + self.body_suffix[:-1])
+        assert not self.context, 'len(context) = %s' % len(self.context)
+
+    def finish_head(self, node):
+        """Complete the document head and the body prefix."""
         self.head_prefix.extend([self.doctype,
                                  self.head_prefix_template %
                                  {'lang': self.settings.language_code}])
@@ -778,12 +907,30 @@ class HTMLTranslator(nodes.NodeVisitor):
         # skip content-type meta tag with interpolated charset value:
         self.html_head.extend(self.head[1:])
         self.body_prefix.append(self.starttag(node, 'div', CLASS='document'))
-        self.body_suffix.insert(0, '</div>\n')
-        self.fragment.extend(self.body) # self.fragment is the "naked" body
-        self.html_body.extend(self.body_prefix[1:] + self.body_pre_docinfo
-                              + self.docinfo + self.body
-                              + self.body_suffix[:-1])
-        assert not self.context, 'len(context) = %s' % len(self.context)
+        self.head_finished = True
+
+    def flush_body(self, node):
+        """
+        Pass the body translated so far to `self.stream` and start a new
+        one (streaming mode).  `node` is the last translated child of the
+        document.
+        """
+        if not self.head_finished:
+            # Add the contributions of the remaining nodes to the head:
+            for child in self.document[self.document.index(node)+1:]:
+                for descendant in child.traverse(self.adds_to_head):
+                    if isinstance(descendant, (nodes.math, nodes.math_block)):
+                        self.set_math_header()
+                    else:
+                        self.visit_meta(descendant)
+                        self.head_nodes[id(descendant)] = descendant
+            self.finish_head(self.document)
+        self.stream(self.body)
+        self.body = []
+
+    def adds_to_head(self, node):
+        return (isinstance(node, (nodes.math, nodes.math_block))
+                or node.tagname == 'meta')
 
     def visit_emphasis(self, node):
         self.body.append(self.starttag(node, 'em', ''))
@@ -1039,18 +1186,18 @@ class HTMLTranslator(nodes.NodeVisitor):
                 and self.settings.file_insertion_enabled):
                 imagepath = urllib.url2pathname(uri)
                 try:
-                    img = PIL.Image.open(
-                            imagepath.encode(sys.getfilesystemencoding()))
-                except (IOError, UnicodeEncodeError):
+                    info = get_image_info(
+                        imagepath.encode(sys.getfilesystemencoding()),
+                        getattr(self.settings, 'image_cache', None))
+                except (IOError, OSError, UnicodeEncodeError):
                     pass # TODO: warn?
                 else:
                     self.settings.record_dependencies.add(
                         imagepath.replace('\\', '/'))
                     if 'width' not in atts:
-                        atts['width'] = '%dpx' % img.size[0]
+                        atts['width'] = '%dpx' % info['size'][0]
                     if 'height' not in atts:
-                        atts['height'] = '%dpx' % img.size[1]
-                    del img
+                        atts['height'] = '%dpx' % info['size'][1]
             for att_name in 'width', 'height':
                 if att_name in atts:
                     match = re.match(r'([0-9.]+)(\S*)$', atts[att_name])
@@ -1209,24 +1356,41 @@ class HTMLTranslator(nodes.NodeVisitor):
         # settings and conversion
         if self.math_output in ('latex', 'mathjax'):
             math_code = self.encode(math_code)
-        if self.math_output == 'mathjax' and not self.math_header:
-            if self.math_output_options:
-                self.mathjax_url = self.math_output_options[0]
-            self.math_header = [self.mathjax_script % self.mathjax_url]
-        elif self.math_output == 'html':
-            if self.math_output_options and not self.math_header:
-                self.math_header = [self.stylesheet_call(
-                    utils.find_file_in_dirs(s, self.settings.stylesheet_dirs))
-                    for s in self.math_output_options[0].split(',')]
+        self.set_math_header()
+        if self.math_output in ('html', 'mathml'):
+            math_code = self.convert_math(node, math_code, math_env)
+        # append to document body
+        if tag:
+            self.body.append(self.starttag(node, tag,
+                                           suffix='\n'*bool(math_env),
+                                           CLASS=clsarg))
+        self.body.append(math_code)
+        if math_env: # block mode (equation, display)
+            self.body.append('\n')
+        if tag:
+            self.body.append('</%s>' % tag)
+        if math_env:
+            self.body.append('\n')
+        # Content already processed:
+        raise nodes.SkipNode
+
+    def convert_math(self, node, math_code, math_env):
+        """
+        Return `math_code` converted to HTML or MathML (`self.math_output`).
+        Conversions are looked up in and added to `self.math_cache`.
+        """
+        key = (self.math_output, math_env, math_code)
+        converted = self.math_cache.get(key)
+        if converted is not None:
+            return converted
+        if self.math_output == 'html':
             # TODO: fix display mode in matrices and fractions
             math2html.DocumentParameters.displaymode = (math_env != '')
-            math_code = math2html.math2html(math_code)
+            converted = math2html.math2html(math_code)
         elif self.math_output == 'mathml':
-            self.doctype = self.doctype_mathml
-            self.content_type = self.content_type_mathml
             try:
                 mathml_tree = parse_latex_math(math_code, inline=not(math_env))
-                math_code = ''.join(mathml_tree.xml())
+                converted = ''.join(mathml_tree.xml())
             except SyntaxError, err:
                 err_node = self.document.reporter.error(err, base_node=node)
                 self.visit_system_message(err_node)
@@ -1239,24 +1403,27 @@ class HTMLTranslator(nodes.NodeVisitor):
                 self.body.append('\n</pre>\n')
                 self.depart_system_message(err_node)
                 raise nodes.SkipNode
-        # append to document body
-        if tag:
-            self.body.append(self.starttag(node, tag,
-                                           suffix='\n'*bool(math_env),
-                                           CLASS=clsarg))
-        self.body.append(math_code)
-        if math_env: # block mode (equation, display)
-            self.body.append('\n')
-        if tag:
-            self.body.append('</%s>' % tag)
-        if math_env:
-            self.body.append('\n')
-        # Content already processed:
-        raise nodes.SkipNode
+        self.math_cache.put(key, converted)
+        return converted
 
     def depart_math(self, node):
         pass # never reached
 
+    def set_math_header(self):
+        """Set up the document head for the math output format."""
+        if self.math_output == 'mathjax' and not self.math_header:
+            if self.math_output_options:
+                self.mathjax_url = self.math_output_options[0]
+            self.math_header = [self.mathjax_script % self.mathjax_url]
+        elif self.math_output == 'html':
+            if self.math_output_options and not self.math_header:
+                self.math_header = [self.stylesheet_call(
+                    utils.find_file_in_dirs(s, self.settings.stylesheet_dirs))
+                    for s in self.math_output_options[0].split(',')]
+        elif self.math_output == 'mathml':
+            self.doctype = self.doctype_mathml
+            self.content_type = self.content_type_mathml
+
     def visit_math_block(self, node):
         # print node.astext().encode('utf8')
         math_env = pick_math_environment(node.astext())
@@ -1266,6 +1433,8 @@ class HTMLTranslator(nodes.NodeVisitor):
         pass # never reached
 
     def visit_meta(self, node):
+        if id(node) in self.head_nodes:
+            return                      # added by `flush_body()`
         meta = self.emptytag(node, 'meta', **node.non_default_attributes())
         self.add_meta(meta)
 
@@ -1454,6 +1623,9 @@ class HTMLTranslator(nodes.NodeVisitor):
     def depart_section(self, node):
         self.section_level -= 1
         self.body.append('</div>\n')
+        if (self.stream and not self.context
+            and isinstance(node.parent, nodes.document)):
+            self.flush_body(node)
 
     def visit_sidebar(self, node):
         self.body.append(
@@ -1444,32 +1444,45 @@ class LaTeXTranslator(nodes.NodeVisitor):
     def language_label(self, docutil_label):
         return self.language_module.labels[docutil_label]
 
-    def encode(self, text):
-        """Return text with 'problematic' characters escaped.
+    encode_tables = {}
+    """Translation tables for `encode()`, built on first use.
 
-        * Escape the ten special printing characters ``# $ % & ~ _ ^ \ { }``,
-          square brackets ``[ ]``, double quotes and (in OT1) ``< | >``.
-        * Translate non-supported Unicode characters.
-        * Separate ``-`` (and more in literal text) to prevent input ligatures.
-        """
-        if self.verbatim:
-            return text
+    Keys are the tuples of translator state the table depends on, see
+    `encode_table()`.  The tables are shared by all translator instances.
+    """
+
+    package_chars = frozenset([unichr(code) for code in CharMaps.textcomp]
+                              + [unichr(code) for code in CharMaps.pifont])
+    """Characters that require a package if found in the text."""
+
+    ligature_pattern = re.compile(r'(-)(?=-)')
+    literal_ligature_pattern = re.compile(r'([-,`\'"<>])(?=\1)')
+    """Runs of characters that would form input ligatures."""
 
-        # Set up the translation table:
+    def encode_table(self):
+        """Return the translation table for the current translator state.
+        """
+        ot1 = self.font_encoding in ['OT1', ''] and not self.is_xetex
+        key = (bool(self.inside_citation_reference_label), ot1,
+               bool(self.literal), bool(self.insert_non_breaking_blanks),
+               self.is_xetex, self.latex_encoding.startswith('utf8'))
+        try:
+            return self.encode_tables[key]
+        except KeyError:
+            pass
         table = CharMaps.special.copy()
         # keep the underscore in citation references
         if self.inside_citation_reference_label:
             del(table[ord('_')])
         # Workarounds for OT1 font-encoding
-        if self.font_encoding in ['OT1', ''] and not self.is_xetex:
+        if ot1:
             # * out-of-order characters in cmtt
             if self.literal:
                 # replace underscore by underlined blank,
                 # because this has correct width.
                 table[ord('_')] = u'\\underline{~}'
                 # the backslash doesn't work, so we use a mirrored slash.
-                # \reflectbox is provided by graphicx:
-                self.requirements['graphicx'] = self.graphicx_package
+                # \reflectbox is provided by graphicx (see `encode()`):
                 table[ord('\\')] = ur'\reflectbox{/}'
             # * ``< | >`` come out as different chars (except for cmtt):
             else:
@@ -1485,25 +1498,43 @@ class LaTeXTranslator(nodes.NodeVisitor):
                 table.update(CharMaps.utf8_supported_unicode)
                 table.update(CharMaps.textcomp)
             table.update(CharMaps.pifont)
+        self.encode_tables[key] = table
+        return table
+
+    def encode(self, text):
+        """Return text with 'problematic' characters escaped.
+
+        * Escape the ten special printing characters ``# $ % & ~ _ ^ \ { }``,
+          square brackets ``[ ]``, double quotes and (in OT1) ``< | >``.
+        * Translate non-supported Unicode characters.
+        * Separate ``-`` (and more in literal text) to prevent input ligatures.
+        """
+        if self.verbatim:
+            return text
+
+        table = self.encode_table()
+        if (self.literal and self.font_encoding in ['OT1', '']
+            and not self.is_xetex):
+            # \reflectbox is provided by graphicx:
+            self.requirements['graphicx'] = self.graphicx_package
+        if not self.is_xetex:
             # Characters that require a feature/package to render
-            if [True for ch in text if ord(ch) in CharMaps.textcomp]:
-                self.requirements['textcomp'] = PreambleCmds.textcomp
-            if [True for ch in text if ord(ch) in CharMaps.pifont]:
+            for ch in self.package_chars.intersection(text):
+                if ord(ch) in CharMaps.textcomp:
+                    self.requirements['textcomp'] = PreambleCmds.textcomp
+                else:
                     self.requirements['pifont'] = '\\usepackage{pifont}'
 
         text = text.translate(table)
 
         # Break up input ligatures e.g. '--' to '-{}-'.
         if not self.is_xetex: # Not required with xetex/luatex
-            separate_chars = '-'
             # In monospace-font, we also separate ',,', '``' and "''" and some
             # other characters which can't occur in non-literal text.
             if self.literal:
-                separate_chars += ',`\'"<>'
-            for char in separate_chars * 2:
-                # Do it twice ("* 2") because otherwise we would replace
-                # '---' by '-{}--'.
-                text = text.replace(char + char, char + '{}' + char)
+                text = self.literal_ligature_pattern.sub(r'\1{}', text)
+            else:
+                text = self.ligature_pattern.sub(r'\1{}', text)
 
         # Literal line breaks (in address or literal blocks):
         if self.insert_newline:
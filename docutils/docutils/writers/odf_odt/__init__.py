@@ -62,15 +62,8 @@ except ImportError, exp:
     pygments = None
 
 # check for the Python Imaging Library
-try:
-    import PIL.Image
-except ImportError:
-    try:  # sometimes PIL modules are put in PYTHONPATH's root
-        import Image
-        class PIL(object): pass  # dummy wrapper
-        PIL.Image = Image
-    except ImportError:
-        PIL = None
+from docutils.utils.image_info import PIL, get_image_info
+from docutils.utils.error_reporting import ErrorString
 
 ## import warnings
 ## warnings.warn('importing IPShellEmbed', UserWarning)
@@ -2093,6 +2086,8 @@ class ODFTranslator(nodes.GenericNodeVisitor):
                 spec = (source, destination,)
             else:
                 spec = (os.path.abspath(source), destination,)
+            if not self.check_image_file(node, source):
+                return
             self.embedded_file_list.append(spec)
             self.image_dict[source] = (source, destination,)
         # Is this a figure (containing an image) or just a plain image?
@@ -2116,6 +2111,22 @@ class ODFTranslator(nodes.GenericNodeVisitor):
     def depart_image(self, node):
         pass
 
+    def check_image_file(self, node, path):
+        """
+        Return true if the image file `path` can be read (or PIL is not
+        installed), report an error otherwise.
+        """
+        if PIL is None:
+            return True
+        try:
+            get_image_info(path, getattr(self.settings, 'image_cache', None))
+        except (IOError, OSError), error:
+            self.document.reporter.error(
+                'Cannot read image file %s: %s' % (path, ErrorString(error)),
+                base_node=node)
+            return False
+        return True
+
     def get_image_width_height(self, node, attr):
         size = None
         if attr in node.attributes:
@@ -2159,20 +2170,21 @@ class ODFTranslator(nodes.GenericNodeVisitor):
         dpi = (72, 72)
         if PIL is not None and source in self.image_dict:
             filename, destination = self.image_dict[source]
-            imageobj = PIL.Image.open(filename, 'r')
-            dpi = imageobj.info.get('dpi', dpi)
+            info = get_image_info(filename,
+                                  getattr(self.settings, 'image_cache', None))
+            dpi = info['dpi'] or dpi
             # dpi information can be (xdpi, ydpi) or xydpi
             try: iter(dpi)
             except: dpi = (dpi, dpi)
         else:
-            imageobj = None
+            info = None
 
         if width is None or height is None:
-            if imageobj is None:
+            if info is None:
                 raise RuntimeError(
                     'image size not fully specified and PIL not installed')
-            if width is None: width = [imageobj.size[0], 'px']
-            if height is None: height = [imageobj.size[1], 'px']
+            if width is None: width = [info['size'][0], 'px']
+            if height is None: height = [info['size'][1], 'px']
 
         width[0] *= scale
         height[0] *= scale
@@ -57,6 +57,8 @@ class Writer(html4css1.Writer):
     config_section = 'pep_html writer'
     config_section_dependencies = ('writers', 'html4css1 writer')
 
+    streaming_supported = False
+
     def __init__(self):
         html4css1.Writer.__init__(self)
         self.translator_class = HTMLTranslator
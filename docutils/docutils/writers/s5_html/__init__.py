@@ -86,6 +86,8 @@ class Writer(html4css1.Writer):
     config_section = 's5_html writer'
     config_section_dependencies = ('writers', 'html4css1 writer')
 
+    streaming_supported = False
+
     def __init__(self):
         html4css1.Writer.__init__(self)
         self.translator_class = S5HTMLTranslator
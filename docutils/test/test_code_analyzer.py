@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the lexer and token caches in `docutils.utils.code_analyzer`.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import DocutilsTestSupport              # must be imported before docutils
+from docutils.utils import code_analyzer
+from docutils.utils.code_analyzer import Lexer, TokenCache, with_pygments
+
+
+code = u'print 8/2  # comment'
+
+
+class TokenCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lexer_instances(self):
+        self.assertTrue(Lexer(code, 'python').lexer
+                        is Lexer(u'pass', 'python').lexer)
+
+    def test_memory(self):
+        cache = TokenCache()
+        tokens = list(Lexer(code, 'python', 'long'))
+        self.assertEqual(list(Lexer(code, 'python', 'long', cache)), tokens)
+        cached = list(Lexer(code, 'python', 'long', cache))
+        self.assertEqual(cached, tokens)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # the classes lists may be changed by the caller:
+        cached[0][0].append('changed')
+        self.assertEqual(list(Lexer(code, 'python', 'long', cache)), tokens)
+        # other token names:
+        list(Lexer(code, 'python', 'short', cache))
+        self.assertEqual(cache.hits, 2)
+
+    def test_size(self):
+        cache = TokenCache(size=8)
+        for i in range(20):
+            cache.put(('python', 'long', str(i)), [])
+        self.assertTrue(len(cache.entries) <= 8)
+        self.assertTrue(('python', 'long', '19') in cache.entries)
+        self.assertFalse(('python', 'long', '0') in cache.entries)
+
+    def test_directory(self):
+        tokens = list(Lexer(code, 'python', 'long',
+                            TokenCache(self.directory)))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        cache = TokenCache(self.directory)
+        self.assertEqual(list(Lexer(code, 'python', 'long', cache)), tokens)
+        self.assertEqual(cache.hits, 1)
+
+    def test_shared_caches(self):
+        self.assertTrue(code_analyzer.get_token_cache()
+                        is code_analyzer.get_token_cache(None))
+        self.assertFalse(code_analyzer.get_token_cache()
+                         is code_analyzer.get_token_cache(self.directory))
+
+if not with_pygments:
+    del TokenCacheTests
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the doctree cache (`docutils.utils.doctree_cache`).
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core, utils
+from docutils.parsers import rst
+from docutils.readers import standalone
+from docutils.utils.doctree_cache import DoctreeCache
+
+
+class CountingParser(rst.Parser):
+
+    parsed = 0
+
+    def parse(self, inputstring, document):
+        CountingParser.parsed += 1
+        rst.Parser.parse(self, inputstring, document)
+
+
+source = """\
+Title
+=====
+
+.. contents::
+
+Section
+-------
+
+A paragraph with a reference_ and a footnote [#]_.
+
+.. _reference: http://example.org
+.. [#] The footnote.
+"""
+
+
+class DoctreeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = os.path.join(self.directory, 'cache')
+        CountingParser.parsed = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def publish(self, text, writer_name, cache=True, **overrides):
+        settings = {'_disable_config': True, 'output_encoding': 'unicode',
+                    'report_level': 5}
+        if cache:
+            settings['doctree_cache'] = self.cache
+        settings.update(overrides)
+        return core.publish_string(text, parser=CountingParser(),
+                                   writer_name=writer_name,
+                                   settings_overrides=settings)
+
+    def test_parse_once(self):
+        for writer_name in 'html', 'latex', 'manpage', 'pseudoxml':
+            self.assertEqual(self.publish(source, writer_name),
+                             self.publish(source, writer_name, cache=False))
+        # LaTeX uses a different default for trim_footnote_reference_space
+        self.assertEqual(CountingParser.parsed, 2 + 4)
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+
+    def test_key(self):
+        self.publish(source, 'html')
+        self.publish(source + '\nMore text.\n', 'html')
+        self.assertEqual(CountingParser.parsed, 2)
+        # writer settings do not matter, parser settings do:
+        self.publish(source, 'html', stylesheet_path='')
+        self.assertEqual(CountingParser.parsed, 2)
+        self.publish(source, 'html', tab_width=4)
+        self.assertEqual(CountingParser.parsed, 3)
+        self.publish(source, 'html', id_prefix='x-')
+        self.assertEqual(CountingParser.parsed, 4)
+
+    def test_included_file_changed(self):
+        included = os.path.join(self.directory, 'included.txt')
+        text = '.. include:: %s\n' % included
+        open(included, 'w').write('First version.\n')
+        self.publish(text, 'pseudoxml')
+        self.assertTrue('First version.' in self.publish(text, 'pseudoxml'))
+        self.assertEqual(CountingParser.parsed, 1)
+        open(included, 'w').write('Second version.\n')
+        os.utime(included, (0, 0))
+        self.assertTrue('Second version.' in self.publish(text, 'pseudoxml'))
+        self.assertEqual(CountingParser.parsed, 2)
+
+    def test_shared_dependency_list(self):
+        # an include recorded for an earlier document is a dependency of
+        # the later ones, too
+        included = os.path.join(self.directory, 'included.txt')
+        open(included, 'w').write('First version.\n')
+        dependencies = utils.DependencyList()
+        for text in 'First document.\n\n', 'Second document.\n\n':
+            self.publish(text + '.. include:: %s\n' % included, 'pseudoxml',
+                         record_dependencies=dependencies)
+        self.assertEqual(dependencies.list, [included])
+        open(included, 'w').write('Second version.\n')
+        os.utime(included, (0, 0))
+        self.assertTrue('Second version.' in self.publish(
+            'Second document.\n\n.. include:: %s\n' % included, 'pseudoxml',
+            record_dependencies=dependencies))
+        self.assertEqual(CountingParser.parsed, 3)
+
+    def test_reader_read(self):
+        class Reader(standalone.Reader):
+            def read(self, source, parser, settings):
+                document = standalone.Reader.read(self, source, parser,
+                                                  settings)
+                document['title'] = 'set by the reader'
+                return document
+        for i in range(2):
+            output = core.publish_string(
+                source, reader=Reader(), parser=CountingParser(),
+                writer_name='pseudoxml',
+                settings_overrides={'_disable_config': True,
+                                    'doctree_cache': self.cache})
+            self.assertTrue('set by the reader' in output)
+        self.assertEqual(CountingParser.parsed, 1)
+
+    def test_size(self):
+        saved_size = DoctreeCache.size
+        DoctreeCache.size = 2
+        try:
+            for i in range(4):
+                self.publish(source + '\nText %d.\n' % i, 'pseudoxml')
+        finally:
+            DoctreeCache.size = saved_size
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+
+    def test_corrupt_cache_file(self):
+        self.publish(source, 'pseudoxml')
+        for name in os.listdir(self.cache):
+            open(os.path.join(self.cache, name), 'wb').write('garbage')
+        self.assertEqual(self.publish(source, 'pseudoxml'),
+                         self.publish(source, 'pseudoxml', cache=False))
+        self.assertEqual(CountingParser.parsed, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for `docutils.utils.fetcher` and the "url" option of the "csv-table"
+and "raw" directives, against a local HTTP server.
+"""
+
+import shutil
+import tempfile
+import threading
+import unittest
+import BaseHTTPServer
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core
+from docutils.parsers.rst import Parser
+from docutils.utils import fetcher
+
+
+resources = {'/table.csv': '"a", "b"\n"c", "d"\n',
+             '/raw.html': '<p>raw</p>\n'}
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.path not in resources:
+            self.send_error(404)
+            return
+        etag = '"%d"' % self.server.version
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(resources[self.path])
+
+    def log_message(self, *args):
+        pass
+
+
+class FetcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        self.server.paths = []
+        self.server.version = 1
+        self.thread = threading.Thread(
+            target=lambda: self.server.serve_forever(poll_interval=0.01))
+        self.thread.setDaemon(True)
+        self.thread.start()
+        self.base = 'http://127.0.0.1:%d' % self.server.server_port
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+        fetcher.clear_fetchers()
+
+    def test_fetch(self):
+        f = fetcher.Fetcher(timeout=10)
+        url = self.base + '/raw.html'
+        self.assertEqual(f.fetch(url), resources['/raw.html'])
+        self.assertEqual(f.fetch(url), resources['/raw.html'])
+        self.assertEqual(self.server.paths, ['/raw.html', '/raw.html'])
+        self.assertEqual((f.requests, f.revalidated), (2, 1))
+        self.assertRaises(IOError, f.fetch, self.base + '/missing')
+
+    def test_prefetch(self):
+        f = fetcher.Fetcher()
+        urls = [self.base + path for path in sorted(resources)]
+        f.prefetch(urls)
+        self.assertEqual([f.fetch(url) for url in urls],
+                         [resources[path] for path in sorted(resources)])
+        self.assertEqual(f.requests, 2)
+        self.assertTrue(len(f.threads) <= f.workers)
+
+    def test_workers_stop(self):
+        f = fetcher.Fetcher()
+        urls = [self.base + path for path in sorted(resources)]
+        for i in range(2):
+            f.prefetch(urls)
+            threads = f.threads[:]
+            for url in urls:
+                f.fetch(url)
+            for thread in threads:
+                thread.join(10)
+                self.assertFalse(thread.isAlive())
+            self.assertEqual(f.threads, [])
+
+    def test_get_fetcher(self):
+        settings = core.Publisher().get_settings(
+            settings_overrides={'_disable_config': True})
+        self.assertTrue(fetcher.get_fetcher(settings)
+                        is fetcher.get_fetcher(settings))
+        for timeout in range(fetcher.max_fetchers * 2):
+            settings.url_timeout = timeout
+            fetcher.get_fetcher(settings)
+        self.assertTrue(len(fetcher._fetchers) <= fetcher.max_fetchers)
+
+    def test_revalidation(self):
+        url = self.base + '/table.csv'
+        fetcher.Fetcher(self.directory).fetch(url)
+        f = fetcher.Fetcher(self.directory)
+        self.assertEqual(f.fetch(url), resources['/table.csv'])
+        self.assertEqual((f.requests, f.revalidated), (1, 1))
+        self.server.version = 2
+        f = fetcher.Fetcher(self.directory)
+        f.fetch(url)
+        self.assertEqual((f.requests, f.revalidated), (1, 0))
+
+    def test_offline(self):
+        url = self.base + '/table.csv'
+        f = fetcher.Fetcher(self.directory, offline=True)
+        self.assertRaises(IOError, f.fetch, url)
+        fetcher.Fetcher(self.directory).fetch(url)
+        f = fetcher.Fetcher(self.directory, offline=True)
+        self.assertEqual(f.fetch(url), resources['/table.csv'])
+        self.assertEqual(f.requests, 0)
+
+    def test_directives(self):
+        source = ('.. csv-table::\n   :url: %(base)s/table.csv\n\n'
+                  '.. raw:: html\n   :url: %(base)s/raw.html\n'
+                  % {'base': self.base})
+        for prefetch in False, True:
+            self.server.paths = []
+            output = self.publish(source, url_prefetch=prefetch)
+            self.assertTrue('<p>raw</p>' in output)
+            self.assertTrue('<paragraph>\n                            d'
+                            in output)
+            self.assertEqual(sorted(self.server.paths), sorted(resources))
+
+    def test_unused_prefetch(self):
+        source = ('Example::\n\n'
+                  '   .. raw:: html\n      :url: %(base)s/literal\n\n'
+                  '..\n   .. raw:: html\n      :url: %(base)s/comment\n\n'
+                  '.. raw:: html\n   :url: %(base)s/raw.html\n'
+                  % {'base': self.base})
+        self.publish(source, url_prefetch=True)
+        self.assertEqual(self.server.paths, ['/raw.html'])
+        self.assertEqual(fetcher.get_fetcher(self.settings).jobs, {})
+
+    def test_discard(self):
+        f = fetcher.Fetcher()
+        url = self.base + '/raw.html'
+        f.prefetch([url])
+        f.discard([url])
+        self.assertEqual(f.jobs, {})
+        self.assertEqual(f.fetch(url), resources['/raw.html'])
+
+    def publish(self, source, **overrides):
+        overrides.update({'_disable_config': True,
+                          'url_cache': self.directory})
+        self.settings = core.Publisher().get_settings(
+            parser_name='restructuredtext', settings_overrides=overrides)
+        return core.publish_string(source, writer_name='pseudoxml',
+                                   settings_overrides=overrides)
+
+    def test_remote_resources(self):
+        settings = DocutilsTestSupport.frontend.OptionParser(
+            components=(Parser,)).get_default_values()
+        settings.language_code = 'de'
+        lines = ['.. csv-tabelle:: Title',
+                 '   :url: http://example.org/',
+                 '      a.csv',
+                 '',
+                 '   .. raw:: html',
+                 '      :url: http://example.org/b.html',
+                 '',
+                 '.. image:: c.png',
+                 '   :url: http://example.org/c.png']
+        self.assertEqual(Parser().remote_resources(lines, settings),
+                         ['http://example.org/a.csv',
+                          'http://example.org/b.html'])
+        settings.raw_enabled = False
+        self.assertEqual(Parser().remote_resources(lines, settings),
+                         ['http://example.org/a.csv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
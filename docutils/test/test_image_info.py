@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the image metadata cache in `docutils.utils.image_info`.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import DocutilsTestSupport              # must be imported before docutils
+from docutils.utils import image_info
+from docutils.utils.image_info import PIL, get_image_info
+
+
+image = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                     'docs', 'user', 'rst', 'images', 'biohazard.png')
+
+
+class ImageInfoTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'image.png')
+        shutil.copy(image, self.path)
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        self.saved_caches = image_info._image_info_caches
+        image_info._image_info_caches = {}
+
+    def tearDown(self):
+        image_info._image_info_caches = self.saved_caches
+        shutil.rmtree(self.directory)
+
+    def test_info(self):
+        info = get_image_info(self.path)
+        self.assertEqual(info['format'], 'PNG')
+        self.assertEqual(info['size'], PIL.Image.open(image).size)
+        self.assertEqual(info['bytes'], os.path.getsize(image))
+        self.assertEqual(len(info['digest']), 40)
+
+    def test_memory(self):
+        info = get_image_info(self.path)
+        info['size'] = None             # results may be changed by the caller
+        self.assertEqual(get_image_info(self.path),
+                         get_image_info(image))
+        cache = image_info.get_image_info_cache()
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_directory(self):
+        info = get_image_info(self.path, self.cache_directory)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
+        image_info._image_info_caches = {}
+        self.assertEqual(get_image_info(self.path, self.cache_directory),
+                         info)
+        cache = image_info.get_image_info_cache(self.cache_directory)
+        self.assertEqual(cache.hits, 1)
+
+    def test_changed_file(self):
+        get_image_info(self.path)
+        os.utime(self.path, (0, 0))
+        get_image_info(self.path)
+        self.assertEqual(image_info.get_image_info_cache().misses, 2)
+
+    def test_errors(self):
+        self.assertRaises(OSError, get_image_info,
+                          os.path.join(self.directory, 'missing.png'))
+        open(self.path, 'w').write('no image')
+        self.assertRaises(IOError, get_image_info, self.path)
+
+if not PIL:
+    del ImageInfoTests
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,260 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for `docutils.utils.instrumentation`.
+"""
+
+import os
+import shutil
+import sys
+import StringIO
+import tempfile
+import threading
+import unittest
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core, nodes
+from docutils.parsers import rst
+from docutils.parsers.rst.directives import admonitions
+from docutils.utils import instrumentation
+
+
+source = """\
+Title
+=====
+
+.. contents::
+
+Section
+-------
+
+A paragraph with a reference_ and |substitution|.
+
+.. _reference: http://example.org
+.. |substitution| replace:: replacement text
+"""
+
+
+class TreeOperationCounterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = nodes.paragraph('', '', nodes.Text('a'),
+                                    nodes.emphasis('', 'b'))
+        self.counter = instrumentation.TreeOperationCounter()
+
+    def tearDown(self):
+        self.counter.uninstall()
+
+    def test_visited(self):
+        self.counter.install()
+        self.assertEqual(len(self.tree.traverse()), 4)
+        self.assertEqual(self.counter.visited, 4)
+        self.assertEqual(len(self.tree.traverse(nodes.Text)), 2)
+        self.assertEqual(self.counter.visited, 8)
+        self.tree.next_node(nodes.emphasis)
+        self.assertEqual(self.counter.visited, 10)
+        self.counter.uninstall()
+        self.tree.traverse()
+        self.assertEqual(self.counter.visited, 10)
+
+    def test_mutations(self):
+        replace = nodes.Element.__dict__['replace']
+        self.counter.install()
+        self.tree.append(nodes.Text('c'))
+        self.tree.replace(self.tree[0], [nodes.Text('d'), nodes.Text('e')])
+        self.tree['classes'] = ['x']
+        self.tree.remove(self.tree[-1])
+        self.assertEqual(self.counter.mutations, 4)
+        self.counter.uninstall()
+        self.assertTrue(nodes.Element.__dict__['replace'] is replace)
+
+    def test_overlapping(self):
+        replace = nodes.Element.__dict__['replace']
+        other = instrumentation.TreeOperationCounter()
+        self.counter.install()
+        other.install()
+        self.tree.append(nodes.Text('c'))
+        self.counter.uninstall()
+        self.tree.append(nodes.Text('d'))
+        other.uninstall()
+        self.tree.append(nodes.Text('e'))
+        self.assertEqual((self.counter.mutations, other.mutations), (1, 2))
+        self.assertTrue(nodes.Element.__dict__['replace'] is replace)
+
+    def test_threads(self):
+        replace = nodes.Element.__dict__['replace']
+        other = instrumentation.TreeOperationCounter()
+        installed = threading.Event()
+        counted = threading.Event()
+        def work():
+            other.install()
+            installed.set()
+            counted.wait()
+            other.uninstall()
+        thread = threading.Thread(target=work)
+        thread.start()
+        installed.wait()
+        self.tree.append(nodes.Text('c'))
+        counted.set()
+        thread.join()
+        self.assertEqual(other.mutations, 0)
+        self.assertTrue(nodes.Element.__dict__['replace'] is replace)
+
+
+class TransformProfileTests(unittest.TestCase):
+
+    settings = {'_disable_config': True, 'report_level': 5}
+
+    def test_observer(self):
+        records = []
+        publisher = core.Publisher(source_class=core.io.StringInput,
+                                   destination_class=core.io.NullOutput)
+        publisher.set_components('standalone', 'restructuredtext',
+                                 'null')
+        publisher.process_programmatic_settings(None, self.settings, None)
+        publisher.set_source(source)
+        publisher.set_destination()
+        publisher.document = publisher.reader.read(
+            publisher.source, publisher.parser, publisher.settings)
+        publisher.document.transformer.attach_observer(records.append)
+        publisher.apply_transforms()
+        applied = publisher.document.transformer.applied
+        self.assertEqual([(r.priority, r.transform_class, r.pending)
+                          for r in records],
+                         [(a[0], a[1], a[2]) for a in applied])
+        names = dict([(r.transform_class.__name__, r) for r in records])
+        self.assertTrue(names['Substitutions'].visited > 10)
+        self.assertTrue(names['Substitutions'].mutations > 0)
+        self.assertTrue(names['Contents'].pending is not None)
+        self.assertTrue(names['Contents'].mutations > 0)
+
+    def test_report(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'profile.tsv')
+            settings = dict(self.settings, transform_profile=path)
+            core.publish_string(source, writer_name='null',
+                                settings_overrides=settings)
+            lines = open(path).read().splitlines()
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(lines[0].split('\t'),
+                         list(instrumentation.TransformRecord.fields))
+        rows = [line.split('\t') for line in lines[1:]]
+        self.assertTrue(['docutils.transforms.parts.Contents', '1']
+                        in [row[1:3] for row in rows])
+        for row in rows:
+            self.assertEqual(len(row), 6)
+            float(row[3])
+            int(row[4])
+            int(row[5])
+
+
+class ParseProfileTests(unittest.TestCase):
+
+    source = """\
+Paragraph with *emphasis*.
+
+* item
+
+  - nested item
+
+.. note:: A note.
+"""
+
+    settings = {'_disable_config': True, 'report_level': 5}
+
+    def parse(self, parser, **overrides):
+        settings = dict(self.settings, **overrides)
+        return core.publish_doctree(self.source, parser=parser,
+                                    settings_overrides=settings)
+
+    def test_profile(self):
+        events = []
+        profile = instrumentation.ParseProfile()
+        profile.attach_observer(lambda *args: events.append(args))
+        doctree = self.parse(rst.Parser(profile=profile))
+        self.assertEqual(doctree.pformat(), self.parse(rst.Parser()).pformat())
+        self.assertEqual(profile.transitions[('Body', 'bullet')][:2], [7, 2])
+        self.assertEqual(profile.transitions[('Body', 'text')][:2], [4, 4])
+        self.assertEqual(profile.directives.keys(), [admonitions.Note])
+        self.assertEqual(sorted(profile.nested_parses.keys()), [1, 2])
+        self.assertEqual(profile.inline[0], 4)
+        kinds = [event[0] for event in events]
+        self.assertEqual(kinds.count('directive'), 1)
+        self.assertEqual(kinds.count('inline'), 4)
+        self.assertTrue(('directive',
+                         'docutils.parsers.rst.directives.admonitions.Note',
+                         7) in [(e[0], e[1], e[3]) for e in events])
+
+    def test_doctree_cache(self):
+        # a cached document tree would record nothing:
+        directory = tempfile.mkdtemp()
+        try:
+            profile = instrumentation.ParseProfile()
+            for i in range(2):
+                self.parse(rst.Parser(profile=profile),
+                           doctree_cache=directory)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(profile.transitions[('Body', 'bullet')][:2], [14, 4])
+
+    def test_debug(self):
+        stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+        try:
+            self.parse(rst.Parser(profile=instrumentation.ParseProfile()),
+                       debug=True, warning_stream=sys.stderr)
+            output = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+        self.assertTrue('StateMachine.check_line: Matched transition "bullet"'
+                        in output)
+
+    def test_doctree_cache(self):
+        # a cached document tree would record nothing:
+        directory = tempfile.mkdtemp()
+        try:
+            profile = instrumentation.ParseProfile()
+            for i in range(2):
+                self.parse(rst.Parser(profile=profile),
+                           doctree_cache=directory)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(profile.transitions[('Body', 'bullet')][:2], [14, 4])
+
+    def test_debug(self):
+        stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+        try:
+            self.parse(rst.Parser(profile=instrumentation.ParseProfile()),
+                       debug=True, warning_stream=sys.stderr)
+            output = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+        self.assertTrue('StateMachine.check_line: Matched transition "bullet"'
+                        in output)
+
+    def test_report(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'profile.tsv')
+            self.parse(rst.Parser(), parse_profile=path)
+            lines = open(path).read().splitlines()
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(lines[0].split('\t'),
+                         list(instrumentation.ParseProfile.fields))
+        rows = [line.split('\t')[:4] for line in lines[1:]]
+        self.assertTrue(['transition', 'Body.bullet', '7', '2'] in rows)
+        self.assertTrue(['directive',
+                         'docutils.parsers.rst.directives.admonitions.Note',
+                         '1', ''] in rows)
+        self.assertTrue(['nested_parse', '1', '4', ''] in rows)
+        self.assertTrue(['inline', 'Inliner.parse', '4', ''] in rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
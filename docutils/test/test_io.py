@@ -167,6 +167,26 @@ class OutputTests(unittest.TestCase):
         fo.write(self.bdata)
         self.assertEqual(self.bdrain.getvalue(), self.bdata)
 
+    def test_write_chunks_utf16(self):
+        # the byte order mark is written once
+        if sys.version_info >= (3,0):
+            return
+        fo = io.FileOutput(destination=self.bdrain, encoding='utf-16',
+                           autoclose=False)
+        fo.write_chunk(self.udata)
+        fo.write_chunk(u'')
+        fo.write_chunk(self.udata)
+        self.assertEqual(fo.finish_chunks(), None)
+        self.assertEqual(self.bdrain.getvalue(),
+                         (self.udata * 2).encode('utf-16'))
+
+    def test_write_chunks_collected(self):
+        so = io.StringOutput(encoding='utf8')
+        self.assertFalse(so.streaming)
+        so.write_chunk(self.udata)
+        so.write_chunk(u'x')
+        self.assertEqual(so.finish_chunks(), (self.udata + u'x').encode('utf8'))
+
     # Test for Python 3 features:
     if sys.version_info >= (3,0):
         def test_write_bytes_to_stdout(self):
@@ -9,6 +9,7 @@
 Test module for nodes.py.
 """
 
+import gc
 import sys
 import unittest
 import types
@@ -320,6 +321,41 @@ class ElementTests(unittest.TestCase):
         self.assertEqual(child4['ids'], ['child4'])
         self.assertEqual(len(parent), 5)
 
+    def test_index(self):
+        parent = nodes.Element()
+        texts = [nodes.Text('x') for i in range(4)]
+        parent += texts
+        # position hints identify the node, not an equal Text node:
+        self.assertEqual([parent.index(text) for text in texts],
+                         list(range(4)))
+        parent.insert(0, nodes.Element())
+        del parent[2]
+        parent.children.reverse()      # bypasses the hints
+        self.assertEqual(parent.index(texts[0]), 2)
+        self.assertEqual(parent.index(texts[2]), 1)
+        self.assertEqual(parent.index(nodes.Text('x')), 0)
+        self.assertRaises(ValueError, parent.index, nodes.Element())
+        parent.replace(texts[2], [nodes.Element(), nodes.Element()])
+        parent[-1] = texts[1]
+        self.assertEqual(parent.index(texts[1]), 4)
+
+    def test_replace_children(self):
+        parent = nodes.Element()
+        children = [nodes.Element(ids=['c%s' % i]) for i in range(5)]
+        parent += children
+        new = [nodes.Text('n1'), nodes.Text('n2')]
+        parent.replace_children([(children[3], []), (children[0], new),
+                                 (children[2], None),
+                                 (children[4], nodes.Element())])
+        self.assertEqual(parent.children[:4],
+                         new + [children[1], children[2]])
+        self.assertEqual(len(parent), 5)
+        for position, child in enumerate(parent.children):
+            self.assertEqual(parent.index(child), position)
+            self.assertTrue(child.parent is parent)
+        self.assertRaises(ValueError, parent.replace_children,
+                          [(children[3], new)])
+
     def test_unicode(self):
         node = nodes.Element(u'Möhren', nodes.Text(u'Möhren', u'Möhren'))
         self.assertEqual(unicode(node), u'<Element>Möhren</Element>')
@@ -572,6 +608,25 @@ class MiscTests(unittest.TestCase):
                                [e[0]])
         self.assertEqual(list(e.traverse(nodes.TextElement)), [e[0][1]])
 
+    def test_iter_traverse(self):
+        e = nodes.Element()
+        e += nodes.Element()
+        e[0] += nodes.Element()
+        e[0] += nodes.TextElement()
+        e[0][1] += nodes.Text('some text')
+        e += nodes.Element()
+        e += nodes.Element()
+        self.testlist = e[0:2]
+        for node in e.traverse():
+            for kwargs in ({}, {'include_self': False}, {'descend': False},
+                           {'siblings': True}, {'ascend': True},
+                           {'descend': False, 'ascend': True},
+                           {'condition': nodes.TextElement},
+                           {'condition': self.not_in_testlist,
+                            'siblings': True}):
+                self.assertEqual(list(node.iter_traverse(**kwargs)),
+                                 list(node.traverse(**kwargs)))
+
     def test_next_node(self):
         e = nodes.Element()
         e += nodes.Element()
@@ -649,6 +704,163 @@ class TreeCopyVisitorTests(unittest.TestCase):
         self.compare_trees(self.document, newtree)
 
 
+class CompactNodesTests(unittest.TestCase):
+
+    compact_script = """\
+import pickle
+from docutils import core, nodes
+assert nodes.compact_nodes
+doctree = core.publish_doctree(%r)
+doctree = pickle.loads(pickle.dumps(doctree))
+print(doctree.pformat())
+"""
+
+    source = """\
+Title
+=====
+
+A paragraph with *emphasis* and a reference_.
+
+.. _reference: http://docutils.sourceforge.net/
+"""
+
+    def test_lazy_list_attributes(self):
+        attributes = nodes._CompactAttributes(title='spam')
+        self.assertTrue('ids' in attributes)
+        self.assertFalse('spam' in attributes)
+        self.assertEqual(attributes.keys(), ['title'])
+        self.assertEqual(attributes.get('spam'), None)
+        self.assertRaises(KeyError, attributes.__getitem__, 'spam')
+        attributes['ids'].append('id1')
+        self.assertEqual(attributes.get('classes'), [])
+        self.assertEqual(sorted(attributes.items()),
+                         [('classes', []), ('ids', ['id1']),
+                          ('title', 'spam')])
+
+    def test_pickle(self):
+        import pickle
+        element = nodes.paragraph('raw', 'text', ids=['p1'])
+        copy = pickle.loads(pickle.dumps(element))
+        self.assertEqual(copy.pformat(), element.pformat())
+        self.assertEqual(copy.rawsource, 'raw')
+        self.assertTrue(copy[0].parent is copy)
+
+    def test_compact_mode(self):
+        # The node representation is chosen on import: use a subprocess.
+        import os
+        import subprocess
+        import pickle
+        from docutils import core
+        env = dict(os.environ)
+        env['DOCUTILS_COMPACT_NODES'] = '1'
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+        script = self.compact_script % self.source
+        child = subprocess.Popen([sys.executable, '-c', script], env=env,
+                                 stdout=subprocess.PIPE)
+        output = child.communicate()[0].decode('ascii')
+        self.assertEqual(child.returncode, 0)
+        doctree = core.publish_doctree(self.source)
+        doctree = pickle.loads(pickle.dumps(doctree))
+        self.assertEqual(output.strip(), doctree.pformat().strip())
+
+
+class NodeRegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.document = utils.new_document('test')
+        self.section = nodes.section('', nodes.title('', 'Title'))
+        self.document += self.section
+        self.section += nodes.paragraph('', 'one', nodes.target())
+        self.section += nodes.paragraph('', 'two')
+        self.document.enable_node_registry()
+        self.registry = self.document.node_registry
+        # always use the registry:
+        self.registry.fallback_ratio = 0
+
+    def assertFound(self, cls):
+        found = self.registry.find(cls)
+        self.assertEqual([id(node) for node in found],
+                         [id(node) for node in
+                          nodes.Element._fast_traverse(self.document, cls)])
+
+    def test_find(self):
+        self.assertEqual(len(self.document.traverse(nodes.paragraph)), 2)
+        self.assertFound(nodes.TextElement)
+        self.assertFound(nodes.Text)
+        self.assertEqual(self.registry.find(nodes.image), [])
+
+    def test_modifications(self):
+        paragraph = nodes.paragraph('', 'three', nodes.target())
+        self.section.insert(1, paragraph)
+        self.assertFound(nodes.target)
+        self.section.remove(paragraph)
+        self.assertFound(nodes.target)
+        self.assertFalse(paragraph[1]._node_registry)
+        self.assertFalse(id(paragraph[1]) in self.registry.by_class[nodes.target])
+        self.section[1].replace_self(paragraph)
+        self.assertFound(nodes.target)
+        self.assertFound(nodes.paragraph)
+        del self.section[1:]
+        self.assertFound(nodes.paragraph)
+        self.section.extend([paragraph, nodes.paragraph('', 'four')])
+        self.section.replace_children([(paragraph, nodes.image())])
+        self.assertFound(nodes.paragraph)
+        self.assertFound(nodes.image)
+        self.section.pop()
+        self.assertFound(nodes.paragraph)
+        self.section.clear()
+        self.assertFound(nodes.Text)
+
+    def test_moved_children(self):
+        # The children of a replaced node move to the new node.
+        note = nodes.note('', nodes.paragraph('', 'text'))
+        self.section += note
+        admonition = nodes.admonition('', *note.children)
+        note.replace_self(admonition)
+        self.assertFound(nodes.paragraph)
+        self.assertFound(nodes.Admonition)
+
+    def test_detached(self):
+        paragraph = self.section[1]
+        self.section.remove(paragraph)
+        paragraph += nodes.target()
+        self.assertFound(nodes.target)
+
+    def test_other_trees(self):
+        # Trees without a registry are not affected.
+        paragraph = nodes.paragraph('', 'text')
+        paragraph += nodes.target()
+        self.assertEqual(paragraph._node_registry, None)
+        self.assertEqual(paragraph[1]._node_registry, None)
+        other = utils.new_document('other')
+        other += self.section[1]
+        self.assertEqual(other[0]._node_registry, None)
+        self.assertEqual(self.registry.find(nodes.target), [])
+
+    def test_freed(self):
+        # Nodes detached from the tree directly drop out when freed.
+        del self.section.children[1:]
+        gc.collect()   # parent references are cycles
+        self.assertEqual(len(self.registry.find(nodes.paragraph)), 0)
+        self.assertEqual(len(self.registry), 4)
+
+    def test_disable(self):
+        self.document.disable_node_registry()
+        self.assertEqual(self.section._node_registry, None)
+        self.section += nodes.paragraph()
+        self.assertEqual(len(self.registry), 0)
+
+    def test_publish(self):
+        from docutils import core
+        source = '`a`_ and `b`_\n\n.. _a: http://a\n.. _b: http://b\n'
+        output = core.publish_string(source, writer_name='pseudoxml',
+            settings_overrides={'_disable_config': True,
+                                'node_registry': True})
+        self.assertEqual(output, core.publish_string(source,
+            writer_name='pseudoxml',
+            settings_overrides={'_disable_config': True}))
+
+
 class MiscFunctionTests(unittest.TestCase):
 
     names = [('a', 'a'), ('A', 'a'), ('A a A', 'a a a'),
@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the cache of included files of the "include" directive.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from __init__ import DocutilsTestSupport
+from docutils import core
+from docutils.parsers.rst.directives.misc import Include
+from docutils.utils.result_cache import ResultCache
+
+
+class IncludeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'snippet.txt')
+        self.write('Snippet *one*.\n\nA\ttab.\n')
+        self.saved_cache = Include.cache
+        Include.cache = ResultCache(size=10)
+
+    def tearDown(self):
+        Include.cache = self.saved_cache
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        snippet = open(self.path, 'w')
+        snippet.write(text)
+        snippet.close()
+
+    def publish(self, source):
+        source = source.replace('PATH', self.path)
+        return core.publish_string(
+            source, writer_name='pseudoxml',
+            settings_overrides={'_disable_config': True, 'report_level': 5,
+                                'output_encoding': 'unicode'})
+
+    def test_cached(self):
+        source = ('.. include:: PATH\n\n'
+                  '.. include:: PATH\n   :start-line: 2\n\n'
+                  '.. include:: PATH\n   :end-before: tab\n')
+        expected = self.publish(source)
+        self.assertEqual(Include.cache.misses, 1)
+        self.assertEqual(Include.cache.hits, 2)
+        self.assertEqual(self.publish(source), expected)
+        self.assertEqual(Include.cache.misses, 1)
+        Include.cache = None
+        self.assertEqual(self.publish(source), expected)
+
+    def test_tab_width(self):
+        source = '.. include:: PATH\n   :literal:\n   :tab-width: %d\n'
+        self.assertNotEqual(self.publish(source % 2), self.publish(source % 4))
+        # the decoded text is shared, the split lines are not
+        self.assertEqual(Include.cache.misses, 1)
+        entry = Include.cache.entries.values()[0][1]
+        self.assertEqual(sorted(entry[1].keys()), [2, 4])
+
+    def test_directory(self):
+        # keys are strings, as needed for the cache file names
+        Include.cache = ResultCache(os.path.join(self.directory, 'cache'))
+        expected = self.publish('.. include:: PATH\n')
+        Include.cache = ResultCache(os.path.join(self.directory, 'cache'))
+        self.assertEqual(self.publish('.. include:: PATH\n'), expected)
+        self.assertEqual(Include.cache.hits, 1)
+
+    def test_changed_file(self):
+        self.publish('.. include:: PATH\n')
+        self.write('Another snippet.\n')
+        self.assertTrue('Another' in self.publish('.. include:: PATH\n'))
+        self.assertEqual(Include.cache.misses, 2)
+
+    def test_dependencies(self):
+        from docutils.utils import DependencyList
+        dependencies = DependencyList()
+        for i in range(2):
+            core.publish_string('.. include:: %s\n' % self.path,
+                                settings_overrides={
+                                    '_disable_config': True,
+                                    'record_dependencies': dependencies})
+        self.assertEqual(dependencies.list, [self.path])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the position-based scanning in `states.Inliner.parse()`.
+"""
+
+import unittest
+from __init__ import DocutilsTestSupport
+from docutils import core, nodes
+from docutils.parsers import rst
+states = DocutilsTestSupport.states
+
+
+class SlicingInliner(states.Inliner):
+
+    """Search the remaining text after every construct."""
+
+    scan_dispatch = {}
+
+    def anchored_pattern(self, pattern):
+        return None
+
+    def implicit_pattern(self):
+        return None
+
+
+class LegacyDispatchInliner(states.Inliner):
+
+    """Custom dispatch method using the "text before/after" protocol."""
+
+    def strong_emphasis(self, match, lineno):
+        before, inlines, remaining, messages = self.emphasis(match, lineno)
+        if inlines and isinstance(inlines[0], nodes.emphasis):
+            inlines = [nodes.strong(inlines[0].rawsource,
+                                    inlines[0].astext())]
+        return before, inlines, remaining, messages
+
+    dispatch = states.Inliner.dispatch.copy()
+    dispatch['*'] = strong_emphasis
+
+
+class InlinerTests(unittest.TestCase):
+
+    samples = [
+        'Some *emphasis*, **strong**, ``literal`` and `interpreted` text.',
+        '*a**b*',
+        '`a`:emphasis:`b`',
+        "'*'*x* and (*) *y*",
+        '*unclosed emphasis, `unclosed` and |unclosed',
+        'A reference_, an `anonymous one`__ and `an embedded <uri_>`_.',
+        'Footnotes [1]_[#]_ and citations [CIT2002]_.',
+        'http://example.org/*x* and PEP 8, RFC 2822, foo:bar http://x.org',
+        'An _`inline target`, |substitution|_ and :emphasis:`role`.',
+        'Escaped \\*markup\\* and \\`more\\` http://x.org\\ text.',
+        ]
+
+    settings = {'report_level': 5, 'pep_references': True,
+                'rfc_references': True, 'trim_footnote_reference_space': True,
+                '_disable_config': True}
+
+    def parse(self, text, inliner_class):
+        return core.publish_doctree(
+            text, parser=rst.Parser(inliner=inliner_class()),
+            settings_overrides=self.settings).pformat()
+
+    def test_same_as_slicing(self):
+        for sample in self.samples:
+            self.assertEqual(self.parse(sample, states.Inliner),
+                             self.parse(sample, SlicingInliner))
+
+    def test_legacy_dispatch_method(self):
+        text = 'Text with *emphasis* and ``literal``, *more*.'
+        expected = self.parse(text.replace('*', '**'), states.Inliner)
+        self.assertEqual(self.parse(text, LegacyDispatchInliner), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -159,6 +159,50 @@ class PublishDoctreeTestCase(DocutilsTestSupport.StandardTestCase, docutils.Sett
         self.assertEqual(output, pseudoxml_output)
 
 
+class PublishSessionTestCase(DocutilsTestSupport.StandardTestCase):
+
+    settings_overrides = {'_disable_config': True,
+                          'warning_stream': io.NullOutput()}
+
+    def test_publish_string(self):
+        session = core.PublishSession(
+            settings_overrides=self.settings_overrides)
+        for i in range(2):
+            output = session.publish_string(test_document)
+            self.assertEqual(output, pseudoxml_output)
+
+    def test_publish_parts(self):
+        session = core.PublishSession(
+            writer_name='html', settings_overrides=self.settings_overrides)
+        parts = session.publish_parts(test_document)
+        self.assertEqual(parts, core.publish_parts(
+            test_document, writer_name='html',
+            settings_overrides=self.settings_overrides))
+        # parts of earlier documents are not changed by later ones:
+        session.publish_parts('Other Document\n==============\n')
+        self.assertEqual(parts['title'], 'Test Document')
+
+    def test_settings_are_copied(self):
+        session = core.PublishSession(
+            settings_overrides=self.settings_overrides)
+        session.publish_string(test_document, source_path='test.txt')
+        self.assertEqual(session.settings._source, None)
+
+    def test_threads(self):
+        import threading
+        session = core.PublishSession(
+            settings_overrides=self.settings_overrides)
+        outputs = []
+        def publish():
+            outputs.append(session.publish_string(test_document))
+            outputs.append(session.get_components())
+        thread = threading.Thread(target=publish)
+        thread.start()
+        thread.join()
+        self.assertEqual(outputs[0], pseudoxml_output)
+        self.assertTrue(outputs[1][0] is not session.get_components()[0])
+
+
 if __name__ == '__main__':
     import unittest
     unittest.main()
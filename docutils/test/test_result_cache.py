@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for `docutils.utils.result_cache`.
+"""
+
+import threading
+import unittest
+import DocutilsTestSupport              # must be imported before docutils
+from docutils.utils.result_cache import ResultCache
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def test_size(self):
+        cache = ResultCache(size=8)
+        for i in range(20):
+            cache.put((str(i),), i)
+        self.assertTrue(len(cache.entries) <= 8)
+        self.assertEqual(cache.get(('19',)), 19)
+        self.assertEqual(cache.get(('0',)), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_threads(self):
+        cache = ResultCache(size=16)
+        errors = []
+        def work(n):
+            try:
+                for i in range(2000):
+                    key = ('%d-%d' % (n, i),)
+                    cache.put(key, i)
+                    cache.get(key)
+            except Exception, error:
+                errors.append(error)
+        threads = [threading.Thread(target=work, args=(n,))
+                   for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 8 * 2000)
+        self.assertTrue(len(cache.entries) <= 17)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ Test module for transforms/__init__.py.
 """
 
 from __init__ import DocutilsTestSupport # must be imported before docutils
-from docutils import transforms, utils
+from docutils import nodes, transforms, utils
 import unittest
 
 
@@ -37,5 +37,136 @@ class KwargsTestCase(unittest.TestCase):
         self.assertEqual(transform_record[3], {'foo': 42})
 
 
+class RecordingTransform(transforms.NodeTransform):
+
+    node_classes = (nodes.paragraph,)
+    fusion_band = 'test'
+    log = []
+
+    def visit(self, node):
+        self.log.append((self.__class__.__name__, node.astext()))
+
+    def finish(self):
+        self.log.append((self.__class__.__name__, 'finish'))
+
+
+class FirstTransform(RecordingTransform):
+
+    default_priority = 810
+
+    def visit(self, node):
+        RecordingTransform.visit(self, node)
+        if node.astext() == 'one':
+            # remove the following paragraph
+            removed = node.parent[1]
+            node.parent.remove(removed)
+            self.node_removed(removed)
+
+
+class SecondTransform(RecordingTransform):
+
+    default_priority = 820
+
+
+class SkippedTransform(RecordingTransform):
+
+    default_priority = 815
+
+    def prepare(self):
+        return False
+
+
+class UnwrapTransform(RecordingTransform):
+
+    """Replace block quotes by their children, remove "remove" notes."""
+
+    node_classes = (nodes.block_quote, nodes.note, nodes.paragraph)
+    default_priority = 805
+
+    def visit(self, node):
+        if isinstance(node, nodes.block_quote):
+            node.replace_self(node.children)
+            self.node_removed(node)
+        elif isinstance(node, nodes.note) and node['classes'] == ['remove']:
+            node.parent.remove(node)
+            self.node_removed(node)
+        elif isinstance(node, nodes.paragraph):
+            RecordingTransform.visit(self, node)
+
+
+class OtherBandTransform(RecordingTransform):
+
+    default_priority = 830
+    fusion_band = 'other'
+
+
+class OverridingTransform(RecordingTransform):
+
+    default_priority = 815
+
+    def apply(self):
+        self.log.append(('OverridingTransform', 'apply'))
+
+
+class FusionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        RecordingTransform.log[:] = []
+        self.document = utils.new_document('test data')
+        self.document += nodes.paragraph('', 'one')
+        self.document += nodes.paragraph('', 'two')
+        self.document += nodes.paragraph('', 'three')
+        self.transformer = transforms.Transformer(self.document)
+
+    def test_fused(self):
+        self.transformer.add_transforms([SecondTransform, SkippedTransform,
+                                         FirstTransform])
+        self.transformer.apply_transforms()
+        self.assertEqual(RecordingTransform.log, [
+            ('FirstTransform', 'one'), ('SecondTransform', 'one'),
+            ('FirstTransform', 'three'), ('SecondTransform', 'three'),
+            ('FirstTransform', 'finish'), ('SecondTransform', 'finish')])
+        self.assertEqual([item[1] for item in self.transformer.applied],
+                         [FirstTransform, SkippedTransform, SecondTransform])
+
+    def test_removed_descendants(self):
+        self.document[:] = [
+            nodes.block_quote('', nodes.paragraph('', 'moved')),
+            nodes.note('', nodes.paragraph('', 'removed'),
+                       classes=['remove']),
+            nodes.note('', nodes.paragraph('', 'kept'))]
+        self.transformer.add_transforms([UnwrapTransform, SecondTransform])
+        self.transformer.apply_transforms()
+        # children moved out of a replaced node are visited, nodes removed
+        # with their parent are not:
+        self.assertEqual(RecordingTransform.log, [
+            ('UnwrapTransform', 'moved'), ('SecondTransform', 'moved'),
+            ('UnwrapTransform', 'kept'), ('SecondTransform', 'kept'),
+            ('UnwrapTransform', 'finish'), ('SecondTransform', 'finish')])
+
+    def test_not_fused(self):
+        self.transformer.fuse = 0
+        self.transformer.add_transforms([SecondTransform, FirstTransform])
+        self.transformer.apply_transforms()
+        self.assertEqual(RecordingTransform.log, [
+            ('FirstTransform', 'one'), ('FirstTransform', 'three'),
+            ('FirstTransform', 'finish'),
+            ('SecondTransform', 'one'), ('SecondTransform', 'three'),
+            ('SecondTransform', 'finish')])
+
+    def test_band_and_apply_override(self):
+        self.transformer.add_transforms([FirstTransform, OverridingTransform,
+                                         SecondTransform, OtherBandTransform])
+        self.transformer.apply_transforms()
+        self.assertEqual(RecordingTransform.log, [
+            ('FirstTransform', 'one'), ('FirstTransform', 'three'),
+            ('FirstTransform', 'finish'),
+            ('OverridingTransform', 'apply'),
+            ('SecondTransform', 'one'), ('SecondTransform', 'three'),
+            ('SecondTransform', 'finish'),
+            ('OtherBandTransform', 'one'), ('OtherBandTransform', 'three'),
+            ('OtherBandTransform', 'finish')])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -71,6 +71,139 @@ class StopTraversalTests(unittest.TestCase, docutils.SettingsSpec):
            writer=AttentiveWriter())
 
 
+class ModifyingVisitor(nodes.SparseNodeVisitor):
+
+    def __init__(self, document):
+        nodes.SparseNodeVisitor.__init__(self, document)
+        self.visited = []
+
+    def visit_paragraph(self, node):
+        self.visited.append(node.astext())
+        if node.astext() == 'one':
+            # replace the current node, remove a following node
+            node.parent.remove(node.parent[2])
+            node.replace_self([nodes.paragraph('', 'new1'),
+                               nodes.paragraph('', 'new2')])
+
+
+class TreeModificationTests(unittest.TestCase):
+
+    """
+    Test in-place modifications of the tree during traversals.
+    """
+
+    def test_modifications(self):
+        for method in ('walk', 'walkabout'):
+            document = utils.new_document('test data')
+            for text in ('one', 'two', 'three'):
+                document += nodes.paragraph('', text)
+            visitor = ModifyingVisitor(document)
+            getattr(document, method)(visitor)
+            # The old nodes are still traversed, the new nodes are not:
+            self.assertEqual(visitor.visited, ['one', 'two', 'three'])
+            self.assertEqual([p.astext() for p in document],
+                             ['new1', 'new2', 'two'])
+            self.assertTrue(document._walked_children is None)
+
+
+class CountingVisitor(nodes.SparseNodeVisitor):
+
+    def __init__(self, document):
+        nodes.SparseNodeVisitor.__init__(self, document)
+        self.visited = []
+
+    def visit_paragraph(self, node):
+        self.visited.append('paragraph')
+
+
+class EmphasisCountingVisitor(CountingVisitor):
+
+    def visit_emphasis(self, node):
+        self.visited.append('emphasis')
+
+
+class DispatchTests(unittest.TestCase):
+
+    """
+    Test the cached dispatch of visitor methods.
+    """
+
+    def setUp(self):
+        self.document = utils.new_document('test data')
+        self.document += nodes.paragraph('', '', nodes.emphasis('', 'text'))
+
+    def test_subclass(self):
+        visitor = CountingVisitor(self.document)
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited, ['paragraph'])
+        visitor = EmphasisCountingVisitor(self.document)
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited, ['paragraph', 'emphasis'])
+
+    def test_changed_class(self):
+        def visit_Text(self, node):
+            self.visited.append('Text')
+        visitor = EmphasisCountingVisitor(self.document)
+        self.document.walk(visitor)
+        # methods added to a class (or a base class) after its first
+        # dispatch are used after clearing the dispatch tables:
+        CountingVisitor.visit_Text = visit_Text
+        nodes.clear_dispatch_tables()
+        try:
+            self.document.walk(visitor)
+        finally:
+            del CountingVisitor.visit_Text
+            nodes.clear_dispatch_tables()
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited,
+                         ['paragraph', 'emphasis',
+                          'paragraph', 'emphasis', 'Text',
+                          'paragraph', 'emphasis'])
+
+    def test_getattr(self):
+        visited = []
+        class GetattrVisitor(nodes.NodeVisitor):
+            def __getattr__(self, name):
+                if name == 'visit_paragraph':
+                    return lambda node: visited.append('getattr')
+                raise AttributeError(name)
+            def unknown_visit(self, node):
+                visited.append(node.__class__.__name__)
+        self.document.walk(GetattrVisitor(self.document))
+        self.assertEqual(visited,
+                         ['document', 'getattr', 'emphasis', 'Text'])
+
+    def test_metaclass_mixin(self):
+        class Meta(type):
+            pass
+        class Mixin(object):
+            __metaclass__ = Meta
+        class MixinVisitor(CountingVisitor, Mixin):
+            pass
+        visitor = MixinVisitor(self.document)
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited, ['paragraph'])
+
+    def test_instance_methods(self):
+        visitor = CountingVisitor(self.document)
+        visitor.visit_emphasis = lambda node: visitor.visited.append('e')
+        self.document.walk(visitor)
+        self.document.walk(CountingVisitor(self.document))
+        self.assertEqual(visitor.visited, ['paragraph', 'e'])
+
+    def test_unknown(self):
+        visitor = nodes.NodeVisitor(self.document)
+        self.assertRaises(NotImplementedError, self.document.walk, visitor)
+        visitor.unknown_visit = lambda node: None
+        self.document.walk(visitor)
+
+    def test_clear_dispatch_tables(self):
+        self.document.walk(CountingVisitor(self.document))
+        self.assertTrue(CountingVisitor in nodes._visit_tables)
+        nodes.clear_dispatch_tables()
+        self.assertEqual(nodes._visit_tables, {})
+
+
 if __name__ == '__main__':
     unittest.main()
 
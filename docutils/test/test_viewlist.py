@@ -180,6 +180,178 @@ class ViewListTests(unittest.TestCase):
         c.sort()
         self.assertEqual(self.c, c)
 
+    def test_shared_lines(self):
+        # slices are views sharing the lines of their parent list
+        a = statemachine.ViewList(self.a_list, 'a')
+        s = a[2:5]
+        self.assertTrue(s._store is a._store)
+        t = s[1:]
+        self.assertTrue(t._store is a._store)
+        self.assertEqual(t, self.a_list[3:5])
+        self.assertEqual(t.parent_offset, 1)
+        # changes to the parent do not affect active child lists
+        a[3] = 'x'
+        a.insert(0, 'y', 'y', 0)
+        self.assertEqual(s, self.a_list[2:5])
+        self.assertEqual(t, self.a_list[3:5])
+        self.assertEqual(t.items, [('a', 3), ('a', 4)])
+        # changes to a child list are propagated to the parents
+        s = a[3:6]
+        t = s[1:]
+        t[0] = 'z'
+        self.assertEqual(s, ['c', 'z', 'e'])
+        self.assertEqual(a, ['y', 'a', 'b', 'c', 'z', 'e', 'f', 'g'])
+        # negative slice bounds are normalized
+        u = a[-3:-1]
+        self.assertEqual(u.parent_offset, len(a) - 3)
+        u.append('w', 'w', 0)
+        self.assertEqual(a, ['y', 'a', 'b', 'c', 'z', 'e', 'f', 'w', 'g'])
+
+    def test_data_attribute(self):
+        # `data` is the list of lines of a (sliced or trimmed) view
+        a = statemachine.ViewList(self.a_list, 'a')
+        s = a[1:-1]
+        s.trim_start(2)
+        self.assertEqual(s.data, self.a_list[3:-1])
+        s.data.append('x')
+        self.assertEqual(a, self.a_list)
+        self.assertEqual(s[-1], 'x')
+        s.data.pop()
+        s.trim_end(1)
+        t = s[1:]
+        s.data[1] = 'y'
+        self.assertEqual(t, ['e'])
+        self.assertEqual(s.items, [('a', 3), ('a', 4)])
+        s.items = [('b', 7), ('c', 2)]
+        self.assertEqual(list(s.xitems()), [('b', 7, 'd'), ('c', 2, 'y')])
+        self.assertEqual(a, self.a_list)
+
+    def test_run_length_info(self):
+        ab = self.a + self.b
+        self.assertEqual(ab._store.runs, [('a', 0), ('b', 0)])
+        mixed = statemachine.ViewList(list('uvwxyz'),
+                                      items=[('a', 0), ('a', 1), ('a', 5),
+                                             ('b', None), ('b', None),
+                                             ('a', 6)])
+        self.assertEqual(mixed._store.starts, [0, 2, 3, 4, 5])
+        self.assertEqual(mixed[1:].items, mixed.items[1:])
+        self.assertEqual(mixed.info(4), ('b', None))
+        del mixed[1:3]
+        self.assertEqual(mixed.items, [('a', 0), ('b', None), ('b', None),
+                                       ('a', 6)])
+        del mixed[1:3]
+        mixed.insert(1, 'x', 'a', 1)
+        mixed.insert(2, self.a[2:6])
+        self.assertEqual(mixed.items, [('a', i) for i in (0, 1, 2, 3, 4, 5, 6)])
+        self.assertEqual(mixed._store.runs, [('a', 0)])
+
+    def test_compare_with_lists(self):
+        # compare random modifications with the same on plain lists
+        # (changes are not propagated to empty parents, avoid them)
+        import random
+        rand = random.Random(42)
+        lines = self.a_list + self.b_list
+        infos = [('a', i) for i in range(7)] + [('b', i) for i in range(5)]
+        root = statemachine.ViewList(lines, items=infos[:])
+        views = [(root, 0, len(lines))]
+        for step in range(300):
+            view, start, stop = rand.choice(views)
+            length = len(view)
+            i = rand.randint(0, length)
+            j = rand.randint(i, length)
+            action = rand.randint(0, 4)
+            if action == 2 and j - i == length:
+                j -= 1
+            if action == 0 and j > i:
+                view = view[i:j]
+                views.append((view, start + i, start + j))
+                continue
+            # modifications invalidate the views below the modified view
+            views = [entry for entry in views
+                     if entry[0] is view or self.is_ancestor(entry[0], view)]
+            if action == 1:
+                view.insert(i, 'n%d' % step, 'n', step)
+                lines.insert(start + i, 'n%d' % step)
+                infos.insert(start + i, ('n', step))
+                delta = 1
+            elif action == 2:
+                del view[i:j]
+                del lines[start+i:start+j]
+                del infos[start+i:start+j]
+                delta = i - j
+            elif action == 3 and i < length:
+                view[i] = 'r%d' % step
+                lines[start+i] = 'r%d' % step
+                delta = 0
+            else:
+                view.extend(self.c)
+                lines[start+length:start+length] = self.c_list
+                infos[start+length:start+length] = self.c.items
+                delta = len(self.c)
+            views = [(v, first, last + delta) for (v, first, last) in views]
+            for v, first, last in views:
+                self.assertEqual(v, lines[first:last])
+                self.assertEqual(v.items, infos[first:last])
+                for k in range(len(v)):
+                    self.assertEqual(v.info(k), infos[first + k])
+
+    def test_other_views(self):
+        # lists sharing a store keep their lines when another list (not a
+        # child) changes it; small blocks of runs in the store
+        import random
+        rand = random.Random(7)
+        block_size = statemachine._LineStore.block_size
+        statemachine._LineStore.block_size = 2
+        try:
+            root = statemachine.ViewList(
+                ['l%d' % i for i in range(40)],
+                items=[('s%d' % (i // 3), i) for i in range(40)])
+            views = [root]
+            for step in range(400):
+                view = rand.choice(views)
+                length = len(view)
+                i = rand.randint(0, length)
+                j = rand.randint(i, length)
+                if rand.randint(0, 2) == 0:
+                    views = views[-20:] + [view[i:j]]
+                    continue
+                snapshots = [(v, list(v), v.items) for v in views
+                             if v is not view
+                             and not self.is_ancestor(v, view)]
+                if rand.randint(0, 1):
+                    view.insert(i, 'n%d' % step, 'n', step)
+                elif j > i and j - i < length:
+                    del view[i:j]
+                for v, lines, items in snapshots:
+                    self.assertEqual(v, lines)
+                    self.assertEqual(v.items, items)
+                    self.assertEqual([v.info(k) for k in range(len(v))],
+                                     items)
+        finally:
+            statemachine._LineStore.block_size = block_size
+
+    def test_changes_through_children(self):
+        # a change through a child list is made in the shared store once
+        a = statemachine.ViewList(self.a_list, 'a')
+        s = a[2:5]
+        t = s[1:]
+        before = a[:2]
+        after = a[5:]
+        t.insert(1, 'x', 'x', 0)
+        self.assertTrue(s._store is a._store and t._store is a._store)
+        self.assertTrue(before._store is a._store)
+        self.assertEqual(a.info(4), ('x', 0))
+        self.assertEqual(s, ['c', 'd', 'x', 'e'])
+        self.assertEqual(list(before.xitems()), [('a', 0, 'a'), ('a', 1, 'b')])
+        self.assertEqual(list(after.xitems()), [('a', 5, 'f'), ('a', 6, 'g')])
+
+    def is_ancestor(self, parent, child):
+        while child.parent is not None:
+            child = child.parent
+            if child is parent:
+                return True
+        return False
+
 #         print
 #         print a
 #         print s
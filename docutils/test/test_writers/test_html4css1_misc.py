@@ -159,6 +159,177 @@ class MathTestCase(DocutilsTestSupport.StandardTestCase):
         self.assertNotIn('MathJax', head)
 
 
+class MathCacheTestCase(DocutilsTestSupport.StandardTestCase):
+
+    data = ':math:`x^2` and :math:`x^2` and :math:`y_1`\n\n.. math:: x^2\n'
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.directory)
+
+    def publish(self, math_output):
+        mysettings = {'_disable_config': True, 'math_output': math_output,
+                      'math_cache': self.directory}
+        return core.publish_parts(self.data, writer_name='html4css1',
+                                  settings_overrides=mysettings)['body']
+
+    def test_cache(self):
+        from docutils.utils.math import get_math_cache
+        for math_output in ('HTML', 'MathML'):
+            cache = get_math_cache(self.directory)
+            hits, misses = cache.hits, cache.misses
+            body = self.publish(math_output)
+            # the inline and block "x^2" are converted separately:
+            self.assertEqual((cache.hits - hits, cache.misses - misses),
+                             (1, 3))
+            self.assertEqual(self.publish(math_output), body)
+            self.assertEqual(cache.hits - hits, 5)
+            cache.entries.clear()
+            self.assertEqual(self.publish(math_output), body)
+            self.assertEqual(cache.misses - misses, 3)
+        self.assertEqual(len(os.listdir(self.directory)), 6)
+
+
+class StreamingTestCase(DocutilsTestSupport.StandardTestCase):
+
+    data = u"""\
+Title
+=====
+
+.. meta::
+   :description: first
+
+Section 1
+---------
+
+Text with :math:`x^1` and \u20ac.
+
+Section 2
+---------
+
+.. meta::
+   :keywords: late
+
+Text.
+
+.. [#] A footnote.
+"""
+
+    def publish(self, stream_output, **settings):
+        import tempfile
+        from docutils import io
+        mysettings = {'_disable_config': True, 'stream_output': stream_output,
+                      'embed_stylesheet': False}
+        mysettings.update(settings)
+        chunks = []
+        class ChunkCountingOutput(io.FileOutput):
+            def write_chunk(self, data):
+                chunks.append(data)
+                io.FileOutput.write_chunk(self, data)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            pub = core.Publisher(source_class=io.StringInput,
+                                 destination_class=ChunkCountingOutput)
+            pub.set_components('standalone', 'restructuredtext', 'html4css1')
+            pub.process_programmatic_settings(None, mysettings, None)
+            pub.set_source(self.data, None)
+            pub.set_destination(None, path)
+            output = pub.publish()
+            result = open(path, 'rb').read()
+        finally:
+            os.remove(path)
+        return result, output, chunks, pub.writer.parts
+
+    def test_same_output(self):
+        for settings in ({}, {'math_output': 'MathJax'},
+                         {'math_output': 'MathML', 'output_encoding': 'utf-16'},
+                         {'output_encoding': 'ascii'}):
+            expected, output, chunks, parts = self.publish(False, **settings)
+            result, output, chunks, parts = self.publish(True, **settings)
+            self.assertEqual(result, expected)
+            # template head, one chunk per section, rest of body and template:
+            self.assertEqual(len(chunks), 5)
+            self.assertEqual(output, None)
+        self.assertIn(b('<meta content="late" name="keywords" />'), result)
+
+    def test_parts(self):
+        result, output, chunks, parts = self.publish(True)
+        self.assertEqual(parts['whole'], None)
+        self.assertEqual(parts['body'], None)
+        self.assertIn('<meta content="first" name="description" />',
+                      parts['head'])
+
+    def test_string_output(self):
+        # string output is not streamed:
+        parts = core.publish_parts(self.data, writer_name='html4css1',
+                                   settings_overrides={'_disable_config': True,
+                                                       'stream_output': True})
+        self.assertIn('Section 2', parts['body'])
+        self.assertIn(parts['body'], parts['whole'])
+
+    def test_template_without_body(self):
+        # the template must contain the body once
+        result, output, chunks, parts = self.publish(
+            True, template=os.path.join('data', 'full-template.txt'))
+        self.assertEqual(chunks, [])
+        self.assertEqual(output, result)
+
+
+class StartTagTestCase(DocutilsTestSupport.StandardTestCase):
+
+    def setUp(self):
+        from docutils import frontend, nodes, utils
+        from docutils.writers import html4css1
+        settings = frontend.OptionParser(
+            components=(html4css1.Writer,)).get_default_values()
+        document = utils.new_document('test data', settings)
+        self.translator = html4css1.HTMLTranslator(document)
+        self.nodes = nodes
+
+    def test_attributes(self):
+        node = self.nodes.paragraph(ids=['i1', 'i2'],
+                                    classes=['a', 'language-de', 'a'])
+        starttag = self.translator.starttag
+        for i in range(2):              # the second time from the cache
+            self.assertEqual(
+                starttag(node, 'P', CLASS='b', title=u'x\ty<', Alt=['1', 2]),
+                u'<p alt="1 2" class="a b" id="i1" lang="de" '
+                u'title="x y&lt;">\n<span id="i2"></span>')
+        self.assertEqual(self.translator.emptytag(node, 'img', ''),
+                         u'<span id="i2"></span><img class="a" id="i1" '
+                         u'lang="de" />')
+        self.assertEqual(starttag(self.nodes.paragraph(), 'p', '',
+                                  lang='en'), '<p lang="en">')
+
+    def test_mailto(self):
+        self.translator.settings.cloak_email_addresses = True
+        self.translator.in_mailto = True
+        node = self.nodes.reference(classes=['a.b'])
+        self.assertEqual(self.translator.starttag(node, 'a', ''),
+                         u'<a class="a&#46;b">')
+        self.translator.in_mailto = False
+        self.assertEqual(self.translator.starttag(node, 'a', ''),
+                         u'<a class="a.b">')
+
+    def test_encode_override(self):
+        from docutils.writers import html4css1
+        class Translator(html4css1.HTMLTranslator):
+            def encode(self, text):
+                return html4css1.HTMLTranslator.encode(
+                    self, text).replace(u'\xe9', u'&eacute;')
+        translator = Translator(self.translator.document)
+        node = self.nodes.paragraph(classes=[u'caf\xe9'])
+        self.assertEqual(translator.starttag(node, 'p', '', title=u'\xe9'),
+                         u'<p class="caf&eacute;" title="&eacute;">')
+        self.assertEqual(self.translator.starttag(node, 'p', ''),
+                         u'<p class="caf\xe9">')
+
+
 if __name__ == '__main__':
     import unittest
     unittest.main()
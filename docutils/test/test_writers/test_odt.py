@@ -167,6 +167,30 @@ class DocutilsOdtTestCase(DocutilsTestSupport.StandardTestCase):
             #save_output_name='odt_custom_headfoot.odt'
             )
 
+    def test_odt_unreadable_image(self):
+        # An image file that is not an image is reported, not a traceback.
+        from docutils.writers import odf_odt
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'bad.png')
+        image_file = open(path, 'w')
+        image_file.write('no image')
+        image_file.close()
+        def get_image_info(path, directory=None):
+            raise IOError('cannot identify image file')
+        saved = odf_odt.PIL, odf_odt.get_image_info
+        odf_odt.PIL, odf_odt.get_image_info = True, get_image_info
+        warnings = StringIO.StringIO()
+        try:
+            docutils.core.publish_string(
+                source='.. image:: %s\n' % path, writer_name='odf_odt',
+                settings_overrides={'_disable_config': True,
+                                    'warning_stream': warnings})
+        finally:
+            odf_odt.PIL, odf_odt.get_image_info = saved
+            os.remove(path)
+            os.rmdir(directory)
+        self.assertTrue('Cannot read image file' in warnings.getvalue())
+
     #
     # Template for new tests.
     # Also add functional/input/odt_xxxx.txt and
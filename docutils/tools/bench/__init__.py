@@ -0,0 +1,35 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Benchmark suite for Docutils.
+
+Usage (from the Docutils source directory)::
+
+    python tools/bench [options]
+
+For a corpus of reStructuredText sources (HISTORY.txt, the documentation
+in docs/ and the functional test inputs) and for synthetic documents
+stressing one feature each (see `generators`), the time of the parse,
+transform, and write phases and the throughput are measured for each
+writer, together with the peak memory.  Every item and writer runs in a
+separate Python process.
+
+Results can be saved as a baseline (``--save-baseline``) and compared with
+a saved baseline (``--baseline``); items that became slower or use more
+memory beyond a tolerance are flagged, and the exit status is 1.
+
+``--compact-nodes`` measures with the compact node representation of
+`docutils.nodes`; compare with a baseline saved without it.
+
+``--profile`` runs the Python profiler over one item and writer instead
+(this replaces ``tools/dev/profile_docutils.py``).
+
+Modules:
+
+- `corpus`: the fixed corpus and the benchmark items.
+- `generators`: synthetic documents.
+- `measure`: phase timing and memory measurement.
+- `baseline`: saving and comparing results.
+- `main`: the command line interface.
+"""
@@ -0,0 +1,17 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""Run the benchmark suite: ``python tools/bench [options]``."""
+
+import os
+import sys
+
+tools = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# import the package, not its modules from this directory, and benchmark
+# the Docutils of this source tree
+sys.path[0] = tools
+sys.path.insert(1, os.path.dirname(tools))
+
+from bench import main
+
+main.main()
@@ -0,0 +1,67 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Saving benchmark results as a baseline and comparing with it.
+
+A baseline is a file of tab-separated values with the columns of
+`measure.Result.fields` and a header line.
+"""
+
+from measure import Result
+
+
+tolerance = 0.10
+"""Relative slowdown or memory growth reported as a regression."""
+
+noise_floor = 0.02
+"""Absolute time difference in seconds below which changes are ignored."""
+
+memory_floor = 1024
+"""Absolute memory difference in KiB below which changes are ignored."""
+
+
+def save(path, rows):
+    """Save result `rows` (mappings of field values, cf. `load()`)."""
+    output = open(path, 'w')
+    try:
+        output.write('\t'.join(Result.fields) + '\n')
+        for row in rows:
+            output.write('\t'.join([row[field] for field in Result.fields])
+                         + '\n')
+    finally:
+        output.close()
+
+def load(path):
+    """Return a mapping of ``(item, writer)`` to a mapping of field values."""
+    baseline = {}
+    input = open(path)
+    try:
+        lines = input.read().splitlines()
+    finally:
+        input.close()
+    fields = lines[0].split('\t')
+    for line in lines[1:]:
+        if line.strip():
+            row = dict(zip(fields, line.split('\t')))
+            baseline[(row['item'], row['writer'])] = row
+    return baseline
+
+def compare(new, baseline, tolerance=tolerance):
+    """
+    Return a list of ``(field, old value, new value)`` regressions of the
+    result row `new` against the `baseline` row.
+    """
+    regressions = []
+    for field in Result.fields[2:6]:
+        old_seconds, new_seconds = float(baseline[field]), float(new[field])
+        if (new_seconds - old_seconds > noise_floor
+            and new_seconds > old_seconds * (1 + tolerance)):
+            regressions.append((field, baseline[field], new[field]))
+    if baseline.get('peak_kib') and new['peak_kib']:
+        old_peak, new_peak = int(baseline['peak_kib']), int(new['peak_kib'])
+        if (new_peak - old_peak > memory_floor
+            and new_peak > old_peak * (1 + tolerance)):
+            regressions.append(('peak_kib', baseline['peak_kib'],
+                                new['peak_kib']))
+    return regressions
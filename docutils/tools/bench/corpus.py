@@ -0,0 +1,52 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+The benchmark items: the fixed corpus of reStructuredText sources and the
+synthetic documents of `generators`.
+"""
+
+import os
+import glob
+
+import generators
+
+
+def root_directory():
+    """Return the Docutils source directory (containing HISTORY.txt)."""
+    return os.path.normpath(os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), os.pardir, os.pardir))
+
+def corpus_paths(root):
+    """Return the paths of the corpus sources, in a fixed order."""
+    paths = [os.path.join(root, 'HISTORY.txt')]
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, 'docs')):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.txt'):
+                paths.append(os.path.join(dirpath, name))
+    paths.extend(sorted(glob.glob(os.path.join(
+        root, 'test', 'functional', 'input', '*.txt'))))
+    return paths
+
+item_names = ['corpus'] + [name for name, function in generators.generators]
+"""Names of the benchmark items."""
+
+def documents(item, scale=1):
+    """
+    Return the documents of the benchmark `item` as a list of
+    ``(source path, text)`` pairs.
+    """
+    if item == 'corpus':
+        result = []
+        for path in corpus_paths(root_directory()):
+            source = open(path, 'rb')
+            try:
+                result.append((path, source.read().decode('utf-8')))
+            finally:
+                source.close()
+        return result
+    for name, function in generators.generators:
+        if name == item:
+            return [('<%s>' % name, function(scale))]
+    raise ValueError('unknown benchmark item "%s"' % item)
@@ -0,0 +1,180 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Synthetic reStructuredText documents, each stressing one feature.
+
+Every generator takes a `scale` factor (1 for the default size) and
+returns the document text.
+"""
+
+words = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+         'eiusmod tempor incididunt ut labore et dolore magna aliqua').split()
+
+def word(i):
+    return words[i % len(words)]
+
+def size(default, scale):
+    return max(1, int(default * scale))
+
+
+def tables(scale=1):
+    """A grid table and a simple table with many rows."""
+    rows = size(400, scale)
+    border = '+' + '+'.join(['-' * 12] * 4) + '+'
+    lines = ['Tables', '======', '', border]
+    for i in range(rows):
+        cells = ['%-10s' % ('%s %d' % (word(i + j), i))[:10]
+                 for j in range(4)]
+        lines.append('| ' + ' | '.join(cells) + ' |')
+        lines.append(border)
+    lines.append('')
+    rule = '  '.join(['=' * 10] * 4)
+    lines.append(rule)
+    for i in range(rows):
+        lines.append('  '.join(['%-10s' % ('%s%d' % (word(i + j), i))[:10]
+                                for j in range(4)]).rstrip())
+    lines.extend([rule, ''])
+    return '\n'.join(lines)
+
+def nesting(scale=1):
+    """Deeply nested block quotes, bullet lists, and sections."""
+    depth = 25
+    blocks = []
+    for n in range(size(20, scale)):
+        title = 'Section %d' % n
+        blocks.append('%s\n%s\n' % (title, '-' * len(title)))
+        for level in range(depth):
+            indent = '  ' * level
+            blocks.append('%s- item %d at level %d with *emphasis*\n'
+                          % (indent, n, level))
+        blocks.append('')
+        for level in range(depth):
+            blocks.append('%sQuote level %d.\n' % ('    ' * level, level))
+    return 'Nesting\n=======\n\n' + '\n'.join(blocks)
+
+def references(scale=1):
+    """Many hyperlink references and targets."""
+    count = size(2000, scale)
+    paragraph = ' '.join(['ref%d_ and `phrase %d`_' % (i, i)
+                          for i in range(count)])
+    targets = ['.. _ref%d: http://example.org/%d' % (i, i)
+               for i in range(count)]
+    targets += ['.. _phrase %d: ref%d_' % (i, i) for i in range(count)]
+    return 'References\n==========\n\n%s\n\n%s\n' % (paragraph,
+                                                   '\n'.join(targets))
+
+def footnotes(scale=1):
+    """Many auto-numbered, labelled, and symbol footnotes and citations."""
+    count = size(1000, scale)
+    paragraph = ' '.join(['%s [#]_ [#note%d]_ [*]_ [CIT%d]_'
+                          % (word(i), i, i) for i in range(count)])
+    notes = []
+    for i in range(count):
+        notes.append('.. [#] Auto-numbered footnote %d.' % i)
+        notes.append('.. [#note%d] Labelled footnote %d.' % (i, i))
+        notes.append('.. [*] Symbol footnote %d.' % i)
+        notes.append('.. [CIT%d] Citation %d.' % (i, i))
+    return 'Footnotes\n=========\n\n%s\n\n%s\n' % (paragraph,
+                                                 '\n'.join(notes))
+
+def substitutions(scale=1):
+    """Many substitution references in one paragraph and in a list."""
+    count = size(2000, scale)
+    names = ['a', 'b', 'c', 'd']
+    paragraph = ' '.join(['|%s| %s' % (names[i % 4], word(i))
+                          for i in range(count)])
+    items = '\n'.join(['- |%s|' % names[i % 4] for i in range(count // 4)])
+    definitions = '\n'.join([
+        '.. |a| replace:: *replacement* text',
+        '.. |b| unicode:: U+2014',
+        '   :trim:',
+        '.. |c| replace:: |a| and ``literal``',
+        '.. |d| date::'])
+    return 'Substitutions\n=============\n\n%s\n\n%s\n\n%s\n' % (
+        paragraph, items, definitions)
+
+def substitution_cells(scale=1):
+    """Many substitution references in one paragraph and in table cells
+    (replaced per paragraph or cell by the `Substitutions` transform)."""
+    count = size(2000, scale)
+    names = ['|a|', '|b|', '|c|', 'word']
+    paragraph = ' '.join([names[i % 4] for i in range(count)])
+    cells = ''.join(['  * - %s\n    - |a|\n' % names[i % 4]
+                     for i in range(count // 2)])
+    definitions = '\n'.join([
+        '.. |a| replace:: *emphasized* text',
+        '.. |b| replace:: ``literal``',
+        '.. |c| unicode:: U+2014',
+        '   :trim:'])
+    return ('Substitution cells\n==================\n\n%s\n\n'
+            '.. list-table::\n\n%s\n%s\n' % (paragraph, cells, definitions))
+
+def paragraphs(scale=1):
+    """Long paragraphs with inline markup."""
+    blocks = []
+    for n in range(size(100, scale)):
+        text = []
+        for i in range(400):
+            if i % 40 == 5:
+                text.append('*%s*' % word(i))
+            elif i % 40 == 15:
+                text.append('**%s**' % word(i))
+            elif i % 40 == 25:
+                text.append('``%s``' % word(i))
+            elif i % 40 == 35:
+                text.append('http://example.org/%d' % i)
+            else:
+                text.append(word(i + n))
+        blocks.append(' '.join(text))
+    return 'Paragraphs\n==========\n\n' + '\n\n'.join(blocks) + '\n'
+
+def inline(scale=1):
+    """Long paragraphs dense with all kinds of inline markup (the
+    `Inliner`)."""
+    constructs = ['*%s*', '**%s**', '``%s``', '`%s`', ':sup:`%s`',
+                  'ref_', '`phrase ref`_', '`anonymous`__', '[#]_',
+                  '[CIT1]_', '|sub|', '_`%s target`', '\\*%s\\*',
+                  'http://example.org/%s', 'user@example.org', '(*) %s']
+    blocks = []
+    counts = {'`anonymous`__': 0, '[#]_': 0}
+    for n in range(size(100, scale)):
+        text = []
+        for i in range(300):
+            construct = constructs[i % len(constructs)]
+            if '%s' in construct:
+                construct = construct % ('%s%d' % (word(i), n))
+            elif construct in counts:
+                counts[construct] += 1
+            text.append('%s %s' % (construct, word(i + n)))
+        blocks.append(' '.join(text))
+    lines = ['.. _ref: http://example.org/',
+             '.. _phrase ref: http://example.org/phrase',
+             '.. [CIT1] A citation.',
+             '.. |sub| replace:: substitution', '']
+    lines.extend(['__ http://example.org/%d' % i
+                  for i in range(counts['`anonymous`__'])])
+    lines.extend(['.. [#] Footnote %d.' % i
+                  for i in range(counts['[#]_'])])
+    return 'Inline\n======\n\n%s\n\n%s\n' % ('\n\n'.join(blocks),
+                                             '\n'.join(lines))
+
+def elements(scale=1):
+    """Many small elements with classes (start tags in HTML output)."""
+    lines = ['Elements', '========', '',
+             '.. role:: note(emphasis)', '   :class: note small', '',
+             '.. role:: python(code)', '   :language: python', '']
+    for i in range(size(500, scale)):
+        lines.extend(['.. class:: item-%d' % (i % 10), '',
+                      ':field %d: :note:`%s` and :python:`x%d`' % (i, word(i), i),
+                      '', '%s' % word(i), '  definition *%d*' % i, ''])
+    return '\n'.join(lines)
+
+
+generators = [('tables', tables), ('nesting', nesting),
+              ('references', references), ('footnotes', footnotes),
+              ('substitutions', substitutions),
+              ('substitution_cells', substitution_cells),
+              ('paragraphs', paragraphs), ('inline', inline),
+              ('elements', elements)]
+"""Names and functions of the generators, in benchmark order."""
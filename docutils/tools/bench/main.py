@@ -0,0 +1,178 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+The command line interface of the benchmark suite.
+"""
+
+import os
+import sys
+import subprocess
+from optparse import OptionParser
+
+import baseline
+import corpus
+import measure
+
+
+writer_names = ('html4css1', 'latex2e', 'odf_odt', 'manpage',
+                'docutils_xml', 'pseudoxml')
+
+usage = '%prog [options]'
+
+description = ('Measure the parse, transform and write time, throughput '
+               'and peak memory of Docutils for a corpus and synthetic '
+               'documents, and compare with a saved baseline.')
+
+def option_parser():
+    parser = OptionParser(usage=usage, description=description)
+    parser.add_option('-n', '--runs', type='int', default=3,
+                      help='Process every item RUNS times and report the '
+                      'best time of each phase.  Default: %default.')
+    parser.add_option('--writers', default=','.join(writer_names),
+                      help='Comma-separated writer names.  Default: all '
+                      '(%default).')
+    parser.add_option('--items', default=','.join(corpus.item_names),
+                      help='Comma-separated benchmark items.  Default: all '
+                      '(%default).')
+    parser.add_option('--scale', type='float', default=1.0,
+                      help='Size factor for the synthetic documents.  '
+                      'Default: %default.')
+    parser.add_option('--save-baseline', metavar='FILE',
+                      help='Save the results as a baseline.')
+    parser.add_option('--baseline', metavar='FILE',
+                      help='Compare the results with a baseline saved with '
+                      'the same --runs and --scale options and exit with '
+                      'status 1 if there are regressions.')
+    parser.add_option('--tolerance', type='float',
+                      default=baseline.tolerance,
+                      help='Relative slowdown or memory growth reported as '
+                      'a regression.  Default: %default.')
+    parser.add_option('--compact-nodes', action='store_true',
+                      help='Measure with the compact node representation '
+                      '(sets DOCUTILS_COMPACT_NODES for the measurement '
+                      'processes).')
+    parser.add_option('--profile', action='store_true',
+                      help='Run the profiler over the first item and writer '
+                      'and print the statistics instead.')
+    parser.add_option('--measure', action='store_true',
+                      help='Measure in this process (used for the process '
+                      'of every item and writer).')
+    return parser
+
+def split_names(value, known, kind):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    for name in names:
+        if name not in known:
+            raise ValueError('unknown %s "%s"; known: %s'
+                             % (kind, name, ', '.join(known)))
+    return names
+
+def run_measurement(options, item, writer_name):
+    """
+    Measure `item` with `writer_name` in a new process; return the result
+    row (a mapping of field values).
+    """
+    root = corpus.root_directory()
+    environment = os.environ.copy()
+    environment['PYTHONPATH'] = os.pathsep.join(
+        [root] + [path for path in [os.environ.get('PYTHONPATH')] if path])
+    if options.compact_nodes:
+        environment['DOCUTILS_COMPACT_NODES'] = '1'
+    command = [sys.executable, os.path.dirname(os.path.abspath(__file__)),
+               '--measure', '--items', item, '--writers', writer_name,
+               '--runs', str(options.runs), '--scale', str(options.scale)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               env=environment)
+    output = process.communicate()[0]
+    if process.returncode:
+        raise RuntimeError('measuring "%s" with %s failed'
+                           % (item, writer_name))
+    values = output.decode('ascii').strip().split('\t')
+    return dict(zip(measure.Result.fields, values))
+
+def measure_here(options, items, writers):
+    # relative paths in the functional test inputs (included files,
+    # images) start at the test directory
+    os.chdir(os.path.join(corpus.root_directory(), 'test'))
+    for item in items:
+        documents = corpus.documents(item, options.scale)
+        for writer_name in writers:
+            result = measure.measure(item, writer_name, documents[:],
+                                     options.runs)
+            sys.stdout.write('\t'.join(result.values()) + '\n')
+
+def profile(options, item, writer_name):
+    try:
+        import cProfile as profiler
+    except ImportError:                 # Python < 2.5
+        import profile as profiler
+    import pstats
+    os.chdir(os.path.join(corpus.root_directory(), 'test'))
+    documents = corpus.documents(item, options.scale)
+    # import the modules and compile the patterns before profiling
+    measure.publish(documents[0][0], documents[0][1], writer_name)
+    prof = profiler.Profile()
+    for source_path, text in documents:
+        prof.runcall(measure.publish, source_path, text, writer_name)
+    stats = pstats.Stats(prof)
+    stats.strip_dirs()
+    stats.sort_stats('time')            # 'cumulative'; 'calls'
+    stats.print_stats(40)
+
+def format_table(rows):
+    widths = [max([len(row[i]) for row in rows])
+              for i in range(len(rows[0]))]
+    lines = []
+    for row in rows:
+        lines.append('  '.join([value.rjust(width)
+                                for value, width in zip(row, widths)]))
+    return '\n'.join(lines) + '\n'
+
+def main(argv=None):
+    parser = option_parser()
+    options, args = parser.parse_args(argv)
+    if args:
+        parser.error('unexpected arguments: %s' % ' '.join(args))
+    try:
+        items = split_names(options.items, corpus.item_names, 'item')
+        writers = split_names(options.writers, writer_names, 'writer')
+    except ValueError, error:
+        parser.error(str(error))
+    if options.measure:
+        measure_here(options, items, writers)
+        return
+    if options.profile:
+        profile(options, items[0], writers[0])
+        return
+    old = {}
+    if options.baseline:
+        old = baseline.load(options.baseline)
+    fields = measure.Result.fields
+    rows = []
+    table = [fields]
+    regressions = []
+    for item in items:
+        for writer_name in writers:
+            row = run_measurement(options, item, writer_name)
+            rows.append(row)
+            values = [row[field] for field in fields]
+            if (item, writer_name) in old:
+                changes = baseline.compare(row, old[(item, writer_name)],
+                                           options.tolerance)
+                for field, old_value, new_value in changes:
+                    regressions.append((item, writer_name, field,
+                                        old_value, new_value))
+                if changes:
+                    values[0] = '*' + values[0]
+            table.append(values)
+            sys.stderr.write('.')
+    sys.stderr.write('\n')
+    sys.stdout.write(format_table(table))
+    if options.save_baseline:
+        baseline.save(options.save_baseline, rows)
+    if regressions:
+        sys.stdout.write('\nRegressions against %s:\n' % options.baseline)
+        for regression in regressions:
+            sys.stdout.write('  %s with %s: %s %s -> %s\n' % regression)
+        sys.exit(1)
@@ -0,0 +1,123 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Measurement of the parse, transform, and write phases of the `Publisher`.
+"""
+
+import os
+import sys
+try:
+    import resource
+except ImportError:                     # not available on Windows
+    resource = None
+
+from docutils import core, io
+
+
+phases = ('parse', 'transform', 'write')
+
+settings_overrides = {'_disable_config': True, 'report_level': 5,
+                      'halt_level': 5, 'traceback': True}
+"""Settings for all runs: no configuration files, no system messages."""
+
+
+def cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+def peak_memory():
+    """Return the peak resident set size of this process in KiB, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':        # bytes, not KiB
+        peak //= 1024
+    return peak
+
+def publish(source_path, text, writer_name):
+    """
+    Process one document; return the CPU time of the parse, transform,
+    and write phases.
+    """
+    publisher = core.Publisher(source_class=io.StringInput,
+                               destination_class=io.StringOutput)
+    publisher.set_components('standalone', 'restructuredtext', writer_name)
+    publisher.process_programmatic_settings(None, settings_overrides, None)
+    publisher.set_source(text, source_path)
+    publisher.set_destination()
+    start = cpu_time()
+    publisher.document = publisher.read()
+    parsed = cpu_time()
+    publisher.apply_transforms()
+    transformed = cpu_time()
+    publisher.writer.write(publisher.document, publisher.destination)
+    written = cpu_time()
+    return (parsed - start, transformed - parsed, written - transformed)
+
+
+class Result(object):
+
+    """Measurement of one benchmark item with one writer."""
+
+    fields = ('item', 'writer', 'parse', 'transform', 'write', 'total',
+              'kib_per_second', 'peak_kib')
+    """Columns of the result tables."""
+
+    def __init__(self, item, writer, seconds, size, peak):
+        self.item = item
+        self.writer = writer
+        self.seconds = seconds
+        """CPU seconds of each phase (best of all runs)."""
+
+        self.size = size
+        """Source size in characters."""
+
+        self.peak = peak
+        """Peak memory in KiB, or None."""
+
+    def total(self):
+        return sum(self.seconds)
+
+    def throughput(self):
+        """Return the processed source KiB per second."""
+        return self.size / 1024.0 / max(self.total(), 1e-6)
+
+    def values(self):
+        """Return the values of the `fields`, as strings."""
+        values = [self.item, self.writer]
+        values.extend(['%.4f' % seconds
+                       for seconds in self.seconds + (self.total(),)])
+        values.append('%.1f' % self.throughput())
+        values.append(self.peak is None and '' or str(self.peak))
+        return values
+
+
+def measure(item, writer_name, documents, runs):
+    """
+    Process the `documents` (``(source path, text)`` pairs) `runs` times
+    and return a `Result` with the best time of each phase.
+
+    Documents the writer fails to process (e.g. tables not supported by
+    the LaTeX writer) are reported on `sys.stderr` and left out.
+    """
+    best = None
+    for i in range(runs):
+        seconds = [0.0] * len(phases)
+        for source_path, text in documents[:]:
+            try:
+                times = publish(source_path, text, writer_name)
+            except Exception, error:
+                sys.stderr.write('%s: skipped with %s (%s: %s)\n'
+                                 % (source_path, writer_name,
+                                    error.__class__.__name__, error))
+                documents.remove((source_path, text))
+                continue
+            for j, phase_seconds in enumerate(times):
+                seconds[j] += phase_seconds
+        if best is None:
+            best = seconds
+        else:
+            best = map(min, best, seconds)
+    size = sum([len(text) for source_path, text in documents])
+    return Result(item, writer_name, tuple(best), size, peak_memory())
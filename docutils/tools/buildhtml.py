@@ -25,7 +25,21 @@ import sys
 import os
 import os.path
 import copy
+import traceback
 from fnmatch import fnmatch
+from StringIO import StringIO
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import md5
+except ImportError:                     # Python < 2.5
+    from md5 import new as md5
+try:
+    import multiprocessing
+except ImportError:                     # Python < 2.6
+    multiprocessing = None
 import docutils
 from docutils import ApplicationError
 from docutils import core, frontend, utils
@@ -80,9 +94,18 @@ class SettingsSpec(docutils.SettingsSpec):
           {'action': 'store_true', 'validator': frontend.validate_boolean}),
          ('Do not process files, show files that would be processed.',
           ['--dry-run'],
-          {'action': 'store_true', 'validator': frontend.validate_boolean}),))
-
-    relative_path_settings = ('prune',)
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Number of worker processes used to build documents in parallel.  '
+          '0 starts one process per CPU.  Default: 1 (no parallel build).',
+          ['--jobs'],
+          {'metavar': '<N>', 'type': 'int', 'default': 1,
+           'validator': frontend.validate_nonnegative_int}),
+         ('Rebuild only documents whose source, recorded dependencies, or '
+          'settings changed since the last build.  The state of the build '
+          'is stored in <file>.  Default: rebuild all documents.',
+          ['--manifest'], {'metavar': '<file>'}),))
+
+    relative_path_settings = ('prune', 'manifest')
     config_section = 'buildhtml application'
     config_section_dependencies = ('applications',)
 
@@ -115,6 +138,133 @@ class Struct:
         self.__dict__.update(keywordargs)
 
 
+def file_state(path):
+    """Return the modification time and size of `path` (`None` if missing)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+def file_digest(path):
+    """Return the MD5 hex digest of the content of `path`."""
+    f = open(path, 'rb')
+    try:
+        return md5(f.read()).hexdigest()
+    finally:
+        f.close()
+
+
+class Manifest:
+
+    """
+    Record of the inputs of the documents built, for incremental builds.
+
+    For every source file, the manifest stores its modification time, size
+    and content digest, a fingerprint of the runtime settings, the output
+    path, and the state of the dependencies recorded while publishing
+    (included files, embedded stylesheets, images, CSV data, ...).
+    """
+
+    version = 1
+    """Manifests of another version are discarded."""
+
+    ignored_settings = ('recurse', 'prune', 'ignore', 'silent', 'dry_run',
+                        'jobs', 'manifest', 'record_dependencies',
+                        'warning_stream', '_directories', '_source',
+                        '_destination')
+    """Settings without influence on the output of a document."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        """Mapping of source paths to build records."""
+        self.pending = {}
+        """Settings fingerprint and source state of documents to build."""
+        self.load()
+
+    def load(self):
+        try:
+            f = open(self.path, 'rb')
+        except IOError:
+            return
+        try:
+            try:
+                version, entries = pickle.load(f)
+            except Exception:           # missing or corrupt manifest
+                return
+        finally:
+            f.close()
+        if version == self.version:
+            self.entries = entries
+
+    def save(self):
+        f = open(self.path, 'wb')
+        try:
+            pickle.dump((self.version, self.entries), f, 2)
+        finally:
+            f.close()
+
+    def fingerprint(self, settings):
+        """Return a digest of all `settings` that may affect the output."""
+        items = [(key, value) for (key, value) in settings.__dict__.items()
+                 if key not in self.ignored_settings]
+        items.sort()
+        return md5(repr((docutils.__version__, docutils.__version_details__,
+                         items))).hexdigest()
+
+    def is_current(self, settings):
+        """
+        Return true if the output for `settings._source` is up to date.
+        """
+        source = settings._source
+        fingerprint = self.fingerprint(settings)
+        state = file_state(source)
+        entry = self.entries.get(source)
+        if (entry is None or entry['settings'] != fingerprint
+            or entry['destination'] != settings._destination
+            or file_state(settings._destination) is None):
+            self.pending[source] = (fingerprint, state, None)
+            return False
+        if state != entry['state']:
+            digest = file_digest(source)
+            if digest != entry['digest']:
+                self.pending[source] = (fingerprint, state, digest)
+                return False
+            entry['state'] = state      # touched but not modified
+        for path, dependency_state in entry['dependencies'].items():
+            if file_state(path) != dependency_state:
+                self.pending[source] = (fingerprint, state, entry['digest'])
+                return False
+        return True
+
+    def update(self, settings, dependencies):
+        """
+        Record a successful build of `settings._source`.
+
+        `dependencies` is the list of files recorded while publishing.
+        """
+        source = settings._source
+        fingerprint, state, digest = self.pending.pop(source)
+        if digest is None:
+            digest = file_digest(source)
+        dependency_states = {}
+        for path in dependencies:
+            path = os.path.abspath(path)
+            dependency_states[path] = file_state(path)
+        self.entries[source] = {'state': state,
+                                'digest': digest,
+                                'settings': fingerprint,
+                                'destination': settings._destination,
+                                'dependencies': dependency_states}
+
+    def discard(self, source):
+        """Forget `source`, so it is rebuilt next time."""
+        self.pending.pop(source, None)
+        if source in self.entries:
+            del self.entries[source]
+
+
 class Builder:
 
     def __init__(self):
@@ -133,6 +283,9 @@ class Builder:
         itself.  ``self.publishers[''].components`` must contain a superset of
         all components used by individual publishers."""
 
+        self.directory_settings = {}
+        """Cache of resolved settings, see `get_directory_settings()`."""
+
         self.setup_publishers()
 
     def setup_publishers(self):
@@ -180,6 +333,19 @@ class Builder:
         settings.update(self.settings_spec.__dict__, publisher.option_parser)
         return settings
 
+    def get_directory_settings(self, publisher_name, directory):
+        """
+        Return a copy of the settings for `publisher_name` in `directory`.
+
+        The settings (including the local config file) are resolved only
+        once per publisher and directory.
+        """
+        key = (publisher_name, directory)
+        if key not in self.directory_settings:
+            self.directory_settings[key] = self.get_settings(publisher_name,
+                                                             directory)
+        return self.directory_settings[key].copy()
+
     def run(self, directory=None, recurse=1):
         recurse = recurse and self.initial_settings.recurse
         if directory:
@@ -188,26 +354,59 @@ class Builder:
             self.directories = self.settings_spec._directories
         else:
             self.directories = [os.getcwd()]
-        for directory in self.directories:
-            for root, dirs, files in os.walk(directory):
-                # os.walk by default this recurses down the tree,
-                # influence by modifying dirs.
-                if not recurse:
-                    del dirs[:]
-                self.visit(root, files, dirs)
+        self.errors = []
+        """List of ``(source path, error message)`` tuples."""
+        self.queue = None
+        """Progress messages and jobs for a parallel build (else `None`)."""
+        self.manifest = None
+        if self.initial_settings.manifest:
+            self.manifest = Manifest(self.initial_settings.manifest)
+        processes = self.initial_settings.jobs
+        if processes != 1 and not self.initial_settings.dry_run:
+            if multiprocessing is None:
+                ErrorOutput(encoding=self.initial_settings.error_encoding
+                           ).write('/// Parallel build requires the '
+                                   '"multiprocessing" module, ignoring '
+                                   '"--jobs".\n')
+            else:
+                self.queue = []
+        try:
+            for directory in self.directories:
+                for root, dirs, files in os.walk(directory):
+                    # os.walk by default this recurses down the tree,
+                    # influence by modifying dirs.
+                    if not recurse:
+                        del dirs[:]
+                    self.visit(root, files, dirs)
+            if self.queue is not None:
+                self.build_queue(processes)
+        finally:
+            if self.manifest is not None and not self.initial_settings.dry_run:
+                self.manifest.save()
+
+    def progress(self, message, settings, job=None):
+        """
+        Write a progress `message`, or queue it together with `job` when
+        building in parallel.
+        """
+        if self.queue is not None:
+            self.queue.append((message, job))
+            return
+        if message:
+            ErrorOutput(encoding=settings.error_encoding).write(message)
+            sys.stderr.flush()
 
     def visit(self, directory, names, subdirectories):
-        settings = self.get_settings('', directory)
-        errout = ErrorOutput(encoding=settings.error_encoding)
+        self.directory_settings = {}
+        settings = self.get_directory_settings('', directory)
         if settings.prune and (os.path.abspath(directory) in settings.prune):
-            errout.write('/// ...Skipping directory (pruned): %s\n' %
-                         directory)
-            sys.stderr.flush()
+            self.progress('/// ...Skipping directory (pruned): %s\n' %
+                          directory, settings)
             del subdirectories[:]
             return
         if not self.initial_settings.silent:
-            errout.write('/// Processing directory: %s\n' % directory)
-            sys.stderr.flush()
+            self.progress('/// Processing directory: %s\n' % directory,
+                          settings)
         # settings.ignore grows many duplicate entries as we recurse
         # if we add patterns in config files or on the command line.
         for pattern in utils.uniq(settings.ignore):
@@ -224,17 +423,33 @@ class Builder:
             publisher = 'PEPs'
         else:
             publisher = '.txt'
-        settings = self.get_settings(publisher, directory)
+        settings = self.get_directory_settings(publisher, directory)
         errout = ErrorOutput(encoding=settings.error_encoding)
         pub_struct = self.publishers[publisher]
         settings._source = os.path.normpath(os.path.join(directory, name))
         settings._destination = settings._source[:-4]+'.html'
-        if not self.initial_settings.silent:
-            errout.write('    ::: Processing: %s\n' % name)
-            sys.stderr.flush()
+        if self.manifest is not None and self.manifest.is_current(settings):
+            if not self.initial_settings.silent:
+                self.progress('    ::: Up to date: %s\n' % name, settings)
+            return
+        if self.initial_settings.silent:
+            message = None
+        else:
+            message = '    ::: Processing: %s\n' % name
+        if self.queue is not None:
+            self.progress(message, settings,
+                          (settings, pub_struct.reader_name,
+                           pub_struct.writer_name))
+            return
+        self.progress(message, settings)
+        if settings.dry_run:
+            return
+        dependencies = settings.record_dependencies
+        if self.manifest is not None:
+            # Record the dependencies of this document separately:
+            settings.record_dependencies = utils.DependencyList()
         try:
-            if not settings.dry_run:
-                core.publish_file(source_path=settings._source,
+            core.publish_file(source_path=settings._source,
                               destination_path=settings._destination,
                               reader_name=pub_struct.reader_name,
                               parser_name='restructuredtext',
@@ -243,6 +458,105 @@ class Builder:
         except ApplicationError:
             error = sys.exc_info()[1] # get exception in Python <2.6 and 3.x
             errout.write('        %s\n' % ErrorString(error))
+            self.errors.append((settings._source, str(ErrorString(error))))
+            if self.manifest is not None:
+                self.manifest.discard(settings._source)
+        else:
+            if self.manifest is not None:
+                self.manifest.update(settings,
+                                     settings.record_dependencies.list)
+        if dependencies is not settings.record_dependencies:
+            dependencies.add(*settings.record_dependencies.list)
+
+    def build_queue(self, processes):
+        """
+        Publish the queued documents with a pool of worker processes.
+
+        Results are reported in queue order, so the progress output
+        matches that of a serial build.  A per-file error summary is
+        written at the end.
+        """
+        errout = ErrorOutput(encoding=self.initial_settings.error_encoding)
+        jobs = []
+        for message, job in self.queue:
+            if job is not None:
+                settings, reader_name, writer_name = job
+                # Workers record dependencies in a private list, the
+                # results are added to the shared one below:
+                settings = settings.copy()
+                settings.record_dependencies = utils.DependencyList()
+                jobs.append((settings, reader_name, writer_name))
+        pool = multiprocessing.Pool(processes or None)
+        try:
+            results = pool.imap(publish_job, jobs)
+            for message, job in self.queue:
+                if message:
+                    errout.write(message)
+                    sys.stderr.flush()
+                if job is None:
+                    continue
+                settings = job[0]
+                warnings, error, dependencies = results.next()
+                if warnings:
+                    errout.write(warnings)
+                if error:
+                    errout.write('        %s\n' % error)
+                    self.errors.append((settings._source, error))
+                    if self.manifest is not None:
+                        self.manifest.discard(settings._source)
+                elif self.manifest is not None:
+                    self.manifest.update(settings, dependencies)
+                settings.record_dependencies.add(*dependencies)
+                sys.stderr.flush()
+        except:
+            pool.terminate()
+            raise
+        pool.close()
+        pool.join()
+        self.queue = None
+        if self.errors:
+            errout.write('/// %d of %d documents failed:\n'
+                         % (len(self.errors), len(jobs)))
+            for source, error in self.errors:
+                errout.write('    %s: %s\n' % (source, error))
+
+
+def publish_job(job):
+    """
+    Publish a document in a worker process of a parallel build.
+
+    `job` is a ``(settings, reader_name, writer_name)`` tuple.  Return a
+    ``(warnings, error, dependencies)`` tuple for reporting in the parent.
+    """
+    settings, reader_name, writer_name = job
+    # Capture warnings and error reports for ordered output in the parent:
+    warnings = StringIO()
+    stderr = sys.stderr
+    sys.stderr = warnings
+    error = None
+    try:
+        try:
+            core.publish_file(source_path=settings._source,
+                              destination_path=settings._destination,
+                              reader_name=reader_name,
+                              parser_name='restructuredtext',
+                              writer_name=writer_name,
+                              settings=settings)
+        except ApplicationError:
+            error = str(ErrorString(sys.exc_info()[1]))
+        except SystemExit:
+            # The publisher exits on fatal errors (e.g. a system message
+            # above the halt level); only this document is affected.
+            error = 'Exit status %s.' % sys.exc_info()[1].code
+        except Exception:
+            if settings.traceback:
+                error = traceback.format_exc().strip()
+            else:
+                error = ''.join(traceback.format_exception_only(
+                    *sys.exc_info()[:2])).strip()
+    finally:
+        sys.stderr = stderr
+    return warnings.getvalue(), error, settings.record_dependencies.list
 
 
 if __name__ == "__main__":
@@ -20,6 +20,13 @@ Build-HTML Options
                         (separated by colons).  Default: ".svn:CVS"
 --silent                Work silently (no progress messages).  Independent of
                         "--quiet".
+--jobs=<N>              Number of worker processes used to build documents in
+                        parallel.  0 starts one process per CPU.  Default: 1
+                        (no parallel build).
+--manifest=<file>       Rebuild only documents whose source, recorded
+                        dependencies, or settings changed since the last
+                        build.  The state of the build is stored in <file>.
+                        Default: rebuild all documents.
 """
 
 import unittest
@@ -115,5 +122,38 @@ class BuildHtmlTests(unittest.TestCase):
         self.assertEqual( len(dirs), 1)
         self.assertEqual( files, [])
 
+    def test_jobs(self):
+        opts = "--jobs 2 "+ self.root
+        dirs, files = process_and_return_filelist( opts )
+        self.assertEqual(files.count("one.txt"), 4)
+        self.assertEqual(files.count("two.txt"), 4)
+        for s in self.tree:
+            if s.endswith(".txt"):
+                html = os.path.join(self.root, s[:-4] + ".html")
+                self.assertTrue(os.path.exists(html))
+                os.remove(html)
+
+    def test_manifest(self):
+        manifest = os.path.join(self.root, "_tmp_manifest")
+        opts = "--manifest=%s %s" % (manifest, self.root)
+        process_and_return_filelist( opts )
+        one = os.path.join(self.root, self.tree[1])
+        two = os.path.join(self.root, self.tree[2])
+        one_html = one[:-4] + ".html"
+        two_html = two[:-4] + ".html"
+        os.utime(one_html, (0, 0))
+        os.utime(two_html, (0, 0))
+        fd_s = open(two, "w")
+        fd_s.write("changed")
+        fd_s.close()
+        process_and_return_filelist( opts )
+        # only the changed document is rebuilt
+        self.assertEqual(os.stat(one_html).st_mtime, 0)
+        self.assertNotEqual(os.stat(two_html).st_mtime, 0)
+        os.remove(manifest)
+        for s in self.tree:
+            if s.endswith(".txt"):
+                os.remove(os.path.join(self.root, s[:-4] + ".html"))
+
 if __name__ == '__main__':
     unittest.main()